@@ -1,25 +1,94 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response, Header
 from fastapi.middleware.cors import CORSMiddleware   # ✅ Added
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
+from starlette.background import BackgroundTask
+from contextlib import asynccontextmanager
+from pydantic import BaseModel
 import uuid
 
-from .services.flight_resolver import resolve_flight
+from .services.flight_resolver import resolve_flight, resolve_departures
 from .services.weather_service import get_weather_risk
 from .services.feature_service import build_features
-from .services.prediction_service import predict_delay_risk
 from .services.decision_service import recommend_action
 from .services.minima_service import (
     check_takeoff_feasible,
     check_landing_feasible
 )
-from .services.explainability_service import explain_prediction
+from .services.executor_service import run_inference, shutdown_executor
+from .services.departure_board_service import stream_departure_board
+from .services.rotation_service import score_network
+from .services.alternate_service import find_alternates
+from .services.scenario_service import score_scenarios
+from .services.departure_window_service import (
+    validate_search,
+    find_departure_windows
+)
+from .services.warmup_service import start_warmup, readiness
+from .services.model_registry import (
+    resolve_variant,
+    available_variants,
+    get_model_version
+)
+from .services.cache_service import cache_stats, start_snapshots, stop_snapshots
+from .services.memory_service import memory_stats
+from .services.feedback_service import archive_features, record_outcome
+from .services.retrain_service import (
+    maybe_start_retrain,
+    retrain_due,
+    retrain_status
+)
+from .services.drift_service import observe_prediction, drift_report
+from .services.admin_service import admin_enabled, is_admin
+from .services.profiler_service import (
+    profiled,
+    start_profile,
+    stop_profile,
+    current_profile
+)
+from .services.shadow_service import (
+    shadow_enabled,
+    submit_shadow,
+    shadow_stats,
+    recent_comparisons
+)
+from .services.rate_limiter import RateLimitExceeded, limiter_stats
+from .services.admission_service import (
+    AdmissionMiddleware,
+    admission_stats,
+    fallback_key,
+    remember_response
+)
+from .services.response_service import (
+    parse_fields,
+    select_fields,
+    build_etag,
+    etag_matches,
+    RecordJSONResponse
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Reload the previous process' caches before warm-up / first request
+    start_snapshots()
+    start_warmup()
+    yield
+    stop_snapshots()
+    shutdown_executor()
 
 
 app = FastAPI(
     title="Low Visibility Flight Risk AI",
     description="TAF-based end-to-end flight delay, diversion, and cancellation risk system",
-    version="2.1"
+    version="2.1",
+    lifespan=lifespan
 )
 
+# Concurrency limit + load shedding for the scoring endpoints (innermost:
+# shed responses still get CORS headers and compression)
+app.add_middleware(AdmissionMiddleware)
+
 # ✅ ---------------- CORS CONFIGURATION ----------------
 app.add_middleware(
     CORSMiddleware,
@@ -27,28 +96,325 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After", "X-Degraded"],
 )
 # -----------------------------------------------------
 
+# Compress larger JSON payloads (TAF text, explainability, ...)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 
 @app.get("/")
 def root():
     return {
         "message": "Low Visibility Flight Risk AI is running",
-        "endpoints": ["/predict"]
+        "endpoints": [
+            "/predict",
+            "/predict/scenarios",
+            "/feedback",
+            "/departure-window",
+            "/airport/{icao}/departures",
+            "/airport/{icao}/alternates",
+            "/rotations",
+            "/shadow",
+            "/drift",
+            "/ready",
+            "/stats"
+        ]
     }
 
 
+@app.get("/ready")
+def ready():
+    """
+    Readiness probe: 503 until startup warm-up has finished.
+    """
+    state = readiness()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
+
+@app.get("/stats")
+def stats():
+    """
+    Cache hit ratios (local + shared tier), upstream rate-limiter
+    state (queue waits, remaining quota), admission control (shed,
+    degraded and queued requests per class) and memory accounted per
+    cache / model as seen by this worker.
+    """
+    return {
+        **cache_stats(),
+        "upstream": limiter_stats(),
+        "admission": admission_stats(),
+        "memory": memory_stats()
+    }
+
+
+@app.get("/shadow")
+def shadow(recent: int = 0, x_admin_token: str | None = Header(None)):
+    """
+    Candidate models evaluated in shadow on /predict traffic: delay
+    probability / action disagreements with production, per-row
+    predict times (both timed alike, on the same rows) and work
+    skipped under load. `recent` adds the last N logged comparisons
+    (admin only: their trace_ids are the /feedback keys).
+    """
+    body = shadow_stats()
+
+    if recent > 0:
+        _require_admin(x_admin_token, str(uuid.uuid4())[:8])
+
+        if body["enabled"]:
+            body["recent"] = recent_comparisons(min(recent, 1000))
+
+    return body
+
+
+@app.get("/drift")
+def drift(model: str | None = None):
+    """
+    Live feature and delay_probability distributions (this worker,
+    current + previous window) vs the training dataset: PSI, KS
+    distance and quantiles per feature. Predictions are those served
+    by `model`, compared with its output on the dataset (computed at
+    warm-up, or in the background after a model swap).
+    """
+    trace_id = str(uuid.uuid4())[:8]
+
+    try:
+        model_variant = _deployed_variant(model)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "layer": "request",
+                "message": str(e),
+                "trace_id": trace_id
+            }
+        )
+
+    try:
+        return drift_report(model_variant)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "layer": "drift_service",
+                "message": str(e),
+                "trace_id": trace_id
+            }
+        )
+
+
+def _require_admin(token: str | None, trace_id: str):
+    """
+    404 when the admin surface is disabled, 401 on a wrong token.
+    """
+    if not admin_enabled():
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    if not is_admin(token):
+        raise HTTPException(
+            status_code=401,
+            detail={
+                "layer": "admin",
+                "message": "Invalid or missing X-Admin-Token",
+                "trace_id": trace_id
+            }
+        )
+
+
+@app.post("/admin/retrain")
+def admin_retrain(force: bool = False, x_admin_token: str | None = Header(None)):
+    """
+    Start a warm-start retrain on reported outcomes (once enough are in,
+    or `force`). The result is only kept as a candidate model if it
+    passes the holdout guard; it never replaces production.
+    """
+    trace_id = str(uuid.uuid4())[:8]
+    _require_admin(x_admin_token, trace_id)
+
+    return {
+        "started": maybe_start_retrain(force),
+        **retrain_status()
+    }
+
+
+@app.get("/admin/retrain")
+def admin_retrain_status(x_admin_token: str | None = Header(None)):
+    trace_id = str(uuid.uuid4())[:8]
+    _require_admin(x_admin_token, trace_id)
+
+    return retrain_status()
+
+
+@app.post("/admin/profile")
+def admin_profile_start(
+    duration_s: float = 30,
+    sample_rate: float = 1.0,
+    interval_ms: float = 5,
+    x_admin_token: str | None = Header(None)
+):
+    """
+    Sample the stacks of /predict requests for a bounded window:
+    `sample_rate` of the requests are profiled, every `interval_ms`.
+    """
+    trace_id = str(uuid.uuid4())[:8]
+    _require_admin(x_admin_token, trace_id)
+
+    try:
+        return start_profile(duration_s, sample_rate, interval_ms)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "layer": "request",
+                "message": str(e),
+                "trace_id": trace_id
+            }
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "layer": "profiler",
+                "message": str(e),
+                "trace_id": trace_id
+            }
+        )
+
+
+@app.post("/admin/profile/stop")
+def admin_profile_stop(x_admin_token: str | None = Header(None)):
+    trace_id = str(uuid.uuid4())[:8]
+    _require_admin(x_admin_token, trace_id)
+
+    session = stop_profile()
+
+    if session is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "layer": "profiler",
+                "message": "No profiling session",
+                "trace_id": trace_id
+            }
+        )
+
+    return session.summary()
+
+
+@app.get("/admin/profile")
+def admin_profile(
+    format: str = "summary",
+    kind: str = "wall",
+    x_admin_token: str | None = Header(None)
+):
+    """
+    Results of the running / last session: a summary (top frames by
+    wall-clock and CPU share) or `format=collapsed` stacks for flame
+    graphs (`kind=wall` samples or `kind=cpu` milliseconds).
+    """
+    trace_id = str(uuid.uuid4())[:8]
+    _require_admin(x_admin_token, trace_id)
+
+    if format not in ("summary", "collapsed") or kind not in ("wall", "cpu"):
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "layer": "request",
+                "message": "format must be summary|collapsed, kind wall|cpu",
+                "trace_id": trace_id
+            }
+        )
+
+    session = current_profile()
+
+    if session is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "layer": "profiler",
+                "message": "No profiling session",
+                "trace_id": trace_id
+            }
+        )
+
+    if format == "collapsed":
+        return PlainTextResponse(session.collapsed(kind))
+
+    return session.summary()
+
+
+def _rate_limited(e: RateLimitExceeded, trace_id: str) -> HTTPException:
+    """
+    Upstream capacity exhausted: 503 + Retry-After rather than a 502.
+    """
+    return HTTPException(
+        status_code=503,
+        detail={
+            "layer": "flight_resolver",
+            "message": str(e),
+            "trace_id": trace_id
+        },
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
+def _deployed_variant(model: str | None) -> str:
+    """
+    Validate the requested model variant.
+    Raises ValueError with a client-facing message.
+    """
+    model_variant = resolve_variant(model)
+
+    if model_variant not in available_variants():
+        raise ValueError(
+            f"Model variant '{model_variant}' is not deployed"
+        )
+
+    return model_variant
+
+
 @app.get("/predict")
-def predict(flight_number: str, date: str):
-    trace_id = str(uuid.uuid4())[:8]  # short trace id
+@profiled
+def predict(
+    request: Request,
+    flight_number: str,
+    date: str,
+    explain: bool = True,
+    fields: str | None = None,
+    model: str | None = None
+):
+    # Full uuid: also the permanent key of the feedback archive
+    trace_id = str(uuid.uuid4())
+
+    # Admitted under load: skip the SHAP explanation
+    admission = getattr(request.state, "admission", None)
+    degraded = bool(admission and admission["degraded"] and explain)
+    if degraded:
+        explain = False
 
     try:
+        try:
+            selected_fields = parse_fields(fields)
+            model_variant = _deployed_variant(model)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "layer": "request",
+                    "message": str(e),
+                    "trace_id": trace_id
+                }
+            )
+
         # -----------------------------
         # 1. Resolve flight details
         # -----------------------------
         try:
             flight = resolve_flight(flight_number, date)
+        except RateLimitExceeded as e:
+            raise _rate_limited(e, trace_id)
         except Exception as e:
             raise HTTPException(
                 status_code=502,
@@ -59,11 +425,11 @@ def predict(flight_number: str, date: str):
                 }
             )
 
-        origin_icao = flight["origin"]["icao"]
-        dest_icao = flight["destination"]["icao"]
+        origin_icao = flight.origin
+        dest_icao = flight.destination
 
-        scheduled_departure = flight["scheduled_departure"]
-        scheduled_arrival = flight["scheduled_arrival"]
+        scheduled_departure = flight.scheduled_departure
+        scheduled_arrival = flight.scheduled_arrival
 
         # -----------------------------
         # 2. Fetch weather (TAF-based)
@@ -87,6 +453,30 @@ def predict(flight_number: str, date: str):
                 }
             )
 
+        # -----------------------------
+        # 2.1 Conditional request (ETag)
+        # -----------------------------
+        # Nothing below changes until the flight record, a TAF/METAR
+        # issuance or the model changes → answer 304 before inference
+        # (diversion alternates are re-validated once known, see 6.1)
+        etag_variant = {
+            "explain": explain,
+            "fields": selected_fields
+        }
+        etag = build_etag(
+            get_model_version(model_variant),
+            flight,
+            origin_weather,
+            destination_weather,
+            variant=etag_variant
+        )
+        cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if degraded:
+            cache_headers["X-Degraded"] = "explain"
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=cache_headers)
+
         # -----------------------------
         # 3. CAT minima feasibility
         # -----------------------------
@@ -94,14 +484,14 @@ def predict(flight_number: str, date: str):
             origin_takeoff_ok = int(
                 check_takeoff_feasible(
                     origin_icao,
-                    origin_weather.get("taf_min_vis_km", 10.0)
+                    origin_weather.taf_min_vis_km
                 )
             )
 
             destination_landing_ok = int(
                 check_landing_feasible(
                     dest_icao,
-                    destination_weather.get("taf_min_vis_km", 10.0)
+                    destination_weather.taf_min_vis_km
                 )
             )
         except Exception as e:
@@ -134,34 +524,43 @@ def predict(flight_number: str, date: str):
             )
 
         # -----------------------------
-        # 5. Predict delay probability
+        # 5. Predict + explain (SHAP) on the inference executor
         # -----------------------------
         try:
-            prediction = predict_delay_risk(features)
+            prediction, explainability = run_inference(
+                features,
+                explain=explain,
+                variant=model_variant
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=500,
                 detail={
-                    "layer": "prediction_service",
+                    "layer": "inference_executor",
                     "message": str(e),
                     "trace_id": trace_id
                 }
             )
 
-        # -----------------------------
-        # 5.1 Explain prediction (SHAP)
-        # -----------------------------
+        # Archived so ops can report the real outcome (POST /feedback)
         try:
-            explainability = explain_prediction(features)
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail={
-                    "layer": "explainability_service",
-                    "message": str(e),
-                    "trace_id": trace_id
-                }
+            archive_features(
+                trace_id,
+                get_model_version(model_variant),
+                features,
+                prediction.delay_probability
+            )
+        except Exception:
+            # Never fail a prediction over the feedback archive
+            pass
+
+        # Drift sketches (fixed memory, a few bisects per feature)
+        try:
+            observe_prediction(
+                features, prediction.delay_probability, model_variant
             )
+        except Exception:
+            pass
 
         # -----------------------------
         # 6. Decision engine
@@ -184,10 +583,45 @@ def predict(flight_number: str, date: str):
                 }
             )
 
+        # -----------------------------
+        # 6.1 Diversion alternates
+        # -----------------------------
+        if decision["action"] == "CANCEL_OR_DIVERT_RISK":
+            try:
+                alternates = find_alternates(dest_icao, scheduled_arrival)
+            except ValueError:
+                # Destination without coordinates: nothing to suggest
+                alternates = []
+            except Exception as e:
+                raise HTTPException(
+                    status_code=500,
+                    detail={
+                        "layer": "alternate_service",
+                        "message": str(e),
+                        "trace_id": trace_id
+                    }
+                )
+
+            decision = {**decision, "alternates": alternates}
+
+            # Alternates' forecasts are not covered by the ETag above
+            etag = build_etag(
+                get_model_version(model_variant),
+                flight,
+                origin_weather,
+                destination_weather,
+                variant=etag_variant,
+                alternates=alternates
+            )
+            cache_headers["ETag"] = etag
+
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=cache_headers)
+
         # -----------------------------
         # 7. Final response
         # -----------------------------
-        return {
+        body = {
             "trace_id": trace_id,
             "flight": flight,
             "origin_weather": origin_weather,
@@ -197,10 +631,46 @@ def predict(flight_number: str, date: str):
                 "destination_landing_ok": bool(destination_landing_ok)
             },
             "prediction": prediction,
-            "explainability": explainability[:5],
+            "explainability": (
+                explainability[:5] if explainability is not None else None
+            ),
             "decision": decision
         }
 
+        # -----------------------------
+        # 8. Shadow models (after the response is sent)
+        # -----------------------------
+        background = None
+
+        if shadow_enabled():
+            background = BackgroundTask(
+                submit_shadow,
+                trace_id,
+                features,
+                prediction,
+                decision,
+                model_variant,
+                destination_weather,
+                origin_takeoff_ok,
+                destination_landing_ok
+            )
+
+        response = RecordJSONResponse(
+            select_fields(body, selected_fields),
+            headers=cache_headers,
+            background=background
+        )
+
+        # Served in place of a 503 while this worker sheds load
+        remember_response(
+            fallback_key(flight_number, date, fields, model),
+            response.body,
+            etag,
+            trace_id
+        )
+
+        return response
+
     except HTTPException:
         raise
 
@@ -213,3 +683,375 @@ def predict(flight_number: str, date: str):
                 "trace_id": trace_id
             }
         )
+
+
+@app.get("/airport/{icao}/departures")
+def airport_departures(
+    icao: str,
+    date: str,
+    model: str | None = None
+):
+    """
+    Score every departure of an airport on a date (the airport's
+    local date).
+
+    Streams NDJSON: one "flight" line per scored flight (chunk by chunk,
+    most disruptive first within a chunk), then a "ranking" line with
+    the airport-wide order, or an "error" line if scoring fails midway.
+    """
+    trace_id = str(uuid.uuid4())[:8]
+    icao = icao.upper()
+
+    try:
+        model_variant = _deployed_variant(model)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "layer": "request",
+                "message": str(e),
+                "trace_id": trace_id
+            }
+        )
+
+    # -----------------------------
+    # 1. Airport schedule (one upstream query per window)
+    # -----------------------------
+    try:
+        flights = resolve_departures(icao, date)
+    except RateLimitExceeded as e:
+        raise _rate_limited(e, trace_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=502,
+            detail={
+                "layer": "flight_resolver",
+                "message": str(e),
+                "trace_id": trace_id
+            }
+        )
+
+    # -----------------------------
+    # 2. Bulk weather → features → batch inference → decisions
+    # -----------------------------
+    return StreamingResponse(
+        stream_departure_board(
+            icao,
+            date,
+            flights,
+            variant=model_variant,
+            trace_id=trace_id
+        ),
+        media_type="application/x-ndjson",
+        headers={"X-Trace-Id": trace_id}
+    )
+
+
+@app.get("/departure-window")
+def departure_window(
+    flight_number: str,
+    date: str,
+    horizon_h: float = 12,
+    step_min: int = 30,
+    limit: int = 5,
+    model: str | None = None
+):
+    """
+    Alternative departure times for a flight: every candidate slot
+    within the horizon is scored against the origin / destination TAF
+    timelines, and the earliest / best feasible slots are returned.
+    """
+    trace_id = str(uuid.uuid4())[:8]
+
+    try:
+        validate_search(horizon_h, step_min)
+        model_variant = _deployed_variant(model)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "layer": "request",
+                "message": str(e),
+                "trace_id": trace_id
+            }
+        )
+
+    # -----------------------------
+    # 1. Resolve flight details
+    # -----------------------------
+    try:
+        flight = resolve_flight(flight_number, date)
+    except RateLimitExceeded as e:
+        raise _rate_limited(e, trace_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=502,
+            detail={
+                "layer": "flight_resolver",
+                "message": str(e),
+                "trace_id": trace_id
+            }
+        )
+
+    # -----------------------------
+    # 2. TAF timelines → batch inference → ranked slots
+    # -----------------------------
+    try:
+        windows = find_departure_windows(
+            flight,
+            horizon_h=horizon_h,
+            step_min=step_min,
+            limit=limit,
+            variant=model_variant
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "layer": "departure_window",
+                "message": str(e),
+                "trace_id": trace_id
+            }
+        )
+
+    return RecordJSONResponse({
+        "trace_id": trace_id,
+        "flight": flight,
+        **windows
+    })
+
+
+@app.get("/rotations")
+def rotations(
+    date: str,
+    airports: str,
+    model: str | None = None
+):
+    """
+    Delay propagation through aircraft rotations for the departures of
+    the given airports (comma-separated ICAO codes) on a date.
+    """
+    trace_id = str(uuid.uuid4())[:8]
+
+    icaos = [icao.strip().upper() for icao in airports.split(",") if icao.strip()]
+
+    try:
+        if not icaos:
+            raise ValueError("airports must list at least one ICAO code")
+
+        model_variant = _deployed_variant(model)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "layer": "request",
+                "message": str(e),
+                "trace_id": trace_id
+            }
+        )
+
+    # -----------------------------
+    # 1. Legs of the network (one schedule query per airport)
+    # -----------------------------
+    flights = {}
+
+    try:
+        for icao in icaos:
+            for flight in resolve_departures(icao, date):
+                flights[
+                    (flight.flight_number, flight.scheduled_departure)
+                ] = flight
+    except RateLimitExceeded as e:
+        raise _rate_limited(e, trace_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=502,
+            detail={
+                "layer": "flight_resolver",
+                "message": str(e),
+                "trace_id": trace_id
+            }
+        )
+
+    # -----------------------------
+    # 2. Batch scoring → propagation along rotations
+    # -----------------------------
+    try:
+        network = score_network(
+            list(flights.values()),
+            variant=model_variant
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "layer": "rotation_service",
+                "message": str(e),
+                "trace_id": trace_id
+            }
+        )
+
+    return {
+        "trace_id": trace_id,
+        "date": date,
+        "airports": icaos,
+        **network
+    }
+
+
+@app.get("/airport/{icao}/alternates")
+def airport_alternates(
+    icao: str,
+    time: str,
+    k: int = 8,
+    max_range_km: float = 400
+):
+    """
+    Nearest airports to `icao` whose forecast at `time` (ISO, UTC)
+    meets their CAT landing minima.
+    """
+    trace_id = str(uuid.uuid4())[:8]
+    icao = icao.upper()
+
+    try:
+        alternates = find_alternates(
+            icao, time, k=k, max_range_km=max_range_km
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "layer": "request",
+                "message": str(e),
+                "trace_id": trace_id
+            }
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "layer": "alternate_service",
+                "message": str(e),
+                "trace_id": trace_id
+            }
+        )
+
+    return {
+        "trace_id": trace_id,
+        "airport": icao,
+        "time": time,
+        "alternates": alternates
+    }
+
+
+@app.get("/predict/scenarios")
+def predict_scenarios(
+    flight_number: str,
+    date: str,
+    model: str | None = None
+):
+    """
+    Delay risk over every plausible TAF path (BECMG / TEMPO / PROB
+    branches at origin and destination): probability-weighted delay
+    probability plus its spread, from one batched model call.
+    """
+    trace_id = str(uuid.uuid4())[:8]
+
+    try:
+        model_variant = _deployed_variant(model)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "layer": "request",
+                "message": str(e),
+                "trace_id": trace_id
+            }
+        )
+
+    # -----------------------------
+    # 1. Resolve flight details
+    # -----------------------------
+    try:
+        flight = resolve_flight(flight_number, date)
+    except RateLimitExceeded as e:
+        raise _rate_limited(e, trace_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=502,
+            detail={
+                "layer": "flight_resolver",
+                "message": str(e),
+                "trace_id": trace_id
+            }
+        )
+
+    # -----------------------------
+    # 2. TAF paths → one batch inference
+    # -----------------------------
+    try:
+        scenarios = score_scenarios(
+            flight,
+            variant=model_variant
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "layer": "scenario_service",
+                "message": str(e),
+                "trace_id": trace_id
+            }
+        )
+
+    return RecordJSONResponse({
+        "trace_id": trace_id,
+        "flight": flight,
+        **scenarios
+    })
+
+
+class FeedbackRequest(BaseModel):
+    trace_id: str
+    outcome: str
+
+
+@app.post("/feedback")
+def feedback(body: FeedbackRequest):
+    """
+    Report the real outcome (on_time / delayed / diverted / cancelled)
+    of a flight scored by /predict, identified by its trace_id (one of
+    the FEEDBACK_INDEX_SIZE most recent predictions).
+    """
+    try:
+        stored = record_outcome(body.trace_id, body.outcome)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "layer": "request",
+                "message": str(e),
+                "trace_id": body.trace_id
+            }
+        )
+    except KeyError as e:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "layer": "feedback_service",
+                "message": e.args[0],
+                "trace_id": body.trace_id
+            }
+        )
+
+    # Retraining is an admin action (POST /admin/retrain): feedback is
+    # unauthenticated and only ever reported as due here
+    try:
+        due = retrain_due()
+    except Exception:
+        due = False
+
+    return {
+        **stored,
+        "retrain_due": due
+    }
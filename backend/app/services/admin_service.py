@@ -0,0 +1,23 @@
+import os
+import hmac
+
+# -----------------------------
+# Admin access
+# -----------------------------
+# Shared secret for /admin/* endpoints (X-Admin-Token header); unset →
+# the admin surface is disabled
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+def admin_enabled() -> bool:
+    return bool(ADMIN_TOKEN)
+
+
+def is_admin(token: str | None) -> bool:
+    """
+    Constant-time check of a presented admin token.
+    """
+    if not ADMIN_TOKEN or not token:
+        return False
+
+    return hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
@@ -0,0 +1,423 @@
+import os
+import json
+import math
+import uuid
+import time
+import heapq
+import asyncio
+import itertools
+
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers, QueryParams
+
+from .cache_service import TTLCache
+from .rate_limiter import (
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BACKGROUND,
+    PRIORITY_BATCH,
+    PRIORITY_NAMES
+)
+
+# -----------------------------
+# Configuration
+# -----------------------------
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+
+# Requests executing at once, and requests allowed to wait for a slot
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "16"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+
+# Longest queue wait per class before the request is shed (0: admitted
+# only when a slot is free)
+ADMISSION_MAX_WAIT_S = {
+    PRIORITY_INTERACTIVE: float(os.getenv("ADMISSION_MAX_WAIT_S", "2")),
+    PRIORITY_BACKGROUND: float(os.getenv("ADMISSION_BACKGROUND_MAX_WAIT_S", "0")),
+    PRIORITY_BATCH: float(os.getenv("ADMISSION_BATCH_MAX_WAIT_S", "10"))
+}
+
+# Share of the slots in use above which admitted /predict requests are
+# served without SHAP explanations
+ADMISSION_DEGRADE_AT = float(os.getenv("ADMISSION_DEGRADE_AT", "0.75"))
+
+# Last good /predict bodies (trace_id stripped), served (stale) instead
+# of a 503
+ADMISSION_FALLBACK_TTL_S = float(os.getenv("ADMISSION_FALLBACK_TTL_S", "900"))
+
+# Only read while shedding load: first to go under memory pressure
+fallback_cache = TTLCache(
+    "predict_fallback_v2",
+    maxsize=2048,
+    ttl_s=ADMISSION_FALLBACK_TTL_S,
+    shared=False,
+    cost=20.0
+)
+
+QUEUE_BUCKETS_MS = (0, 10, 100, 1000)
+
+
+class Overloaded(Exception):
+    """
+    No execution slot for this request within its class' wait budget.
+    """
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+# -----------------------------
+# Concurrency limiter
+# -----------------------------
+class AdmissionController:
+    """
+    Concurrency limit with a bounded priority queue, run on the event
+    loop (waiting requests hold no worker thread).
+
+    A freed slot goes to the highest-priority waiter. When the queue is
+    full, a newcomer evicts the lowest-priority waiter if it outranks
+    it, and is shed otherwise.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+
+        self.active = 0
+        self._waiters = []  # heap of (priority, seq, future)
+        self._queued = 0
+        self._seq = itertools.count()
+
+        # Exponentially weighted mean service time (Retry-After hint)
+        self._service_s = 0.1
+
+        self._stats = {
+            name: {
+                "admitted": 0,
+                "shed": 0,
+                "evicted": 0,
+                "degraded": 0,
+                "served_stale": 0,
+                "queued": 0,
+                "total_queue_ms": 0.0,
+                "max_queue_ms": 0.0,
+                "queue_ms_buckets": {f"<{b}": 0 for b in QUEUE_BUCKETS_MS[1:]}
+                | {f">={QUEUE_BUCKETS_MS[-1]}": 0}
+            }
+            for name in PRIORITY_NAMES.values()
+        }
+
+    def retry_after_s(self) -> float:
+        return (self._queued + 1) * self._service_s / self.max_concurrent
+
+    def _shed(self, priority: int, message: str):
+        self._stats[PRIORITY_NAMES[priority]]["shed"] += 1
+        return Overloaded(message, self.retry_after_s())
+
+    def _record_wait(self, priority: int, waited_s: float):
+        stats = self._stats[PRIORITY_NAMES[priority]]
+        waited_ms = waited_s * 1000
+
+        stats["admitted"] += 1
+
+        if waited_ms > 0:
+            stats["queued"] += 1
+            stats["total_queue_ms"] += waited_ms
+            stats["max_queue_ms"] = max(stats["max_queue_ms"], waited_ms)
+
+        for bound in QUEUE_BUCKETS_MS[1:]:
+            if waited_ms < bound:
+                stats["queue_ms_buckets"][f"<{bound}"] += 1
+                break
+        else:
+            stats["queue_ms_buckets"][f">={QUEUE_BUCKETS_MS[-1]}"] += 1
+
+    def _evict_lowest(self, priority: int) -> bool:
+        pending = [w for w in self._waiters if not w[2].done()]
+
+        if not pending:
+            return False
+
+        lowest = max(pending, key=lambda w: (w[0], w[1]))
+
+        if lowest[0] <= priority:
+            return False
+
+        self._stats[PRIORITY_NAMES[lowest[0]]]["evicted"] += 1
+        lowest[2].set_exception(
+            Overloaded("Evicted by higher-priority traffic", self.retry_after_s())
+        )
+        self._queued -= 1
+
+        self._waiters = [w for w in pending if w is not lowest]
+        heapq.heapify(self._waiters)
+
+        return True
+
+    async def acquire(self, priority: int) -> float:
+        """
+        Wait for an execution slot.
+
+        Returns
+        -------
+        float
+            Seconds spent queued
+
+        Raises
+        ------
+        Overloaded
+            Queue full, wait budget exceeded or evicted
+        """
+        if self.active < self.max_concurrent and not self._queued:
+            self.active += 1
+            self._record_wait(priority, 0.0)
+            return 0.0
+
+        max_wait_s = ADMISSION_MAX_WAIT_S[priority]
+
+        if max_wait_s <= 0:
+            raise self._shed(priority, "No free slot for background work")
+
+        if self._queued >= self.max_queue and not self._evict_lowest(priority):
+            raise self._shed(priority, "Admission queue full")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._queued += 1
+
+        start = time.monotonic()
+
+        try:
+            # A slot handed over by release() resolves the future
+            await asyncio.wait_for(future, timeout=max_wait_s)
+        except asyncio.TimeoutError:
+            self._queued -= 1
+            raise self._shed(priority, "Timed out waiting for admission")
+        except Overloaded:
+            # Evicted (already counted)
+            raise
+        except asyncio.CancelledError:
+            # Client went away: give back a slot handed over meanwhile
+            # (no request ran: the service time estimate is unchanged)
+            if future.cancelled():
+                self._queued -= 1
+            elif future.exception() is None:
+                self.release()
+            raise
+
+        waited_s = time.monotonic() - start
+        self._record_wait(priority, waited_s)
+
+        return waited_s
+
+    def release(self, service_s: float | None = None):
+        if service_s is not None:
+            self._service_s = 0.9 * self._service_s + 0.1 * service_s
+
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+
+            if not future.done():
+                # Hand the slot over: `active` is unchanged
+                self._queued -= 1
+                future.set_result(None)
+                return
+
+        self.active -= 1
+
+    def pressure(self) -> bool:
+        """
+        True when the service is close to saturation.
+        """
+        return (
+            self._queued > 0
+            or self.active >= ADMISSION_DEGRADE_AT * self.max_concurrent
+        )
+
+    def count(self, priority: int, key: str):
+        self._stats[PRIORITY_NAMES[priority]][key] += 1
+
+    def stats(self) -> dict:
+        classes = {}
+
+        for name, s in self._stats.items():
+            classes[name] = {
+                **s,
+                "mean_queue_ms": (
+                    round(s["total_queue_ms"] / s["queued"], 2)
+                    if s["queued"] else 0.0
+                ),
+                "total_queue_ms": round(s["total_queue_ms"], 1),
+                "max_queue_ms": round(s["max_queue_ms"], 1),
+                "queue_ms_buckets": dict(s["queue_ms_buckets"])
+            }
+
+        return {
+            "enabled": ADMISSION_ENABLED,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": self._queued,
+            "mean_service_ms": round(self._service_s * 1000, 1),
+            "classes": classes
+        }
+
+
+controller = AdmissionController(ADMISSION_MAX_CONCURRENT, ADMISSION_MAX_QUEUE)
+
+
+def admission_stats() -> dict:
+    return controller.stats()
+
+
+# -----------------------------
+# Request classes
+# -----------------------------
+_CLASS_HEADER = {
+    "background": PRIORITY_BACKGROUND,
+    "batch": PRIORITY_BATCH
+}
+
+
+def request_priority(path: str, headers: Headers):
+    """
+    Priority class of a request (None: not admission-controlled).
+    Clients may lower their class with X-Request-Class, never raise it.
+    """
+    if path in ("/predict", "/predict/scenarios", "/departure-window"):
+        priority = PRIORITY_INTERACTIVE
+    elif path.startswith("/airport/") and path.endswith("/alternates"):
+        priority = PRIORITY_INTERACTIVE
+    elif path == "/rotations" or (
+        path.startswith("/airport/") and path.endswith("/departures")
+    ):
+        priority = PRIORITY_BATCH
+    else:
+        # Probes, stats, feedback and admin are never shed
+        return None
+
+    requested = _CLASS_HEADER.get(headers.get("x-request-class", "").lower())
+
+    if requested is not None:
+        priority = max(priority, requested)
+
+    return priority
+
+
+# -----------------------------
+# Stale /predict fallback
+# -----------------------------
+def fallback_key(flight_number, date, fields=None, model=None) -> tuple:
+    """
+    Identify a /predict representation, explain aside (a response
+    without explanations is an acceptable degraded answer).
+    """
+    return (flight_number, date, fields or None, model or None)
+
+
+def _trace_prefix(trace_id: str) -> bytes:
+    # Bodies open with their trace_id (select_fields always keeps it)
+    return b'{"trace_id":' + json.dumps(trace_id).encode() + b","
+
+
+def remember_response(
+    key: tuple, body: bytes, etag: str | None, trace_id: str
+):
+    """
+    Keep a /predict body for stale serving, without its trace_id: it
+    identifies that request (e.g. for /feedback), not a later one.
+    """
+    prefix = _trace_prefix(trace_id)
+
+    if body.startswith(prefix):
+        fallback_cache.set(key, (body[len(prefix):], etag))
+
+
+def _fallback_response(scope: dict, priority: int):
+    if scope["path"] != "/predict":
+        return None
+
+    params = QueryParams(scope.get("query_string", b""))
+
+    cached = fallback_cache.get(fallback_key(
+        params.get("flight_number"),
+        params.get("date"),
+        params.get("fields"),
+        params.get("model")
+    ))
+
+    if cached is None:
+        return None
+
+    body, etag = cached
+    controller.count(priority, "served_stale")
+
+    # A fresh trace_id: this response scored nothing
+    body = _trace_prefix(str(uuid.uuid4())[:8]) + body
+
+    headers = {"X-Degraded": "stale", "Warning": '110 - "Response is Stale"'}
+    if etag:
+        headers["ETag"] = etag
+
+    return Response(body, media_type="application/json", headers=headers)
+
+
+# -----------------------------
+# ASGI middleware
+# -----------------------------
+class AdmissionMiddleware:
+    """
+    Admits requests into the app under the concurrency limit.
+
+    Shed requests get 503 + Retry-After, or the last good /predict body
+    for the same flight when there is one. Requests admitted under
+    pressure are flagged (request.state.admission["degraded"]) so the
+    endpoint can skip optional work.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ADMISSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        priority = request_priority(scope["path"], Headers(scope=scope))
+
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            waited_s = await controller.acquire(priority)
+        except Overloaded as e:
+            response = _fallback_response(scope, priority) or JSONResponse(
+                {
+                    "detail": {
+                        "layer": "admission",
+                        "message": str(e),
+                        "trace_id": None
+                    }
+                },
+                status_code=503,
+                headers={"Retry-After": str(e.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+
+        degraded = controller.pressure()
+        if degraded:
+            controller.count(priority, "degraded")
+
+        scope.setdefault("state", {})["admission"] = {
+            "priority": PRIORITY_NAMES[priority],
+            "queue_ms": round(waited_s * 1000, 1),
+            "degraded": degraded
+        }
+
+        start = time.monotonic()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(time.monotonic() - start)
@@ -0,0 +1,128 @@
+import os
+import json
+import threading
+import numpy as np
+
+from .weather_service import get_weather_risk_bulk
+from .minima_service import get_airport_category, check_landing_feasible_batch
+
+# -----------------------------
+# Airport coordinates
+# -----------------------------
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # app/
+COORDINATES_FILE = os.path.join(BASE_DIR, "data", "airport_coordinates.json")
+
+EARTH_RADIUS_KM = 6371.0
+
+# Nearest airports considered, and how far an alternate may be
+ALTERNATE_K = int(os.getenv("ALTERNATE_K", "8"))
+ALTERNATE_MAX_RANGE_KM = float(os.getenv("ALTERNATE_MAX_RANGE_KM", "400"))
+
+with open(COORDINATES_FILE, "r") as f:
+    AIRPORT_COORDINATES = json.load(f)
+
+_index = None
+_lock = threading.Lock()
+
+
+def _get_index():
+    """
+    Ball tree (haversine metric) over airport lat/lon, built on first use.
+
+    Returns
+    -------
+    tuple
+        (BallTree, ICAO codes aligned with the tree's points)
+    """
+    global _index
+
+    if _index is None:
+        with _lock:
+            if _index is None:
+                # sklearn is already a dependency of the model; imported
+                # lazily to keep it off the startup path
+                from sklearn.neighbors import BallTree
+
+                icaos = list(AIRPORT_COORDINATES)
+                points = np.radians([
+                    [AIRPORT_COORDINATES[icao]["lat"],
+                     AIRPORT_COORDINATES[icao]["lon"]]
+                    for icao in icaos
+                ])
+
+                _index = (BallTree(points, metric="haversine"), icaos)
+
+    return _index
+
+
+def nearest_airports(icao: str, k: int = ALTERNATE_K, max_range_km: float = ALTERNATE_MAX_RANGE_KM):
+    """
+    Up to k airports nearest to `icao` (itself excluded) within range.
+
+    Returns
+    -------
+    list[tuple[str, float]]
+        (ICAO, great-circle distance km), nearest first
+    """
+    if icao not in AIRPORT_COORDINATES:
+        raise ValueError(f"No coordinates for airport {icao}")
+
+    tree, icaos = _get_index()
+
+    point = np.radians([[
+        AIRPORT_COORDINATES[icao]["lat"],
+        AIRPORT_COORDINATES[icao]["lon"]
+    ]])
+
+    k = min(k + 1, len(icaos))
+    distances, indices = tree.query(point, k=k)
+
+    return [
+        (icaos[i], float(d * EARTH_RADIUS_KM))
+        for d, i in zip(distances[0], indices[0])
+        if icaos[i] != icao and d * EARTH_RADIUS_KM <= max_range_km
+    ]
+
+
+def find_alternates(
+    icao: str,
+    event_time: str,
+    k: int = ALTERNATE_K,
+    max_range_km: float = ALTERNATE_MAX_RANGE_KM
+):
+    """
+    Feasible diversion alternates for a destination at an arrival time:
+    nearest airports in range, weather fetched in bulk (one TAF request
+    for all candidates), filtered by CAT landing minima.
+
+    Returns
+    -------
+    list[dict]
+        Feasible alternates, nearest first
+    """
+    candidates = nearest_airports(icao, k=k, max_range_km=max_range_km)
+
+    if not candidates:
+        return []
+
+    weathers = get_weather_risk_bulk(
+        [(alternate, event_time) for alternate, _ in candidates]
+    )
+
+    vis = [w.taf_min_vis_km for w in weathers]
+    landing_ok = check_landing_feasible_batch(
+        [alternate for alternate, _ in candidates], vis
+    )
+
+    return [
+        {
+            "icao": alternate,
+            "distance_km": round(distance, 1),
+            "category": get_airport_category(alternate),
+            "taf_min_vis_km": min_vis,
+            "weather_source": weather.weather_source
+        }
+        for (alternate, distance), weather, min_vis, ok
+        in zip(candidates, weathers, vis, landing_ok)
+        if ok
+    ]
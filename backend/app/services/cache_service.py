@@ -0,0 +1,805 @@
+import os
+import zlib
+import fcntl
+import pickle
+import sqlite3
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from .config import BACKEND_DIR
+from .memory_service import budget, estimate_size
+
+# -----------------------------
+# Shared (cross-worker) tier
+# -----------------------------
+# sqlite → one WAL-mode database file shared by every worker on the host
+# none   → in-process caches only
+SHARED_CACHE_BACKEND = os.getenv("SHARED_CACHE_BACKEND", "sqlite").lower()
+
+# Values are unpickled on read: the file must only be writable by the
+# service user (created 0600 in a 0700 directory, refused otherwise)
+SHARED_CACHE_PATH = os.getenv(
+    "SHARED_CACHE_PATH",
+    os.path.join(BACKEND_DIR, "data", "cache", "shared.sqlite")
+)
+
+# Expired rows are purged every N writes
+SHARED_CACHE_PURGE_EVERY = int(os.getenv("SHARED_CACHE_PURGE_EVERY", "500"))
+
+# Bump when a cached value's layout changes in a way pickle cannot see;
+# record class changes are picked up from records.py automatically
+CACHE_SCHEMA_VERSION = "1"
+
+# -----------------------------
+# On-disk snapshot (warm restarts)
+# -----------------------------
+
+CACHE_SNAPSHOT_ENABLED = os.getenv("CACHE_SNAPSHOT_ENABLED", "true").lower() == "true"
+
+CACHE_SNAPSHOT_PATH = os.getenv(
+    "CACHE_SNAPSHOT_PATH",
+    os.path.join(BACKEND_DIR, "data", "cache", "snapshot.bin")
+)
+
+# Periodic snapshots on top of the one at graceful shutdown (0: off)
+CACHE_SNAPSHOT_INTERVAL_S = float(os.getenv("CACHE_SNAPSHOT_INTERVAL_S", "300"))
+
+SNAPSHOT_MAGIC = b"LVCS2"
+
+
+def _schema_tag() -> str:
+    """
+    Version of the cached value layouts: entries written under another
+    tag (an older deploy) are never unpickled.
+    """
+    with open(os.path.join(os.path.dirname(__file__), "records.py"), "rb") as f:
+        records_hash = hashlib.sha256(f.read()).hexdigest()[:8]
+
+    return f"{CACHE_SCHEMA_VERSION}.{records_hash}"
+
+
+SCHEMA_TAG = _schema_tag()
+
+# -----------------------------
+# Cache registry (name → cache), for warm-up and reporting
+# -----------------------------
+CACHES = {}
+
+# Snapshot entries of caches not constructed yet (lazily imported
+# modules): handed over when the cache registers
+_pending_restore = {}
+
+
+class SharedStore:
+    """
+    Key/value store in a SQLite database (WAL mode), shared by all
+    worker processes on the host. Values are pickled; expiry is the
+    same absolute timestamp the in-process tier uses.
+
+    The shared tier is best-effort: any SQLite or decode error is a miss.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+
+        _check_private(path)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, expires_at REAL, value BLOB)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "name TEXT PRIMARY KEY, tokens REAL, updated REAL, "
+                "paused_until REAL, quota_remaining INTEGER, "
+                "quota_reset_at REAL)"
+            )
+            conn.commit()
+            self._local.conn = conn
+
+        return conn
+
+    def get(self, key: str):
+        """
+        Returns
+        -------
+        tuple | None
+            (expires_at, value), or None on a miss
+        """
+        try:
+            row = self._connection().execute(
+                "SELECT expires_at, value FROM cache "
+                "WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            return row[0], pickle.loads(row[1])
+        except Exception:
+            # Corrupt row or a class that no longer unpickles
+            return None
+
+    def set(self, key: str, expires_at: float, value):
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, expires_at, value) "
+                "VALUES (?, ?, ?)",
+                (key, expires_at, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+            )
+
+            self._writes += 1
+            if self._writes % SHARED_CACHE_PURGE_EVERY == 0:
+                conn.execute(
+                    "DELETE FROM cache WHERE expires_at <= ?", (time.time(),)
+                )
+
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+
+    # -- token buckets (rate_limiter) -------------------------------------
+    def take_token(self, name: str, rate_per_s: float, burst: int):
+        """
+        Take a token from a host-wide bucket (wall-clock refill).
+
+        Returns
+        -------
+        float | None
+            0.0 if a token was taken, else seconds until one may be;
+            None on a SQLite error (caller falls back to its own bucket)
+        """
+        try:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+
+            try:
+                row = conn.execute(
+                    "SELECT tokens, updated, paused_until FROM buckets "
+                    "WHERE name = ?",
+                    (name,)
+                ).fetchone()
+
+                now = time.time()
+                tokens, updated, paused_until = row or (None, now, 0.0)
+
+                if tokens is None:
+                    # New bucket (or one only holding quota) starts full
+                    tokens, updated = burst, now
+
+                tokens = min(burst, tokens + (now - updated) * rate_per_s)
+
+                if now < paused_until:
+                    wait = paused_until - now
+                elif tokens >= 1:
+                    tokens -= 1
+                    wait = 0.0
+                else:
+                    wait = (1 - tokens) / rate_per_s
+
+                conn.execute(
+                    "INSERT INTO buckets (name, tokens, updated, paused_until) "
+                    "VALUES (?, ?, ?, ?) ON CONFLICT(name) DO UPDATE SET "
+                    "tokens = excluded.tokens, updated = excluded.updated",
+                    (name, tokens, now, paused_until)
+                )
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+            return wait
+        except sqlite3.Error:
+            return None
+
+    def pause_bucket(self, name: str, until: float):
+        """
+        Grant no tokens from a bucket before `until` (epoch seconds).
+        """
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO buckets (name, tokens, updated, paused_until) "
+                "VALUES (?, 0, ?, ?) ON CONFLICT(name) DO UPDATE SET "
+                "tokens = 0, updated = excluded.updated, "
+                "paused_until = MAX(paused_until, excluded.paused_until)",
+                (name, time.time(), until)
+            )
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def set_quota(self, name: str, remaining: int, reset_at: float | None):
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO buckets (name, tokens, updated, paused_until, "
+                "quota_remaining, quota_reset_at) VALUES (?, NULL, ?, 0, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET "
+                "quota_remaining = excluded.quota_remaining, "
+                "quota_reset_at = COALESCE(excluded.quota_reset_at, quota_reset_at)",
+                (name, time.time(), remaining, reset_at)
+            )
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def quota(self, name: str):
+        """
+        Returns
+        -------
+        tuple | None
+            (remaining, reset_at) last reported by any worker, or None
+        """
+        try:
+            row = self._connection().execute(
+                "SELECT quota_remaining, quota_reset_at FROM buckets "
+                "WHERE name = ? AND quota_remaining IS NOT NULL",
+                (name,)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+
+        return tuple(row) if row else None
+
+
+def _check_owner(target: str, st):
+    if st.st_uid != os.getuid() or st.st_mode & 0o022:
+        raise PermissionError(
+            f"{target} must be owned by this user and not group/world "
+            "writable: its contents are unpickled"
+        )
+
+
+def _private_dir(path: str) -> str:
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    _check_owner(directory, os.stat(directory))
+    return directory
+
+
+def _check_private(path: str):
+    """
+    Create a cache file (0600, in a 0700 directory) or check that an
+    existing one is owned by this user and not writable by others:
+    anyone able to write it could run code in every worker. Applies to
+    the shared store and to snapshots.
+
+    Raises
+    ------
+    PermissionError
+        The file (or its directory) is not private to this user
+    """
+    _private_dir(path)
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+    try:
+        _check_owner(path, os.fstat(fd))
+    finally:
+        os.close(fd)
+
+
+def _read_private(path: str) -> bytes:
+    """
+    Contents of an existing cache file, after the _check_private checks
+    (on the opened file, so it cannot be swapped in between).
+
+    Raises
+    ------
+    FileNotFoundError
+        No such file
+    PermissionError
+        The file (or its directory) is not private to this user
+    """
+    fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+
+    with os.fdopen(fd, "rb") as f:
+        _check_owner(path, os.fstat(f.fileno()))
+        _private_dir(path)
+        return f.read()
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+_shared_state = {"error": None}
+
+
+def get_shared_store():
+    """
+    The host-wide shared store (None when the shared tier is disabled).
+    """
+    global _shared_store
+
+    if SHARED_CACHE_BACKEND != "sqlite":
+        return None
+
+    if _shared_store is None:
+        with _shared_lock:
+            if _shared_store is None:
+                try:
+                    _shared_store = SharedStore(SHARED_CACHE_PATH)
+                except OSError as e:
+                    # Unsafe or unusable path: run with local caches only
+                    _shared_store = False
+                    _shared_state["error"] = str(e)
+
+    return _shared_store or None
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry expiry.
+
+    Two-tier: an in-process LRU in front of the host-wide shared store,
+    so N workers do not each miss on the same TAF / flight. Hits in the
+    shared tier are copied into the local one.
+
+    Expiry is an absolute wall-clock timestamp, so it stays meaningful
+    across processes / restarts (e.g. a TAF's validity end).
+
+    `persist` caches are written to the on-disk snapshot and reloaded
+    by the next process.
+
+    Local entries are charged to the worker memory budget; `cost` is
+    the relative cost (~ms) of recomputing one, which weighs the
+    budget's size-aware eviction across caches.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        ttl_s: float,
+        shared: bool = True,
+        persist: bool = True,
+        cost: float = 100.0
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self.shared = shared
+        self.persist = persist
+        self.cost = cost
+
+        self._data = OrderedDict()  # key → (expires_at, value)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+        self._owner = f"cache:{name}"
+        budget.register(self._owner, self._discard)
+
+        CACHES[name] = self
+
+        entries = _pending_restore.pop(name, None)
+        if entries is not None and persist:
+            self.restore(entries)
+
+    def _shared_key(self, key) -> str:
+        return f"{SCHEMA_TAG}:{self.name}:{key!r}"
+
+    def _set_local(self, key, expires_at: float, value):
+        size = estimate_size((key, value))
+
+        # Accounting changes with the entries, under the cache lock;
+        # evictions (which may come back to this cache through
+        # _discard) run once it is released
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                budget.release(self._owner, self._data.popitem(last=False)[0])
+
+            victims = budget.charge(self._owner, key, size, self.cost)
+
+        budget.evict(victims)
+
+    def _discard(self, key):
+        """
+        Evicted by the memory budget.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+            budget.release(self._owner, key)
+
+    def get(self, key, default=None):
+        now = time.time()
+
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                hit = True
+            else:
+                hit = False
+
+                if entry is not None:
+                    del self._data[key]
+                    budget.release(self._owner, key)
+
+        if hit:
+            budget.touch(self._owner, key)
+            return entry[1]
+
+        store = get_shared_store() if self.shared else None
+        entry = store.get(self._shared_key(key)) if store else None
+
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return default
+
+        self._set_local(key, *entry)
+
+        with self._lock:
+            self.shared_hits += 1
+
+        return entry[1]
+
+    def set(self, key, value, ttl_s: float | None = None):
+        ttl_s = self.ttl_s if ttl_s is None else ttl_s
+
+        if ttl_s <= 0:
+            return
+
+        expires_at = time.time() + ttl_s
+        self._set_local(key, expires_at, value)
+
+        store = get_shared_store() if self.shared else None
+        if store:
+            store.set(self._shared_key(key), expires_at, value)
+
+    def __len__(self):
+        return len(self._data)
+
+    def snapshot(self) -> list:
+        """
+        Unexpired entries as (key, expires_at, value), least recently
+        used first.
+        """
+        now = time.time()
+
+        with self._lock:
+            return [
+                (key, expires_at, value)
+                for key, (expires_at, value) in self._data.items()
+                if expires_at > now
+            ]
+
+    def restore(self, entries: list) -> int:
+        """
+        Load snapshot entries still valid now (entries already present
+        are newer and kept). Returns the number loaded.
+        """
+        now = time.time()
+        loaded = 0
+        victims = []
+
+        with self._lock:
+            for key, expires_at, value in entries[-self.maxsize:]:
+                if expires_at <= now or key in self._data:
+                    continue
+
+                # Snapshot entries are older than anything cached since
+                # startup: least recently used end
+                self._data[key] = (expires_at, value)
+                self._data.move_to_end(key, last=False)
+                loaded += 1
+
+                victims += budget.charge(
+                    self._owner, key, estimate_size((key, value)), self.cost
+                )
+
+            while len(self._data) > self.maxsize:
+                budget.release(self._owner, self._data.popitem(last=False)[0])
+
+        budget.evict(victims)
+
+        return loaded
+
+    def stats(self) -> dict:
+        hits = self.hits + self.shared_hits
+        lookups = hits + self.misses
+
+        return {
+            "entries": len(self._data),
+            "bytes": budget.owner_bytes(self._owner),
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 3) if lookups else None
+        }
+
+
+def cache_stats() -> dict:
+    """
+    Hit / miss counters of every registered cache (this worker).
+    """
+    return {
+        "shared_backend": SHARED_CACHE_BACKEND,
+        "shared_error": _shared_state["error"],
+        "caches": {name: cache.stats() for name, cache in CACHES.items()},
+        "snapshot": (
+            dict(_snapshot_state) if CACHE_SNAPSHOT_ENABLED else {"enabled": False}
+        )
+    }
+
+
+# -----------------------------
+# Snapshot save / load
+# -----------------------------
+_snapshot_state = {
+    "path": CACHE_SNAPSHOT_PATH,
+    "loaded": None,
+    "saved": None
+}
+_snapshot_lock = threading.Lock()
+_snapshot_stop = threading.Event()
+
+
+def _read_snapshot(path: str) -> dict:
+    """
+    Parse a snapshot file (private, see _read_private).
+
+    File layout: magic, schema tag and newline, then a zlib-compressed
+    pickle of {cache name: pickled entry list}. Caches are pickled
+    separately so one unpicklable value only costs its own cache.
+
+    Returns
+    -------
+    dict
+        {"status": "ok", "caches": ..., "bytes": ...} or a status
+        ("missing", "stale_schema", "error") with a detail
+    """
+    try:
+        payload = _read_private(path)
+    except FileNotFoundError:
+        return {"status": "missing"}
+    except OSError as e:
+        # Not private to this user (or a symlink): never unpickled
+        return {"status": "error", "detail": str(e)}
+
+    if not payload.startswith(SNAPSHOT_MAGIC):
+        return {"status": "error", "detail": "not a cache snapshot"}
+
+    tag, _, body = payload[len(SNAPSHOT_MAGIC):].partition(b"\n")
+
+    if tag.decode(errors="replace") != SCHEMA_TAG:
+        return {"status": "stale_schema", "detail": tag.decode(errors="replace")}
+
+    try:
+        caches = pickle.loads(zlib.decompress(body))
+    except Exception as e:
+        return {"status": "error", "detail": str(e)}
+
+    return {"status": "ok", "caches": caches, "bytes": len(payload)}
+
+
+def _merge_entries(saved: list, current: list, maxsize: int | None) -> list:
+    """
+    Entries of another worker's save merged with ours: one per key (the
+    latest expiry), ours most recently used, unexpired only.
+    """
+    now = time.time()
+    merged = OrderedDict()
+
+    for key, expires_at, value in saved + current:
+        if expires_at <= now:
+            continue
+        if key in merged and merged[key][0] > expires_at:
+            continue
+
+        merged[key] = (expires_at, value)
+        merged.move_to_end(key)
+
+    entries = [(key, expires_at, value) for key, (expires_at, value) in merged.items()]
+
+    return entries[-maxsize:] if maxsize else entries
+
+
+def save_snapshot(path: str = CACHE_SNAPSHOT_PATH) -> dict:
+    """
+    Merge every persistent cache into the snapshot at `path` (atomic
+    replace). Workers share one file: each save keeps the entries other
+    workers saved (under a file lock) instead of overwriting them.
+    """
+    start = time.perf_counter()
+    entries = 0
+    errors = []
+
+    current = {}
+    for name, cache in list(CACHES.items()):
+        if cache.persist:
+            current[name] = cache.snapshot()
+
+    with _snapshot_lock:
+        _private_dir(path)
+
+        lock_fd = os.open(
+            f"{path}.lock", os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600
+        )
+
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+
+            # A snapshot that is stale, corrupt or not private is
+            # replaced, not merged
+            saved_caches = _read_snapshot(path).get("caches", {})
+            caches = {}
+
+            for name in set(current) | set(saved_caches):
+                try:
+                    saved_entries = (
+                        pickle.loads(saved_caches[name])
+                        if name in saved_caches else []
+                    )
+                except Exception:
+                    # e.g. a class that no longer unpickles: ours only
+                    saved_entries = []
+
+                cache = CACHES.get(name)
+                merged = _merge_entries(
+                    saved_entries,
+                    current.get(name, []),
+                    cache.maxsize if cache is not None else None
+                )
+
+                try:
+                    caches[name] = pickle.dumps(merged, pickle.HIGHEST_PROTOCOL)
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
+                    continue
+
+                entries += len(merged)
+
+            payload = SNAPSHOT_MAGIC + SCHEMA_TAG.encode() + b"\n" + zlib.compress(
+                pickle.dumps(caches, pickle.HIGHEST_PROTOCOL), 1
+            )
+
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            fd = os.open(
+                tmp_path,
+                os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW,
+                0o600
+            )
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        finally:
+            os.close(lock_fd)
+
+    result = {
+        "saved_at": time.time(),
+        "entries": entries,
+        "bytes": len(payload),
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+        "errors": errors
+    }
+    _snapshot_state["saved"] = result
+
+    return result
+
+
+def load_snapshot(path: str = CACHE_SNAPSHOT_PATH) -> dict:
+    """
+    Reload a snapshot written by a previous process. Entries past their
+    expiry (TTL or TAF validity end) are dropped; caches not created
+    yet receive theirs when they register.
+    """
+    start = time.perf_counter()
+
+    snapshot = _read_snapshot(path)
+
+    if snapshot["status"] != "ok":
+        _snapshot_state["loaded"] = snapshot
+        return snapshot
+
+    caches = snapshot["caches"]
+    loaded = 0
+    expired = 0
+    errors = []
+
+    for name, blob in caches.items():
+        try:
+            entries = pickle.loads(blob)
+        except Exception as e:
+            # e.g. a record class changed between releases
+            errors.append(f"{name}: {e}")
+            continue
+
+        now = time.time()
+        live = [entry for entry in entries if entry[1] > now]
+        expired += len(entries) - len(live)
+
+        cache = CACHES.get(name)
+
+        if cache is None:
+            _pending_restore[name] = live
+            loaded += len(live)
+        elif cache.persist:
+            loaded += cache.restore(live)
+
+    result = {
+        "status": "ok",
+        "entries": loaded,
+        "expired": expired,
+        "bytes": snapshot["bytes"],
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+        "errors": errors
+    }
+    _snapshot_state["loaded"] = result
+
+    return result
+
+
+def _snapshot_loop(interval_s: float):
+    while not _snapshot_stop.wait(interval_s):
+        try:
+            save_snapshot()
+        except Exception:
+            pass
+
+
+def start_snapshots() -> dict:
+    """
+    Startup: reload the previous snapshot, then save periodically.
+    """
+    if not CACHE_SNAPSHOT_ENABLED:
+        return {"status": "disabled"}
+
+    result = load_snapshot()
+
+    if CACHE_SNAPSHOT_INTERVAL_S > 0:
+        _snapshot_stop.clear()
+        threading.Thread(
+            target=_snapshot_loop,
+            args=(CACHE_SNAPSHOT_INTERVAL_S,),
+            name="cache-snapshot",
+            daemon=True
+        ).start()
+
+    return result
+
+
+def stop_snapshots():
+    """
+    Graceful shutdown: stop the periodic saver and write a final snapshot.
+    """
+    if not CACHE_SNAPSHOT_ENABLED:
+        return
+
+    _snapshot_stop.set()
+
+    try:
+        save_snapshot()
+    except Exception:
+        pass
+
+
+def ttl_until(valid_to_epoch: float | None, ttl_s: float) -> float:
+    """
+    Cache TTL capped at the end of a forecast's validity.
+    """
+    if valid_to_epoch is None:
+        return ttl_s
+
+    return min(ttl_s, valid_to_epoch - time.time())
@@ -0,0 +1,13 @@
+import os
+
+# -----------------------------
+# Shared paths
+# -----------------------------
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+# Synthetic training data (train_delay_model.py): drift baseline,
+# retrain replay / holdout, TreeSHAP benchmark
+DATASET_PATH = os.getenv(
+    "DATASET_PATH",
+    os.path.join(BACKEND_DIR, "data", "synthetic_delay_dataset.csv")
+)
@@ -1,128 +1,283 @@
-def recommend_action(
-    prediction: dict,
-    origin_weather: dict,
-    destination_weather: dict,
-    origin_takeoff_ok: int,
-    destination_landing_ok: int
-):
+import json
+import os
+
+import numpy as np
+
+from .records import Prediction, WeatherFeatures
+
+# -----------------------------
+# Threshold table
+# -----------------------------
+# JSON config by default; point DECISION_THRESHOLDS_PATH at
+# app/models/decision_thresholds.pkl (or another table) to swap it.
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # app/
+DEFAULT_THRESHOLDS_PATH = os.path.join(
+    BASE_DIR, "data", "decision_thresholds.json"
+)
+THRESHOLDS_PATH = os.getenv("DECISION_THRESHOLDS_PATH", DEFAULT_THRESHOLDS_PATH)
+
+# Posture bands, in order: each key is the band's upper delay_probability
+POSTURE_KEYS = ("NO_ACTION", "MONITOR", "PREPARE", "RESCHEDULE")
+
+DEFAULT_THRESHOLDS = {
+    "posture": {
+        "NO_ACTION": 0.2,
+        "MONITOR": 0.4,
+        "PREPARE": 0.6,
+        "RESCHEDULE": 0.8
+    },
+    "destination_override": {
+        "max_vis_km": 0.2,
+        "min_fog_probability": 0.8,
+        "max_volatility": 0.4,
+        "min_delay_probability": 0.6
+    }
+}
+
+
+def load_thresholds(path: str = THRESHOLDS_PATH) -> dict:
     """
-    ML-centered OCC decision engine.
+    Load a threshold table from JSON or a pickled artifact.
 
-    Tone:
-    - Technical
-    - Operationally neutral
-    - Airline-standard OCC phrasing
+    A flat mapping (the format of decision_thresholds.pkl) is read as
+    the posture table; missing entries fall back to DEFAULT_THRESHOLDS.
     """
+    if path.endswith(".json"):
+        with open(path, "r") as f:
+            table = json.load(f)
+    else:
+        import joblib
 
-    delay_prob = float(prediction.get("delay_probability", 0.0))
+        table = joblib.load(path)
 
-    o_vis = origin_weather.get("taf_min_vis_km", 10.0)
-    d_vis = destination_weather.get("taf_min_vis_km", 10.0)
-    d_fog = destination_weather.get("taf_fog_probability", 0.0)
-    d_vol = destination_weather.get("taf_volatility", 0.0)
+    if "posture" not in table:
+        table = {"posture": table}
 
-    # -------------------------------------------------
+    return {
+        section: {**defaults, **table.get(section, {})}
+        for section, defaults in DEFAULT_THRESHOLDS.items()
+    }
+
+
+# -----------------------------
+# Rule table (index = rule id)
+# -----------------------------
+RULES = (
     # LAYER 1: HARD OPERATIONAL CONSTRAINTS
-    # -------------------------------------------------
-
-    if not origin_takeoff_ok:
-        return {
-            "action": "CANCEL_OR_HOLD",
-            "reason": (
-                "Dispatch not supported due to prevailing takeoff conditions "
-                "at origin"
-            )
-        }
-
-    if not destination_landing_ok:
-        return {
-            "action": "CANCEL_OR_DIVERT_RISK",
-            "reason": (
-                "Arrival constraints indicate elevated diversion likelihood "
-                "at destination"
-            )
-        }
+    (
+        "CANCEL_OR_HOLD",
+        "Dispatch not supported due to prevailing takeoff conditions "
+        "at origin"
+    ),
+    (
+        "CANCEL_OR_DIVERT_RISK",
+        "Arrival constraints indicate elevated diversion likelihood "
+        "at destination"
+    ),
 
-    # -------------------------------------------------
     # LAYER 2: EXTREME DESTINATION CONSTRAINT OVERRIDE
-    # -------------------------------------------------
-
-    if (
-        d_vis <= 0.2 and
-        d_fog >= 0.8 and
-        d_vol <= 0.4 and
-        delay_prob >= 0.6
-    ):
-        return {
-            "action": "PROACTIVE_RESCHEDULE",
-            "reason": (
-                "Sustained low visibility forecast at destination; "
-                "schedule adjustment recommended to maintain network stability"
-            )
-        }
+    (
+        "PROACTIVE_RESCHEDULE",
+        "Sustained low visibility forecast at destination; "
+        "schedule adjustment recommended to maintain network stability"
+    ),
 
-    # -------------------------------------------------
     # LAYER 3: ML-CENTERED OPERATIONAL POSTURE
-    # -------------------------------------------------
+    (
+        "NO_ACTION",
+        "Forecast conditions currently support planned operations"
+    ),
+    (
+        "MONITOR",
+        "Some variability noted in forecast conditions; "
+        "continued monitoring advised"
+    ),
+    (
+        "MONITOR_AND_PREPARE",
+        "Increased likelihood of operational delay; "
+        "readiness measures recommended"
+    ),
+    (
+        "PLAN_EXTRA_FUEL_AND_ALTN",
+        "Elevated arrival uncertainty; "
+        "additional fuel and alternate planning advised"
+    ),
+    (
+        "PROACTIVE_RESCHEDULE",
+        "Sustained operational constraints anticipated; "
+        "proactive schedule adjustment recommended"
+    ),
+)
 
-    if delay_prob < 0.20:
-        return {
-            "action": "NO_ACTION",
-            "reason": (
-                "Forecast conditions currently support planned operations"
-            )
-        }
-
-    elif delay_prob < 0.40:
-        return {
-            "action": "MONITOR",
-            "reason": (
-                "Some variability noted in forecast conditions; "
-                "continued monitoring advised"
-            )
-        }
-
-    elif delay_prob < 0.60:
-        return {
-            "action": "MONITOR_AND_PREPARE",
-            "reason": (
-                "Increased likelihood of operational delay; "
-                "readiness measures recommended"
-            )
-        }
-
-    elif delay_prob < 0.80:
-        return {
-            "action": "PLAN_EXTRA_FUEL_AND_ALTN",
-            "reason": (
-                "Elevated arrival uncertainty; "
-                "additional fuel and alternate planning advised"
-            )
-        }
+RULE_TAKEOFF_BLOCKED = 0
+RULE_LANDING_BLOCKED = 1
+RULE_DESTINATION_OVERRIDE = 2
+RULE_POSTURE_BASE = 3
 
-    else:
-        return {
-            "action": "PROACTIVE_RESCHEDULE",
-            "reason": (
-                "Sustained operational constraints anticipated; "
-                "proactive schedule adjustment recommended"
+ACTIONS = np.array([action for action, _ in RULES])
+
+# Operational severity, used to rank flights (higher = more disruptive)
+ACTION_SEVERITY = {
+    "NO_ACTION": 0,
+    "MONITOR": 1,
+    "MONITOR_AND_PREPARE": 2,
+    "PLAN_EXTRA_FUEL_AND_ALTN": 3,
+    "PROACTIVE_RESCHEDULE": 4,
+    "CANCEL_OR_DIVERT_RISK": 5,
+    "CANCEL_OR_HOLD": 6
+}
+
+
+# -----------------------------
+# Vectorized engine
+# -----------------------------
+class DecisionEngine:
+    """
+    Decision rules compiled from a threshold table into NumPy masks.
+    Evaluates whole arrays of predictions + weather features at once.
+    """
+
+    def __init__(self, thresholds: dict):
+        posture = thresholds["posture"]
+        override = thresholds["destination_override"]
+
+        self.thresholds = thresholds
+        self._band_edges = np.array(
+            [posture[key] for key in POSTURE_KEYS], dtype=float
+        )
+        self._max_vis = override["max_vis_km"]
+        self._min_fog = override["min_fog_probability"]
+        self._max_vol = override["max_volatility"]
+        self._min_prob = override["min_delay_probability"]
+
+    def posture_band(self, delay_prob) -> np.ndarray:
+        """
+        Layer-3 band index (0 = NO_ACTION ... 4 = PROACTIVE_RESCHEDULE).
+        """
+        # Band i ↔ delay_prob < edge i (first match wins)
+        return np.searchsorted(
+            self._band_edges, np.asarray(delay_prob, dtype=float), side="right"
+        )
+
+    def evaluate(
+        self,
+        delay_prob,
+        dest_vis,
+        dest_fog,
+        dest_vol,
+        origin_takeoff_ok,
+        destination_landing_ok
+    ) -> np.ndarray:
+        """
+        Return the rule id (index into RULES) for every row.
+        """
+        delay_prob = np.asarray(delay_prob, dtype=float)
+        dest_vis = np.asarray(dest_vis, dtype=float)
+        dest_fog = np.asarray(dest_fog, dtype=float)
+        dest_vol = np.asarray(dest_vol, dtype=float)
+        takeoff_ok = np.asarray(origin_takeoff_ok).astype(bool)
+        landing_ok = np.asarray(destination_landing_ok).astype(bool)
+
+        posture = RULE_POSTURE_BASE + self.posture_band(delay_prob)
+
+        override = (
+            (dest_vis <= self._max_vis) &
+            (dest_fog >= self._min_fog) &
+            (dest_vol <= self._max_vol) &
+            (delay_prob >= self._min_prob)
+        )
+
+        return np.where(
+            ~takeoff_ok, RULE_TAKEOFF_BLOCKED,
+            np.where(
+                ~landing_ok, RULE_LANDING_BLOCKED,
+                np.where(override, RULE_DESTINATION_OVERRIDE, posture)
             )
-        }
+        )
+
+
+engine = DecisionEngine(load_thresholds())
+
+
+def decisions_from_rules(rule_ids) -> list:
+    """
+    Expand rule ids into the {action, reason} dicts used in responses.
+    """
+    return [
+        {"action": RULES[i][0], "reason": RULES[i][1]}
+        for i in np.asarray(rule_ids).ravel()
+    ]
+
+
+def recommend_actions_batch(
+    delay_probs,
+    destination_vis,
+    destination_fog,
+    destination_volatility,
+    origin_takeoff_ok,
+    destination_landing_ok
+) -> np.ndarray:
+    """
+    Array form of recommend_action for batch / backtest paths.
+
+    Returns
+    -------
+    np.ndarray
+        Action names, one per row
+    """
+    return ACTIONS[
+        engine.evaluate(
+            delay_probs,
+            destination_vis,
+            destination_fog,
+            destination_volatility,
+            origin_takeoff_ok,
+            destination_landing_ok
+        )
+    ]
+
+
+def recommend_action(
+    prediction: Prediction,
+    origin_weather: WeatherFeatures,
+    destination_weather: WeatherFeatures,
+    origin_takeoff_ok: int,
+    destination_landing_ok: int
+):
+    """
+    ML-centered OCC decision engine.
+
+    Tone:
+    - Technical
+    - Operationally neutral
+    - Airline-standard OCC phrasing
+    """
+
+    rule_id = engine.evaluate(
+        prediction.delay_probability,
+        destination_weather.taf_min_vis_km,
+        destination_weather.taf_fog_probability,
+        destination_weather.taf_volatility,
+        origin_takeoff_ok,
+        destination_landing_ok
+    )
+
+    return decisions_from_rules(rule_id)[0]
 
 
 #EXAMPLE USAGE
 '''if __name__ == "__main__":
-    prediction = {"delay_probability": 0.82, "risk_band": "HIGH"}
+    prediction = Prediction(delay_probability=0.82)
 
-    origin_weather = {
-        "taf_min_vis_km": 0.6,
-        "taf_fog_probability": 0.4
-    }
+    origin_weather = WeatherFeatures(
+        taf_min_vis_km=0.6,
+        taf_fog_probability=0.4
+    )
 
-    destination_weather = {
-        "taf_min_vis_km": 0.25,
-        "taf_fog_probability": 1.0
-    }
+    destination_weather = WeatherFeatures(
+        taf_min_vis_km=0.25,
+        taf_fog_probability=1.0
+    )
 
     decision = recommend_action(
         prediction,
@@ -0,0 +1,189 @@
+import os
+
+from .weather_service import get_weather_risk_bulk
+from .feature_service import build_features
+from .executor_service import run_inference_batch
+from .decision_service import engine, decisions_from_rules, ACTION_SEVERITY
+from .minima_service import (
+    check_takeoff_feasible_batch,
+    check_landing_feasible_batch
+)
+from .response_service import dumps
+from .drift_service import observe_batch
+
+# Destination airports per bulk weather request / scoring chunk
+BOARD_CHUNK_AIRPORTS = int(os.getenv("BOARD_CHUNK_AIRPORTS", "20"))
+
+
+def _rank_key(result: dict):
+    """
+    Most disruptive decision first, then highest delay probability.
+    """
+    return (
+        -ACTION_SEVERITY[result["decision"]["action"]],
+        -result["prediction"].delay_probability
+    )
+
+
+def score_flights(
+    flights: list,
+    origin_weathers: list,
+    destination_weathers: list,
+    variant: str | None = None
+):
+    """
+    Score aligned flights + weather as arrays: one feature matrix,
+    one model call, vectorized minima checks and decisions.
+
+    Returns
+    -------
+    list[dict]
+        Per-flight prediction, feasibility and decision
+    """
+
+    if not flights:
+        return []
+
+    rows = [
+        build_features(flight, o_weather, d_weather)
+        for flight, o_weather, d_weather in zip(
+            flights, origin_weathers, destination_weathers
+        )
+    ]
+
+    predictions = run_inference_batch(rows, variant=variant)
+
+    try:
+        observe_batch(
+            rows, [p.delay_probability for p in predictions], variant
+        )
+    except Exception:
+        pass
+
+    origin_vis = [w.taf_min_vis_km for w in origin_weathers]
+    dest_vis = [w.taf_min_vis_km for w in destination_weathers]
+
+    takeoff_ok = check_takeoff_feasible_batch(
+        [f.origin for f in flights], origin_vis
+    )
+    landing_ok = check_landing_feasible_batch(
+        [f.destination for f in flights], dest_vis
+    )
+
+    rule_ids = engine.evaluate(
+        [p.delay_probability for p in predictions],
+        dest_vis,
+        [w.taf_fog_probability for w in destination_weathers],
+        [w.taf_volatility for w in destination_weathers],
+        takeoff_ok,
+        landing_ok
+    )
+
+    return [
+        {
+            "flight": flight,
+            # Raw TAF / METAR text would be repeated per flight
+            "origin_weather": o_weather.compact(),
+            "destination_weather": d_weather.compact(),
+            "operational_feasibility": {
+                "origin_takeoff_ok": bool(t_ok),
+                "destination_landing_ok": bool(l_ok)
+            },
+            "prediction": prediction,
+            "decision": decision
+        }
+        for flight, o_weather, d_weather, t_ok, l_ok, prediction, decision
+        in zip(
+            flights,
+            origin_weathers,
+            destination_weathers,
+            takeoff_ok,
+            landing_ok,
+            predictions,
+            decisions_from_rules(rule_ids)
+        )
+    ]
+
+
+def stream_departure_board(
+    icao: str,
+    date: str,
+    flights: list,
+    variant: str | None = None,
+    trace_id: str | None = None
+):
+    """
+    Score an airport's departures and yield NDJSON lines as each
+    destination chunk is ready, followed by the global ranking.
+
+    The 200 status is already sent when scoring starts: a failure
+    midway ends the stream with an "error" line instead of truncating
+    it.
+    """
+    try:
+        yield from _board_lines(icao, date, flights, variant)
+    except Exception as e:
+        yield dumps({
+            "type": "error",
+            "layer": "departure_board_service",
+            "message": str(e),
+            "trace_id": trace_id
+        }) + "\n"
+
+
+def _board_lines(icao: str, date: str, flights: list, variant: str | None):
+
+    # Origin weather once: a single TAF request covers every departure
+    origin_weathers = get_weather_risk_bulk(
+        [(icao, flight.scheduled_departure) for flight in flights]
+    )
+
+    destinations = list(dict.fromkeys(
+        flight.destination for flight in flights
+    ))
+
+    ranking = []
+
+    for start in range(0, len(destinations), BOARD_CHUNK_AIRPORTS):
+        chunk = set(destinations[start:start + BOARD_CHUNK_AIRPORTS])
+        idx = [
+            i for i, flight in enumerate(flights)
+            if flight.destination in chunk
+        ]
+
+        # Destination weather in bulk for the whole chunk
+        destination_weathers = get_weather_risk_bulk([
+            (flights[i].destination, flights[i].scheduled_arrival)
+            for i in idx
+        ])
+
+        results = score_flights(
+            [flights[i] for i in idx],
+            [origin_weathers[i] for i in idx],
+            destination_weathers,
+            variant=variant
+        )
+        results.sort(key=_rank_key)
+
+        for result in results:
+            ranking.append(result)
+            yield dumps({"type": "flight", **result}) + "\n"
+
+    ranking.sort(key=_rank_key)
+
+    yield dumps({
+        "type": "ranking",
+        "airport": icao,
+        "date": date,
+        "count": len(ranking),
+        "ranking": [
+            {
+                "rank": rank,
+                "flight_number": result["flight"].flight_number,
+                "scheduled_departure": result["flight"].scheduled_departure,
+                "delay_probability": result["prediction"].delay_probability,
+                "action": result["decision"]["action"]
+            }
+            for rank, result in enumerate(ranking, start=1)
+        ]
+    }) + "\n"
@@ -0,0 +1,191 @@
+import os
+import datetime
+import numpy as np
+
+from .taf_service import get_tafs
+from .metar_service import get_metars
+from .weather_service import get_weather_timeline
+from .executor_service import run_inference_batch
+from .records import Flight
+from .decision_service import engine, decisions_from_rules
+from .minima_service import (
+    check_takeoff_feasible_batch,
+    check_landing_feasible_batch
+)
+
+# -----------------------------
+# Search limits
+# -----------------------------
+# TAFs cover 24–30 h: candidates further out have no forecast
+MAX_HORIZON_H = float(os.getenv("DEPARTURE_WINDOW_MAX_HORIZON_H", "24"))
+MIN_STEP_MIN = int(os.getenv("DEPARTURE_WINDOW_MIN_STEP_MIN", "5"))
+
+
+def _epoch(timestamp: str) -> float:
+    dt = datetime.datetime.fromisoformat(timestamp)
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.UTC)
+
+    return dt.timestamp()
+
+
+def _format_utc(epoch: float) -> str:
+    # Same format as flight_resolver's scheduled times
+    return datetime.datetime.fromtimestamp(
+        epoch, tz=datetime.UTC
+    ).strftime("%Y-%m-%d %H:%MZ")
+
+
+def _hour_utc(epochs: np.ndarray) -> np.ndarray:
+    return (epochs // 3600) % 24
+
+
+def validate_search(horizon_h: float, step_min: int):
+    """
+    Raises ValueError with a client-facing message.
+    """
+    if not 0 < horizon_h <= MAX_HORIZON_H:
+        raise ValueError(
+            f"horizon_h must be in (0, {MAX_HORIZON_H:g}]"
+        )
+
+    if step_min < MIN_STEP_MIN:
+        raise ValueError(f"step_min must be at least {MIN_STEP_MIN}")
+
+
+def candidate_departures(flight: Flight, horizon_h: float, step_min: int):
+    """
+    Candidate departure / arrival times (epoch seconds) from the
+    scheduled departure to the horizon, keeping the scheduled block time.
+    """
+    validate_search(horizon_h, step_min)
+
+    departure = _epoch(flight.scheduled_departure)
+    block_s = _epoch(flight.scheduled_arrival) - departure
+
+    offsets = np.arange(0, horizon_h * 3600 + 1, step_min * 60, dtype=float)
+
+    return departure + offsets, departure + offsets + block_s, offsets
+
+
+def find_departure_windows(
+    flight: Flight,
+    horizon_h: float = 12,
+    step_min: int = 30,
+    limit: int = 5,
+    variant: str | None = None
+):
+    """
+    Evaluate every candidate departure time within the horizon against
+    the origin / destination TAF timelines in one batch: vectorized
+    weather features, minima checks, model call and decision rules.
+
+    Returns
+    -------
+    dict
+        earliest feasible slot, the best feasible slots (lowest delay
+        probability first, earlier first on ties) and the candidate count
+    """
+    origin_icao = flight.origin
+    dest_icao = flight.destination
+
+    departures, arrivals, offsets = candidate_departures(
+        flight, horizon_h, step_min
+    )
+    n = len(departures)
+
+    # Both airports in one request per source; a missing report falls
+    # through to the next source, as in get_weather_risk
+    try:
+        tafs = get_tafs([origin_icao, dest_icao])
+    except Exception:
+        tafs = {}
+
+    try:
+        metars = get_metars([origin_icao, dest_icao])
+    except Exception:
+        metars = {}
+
+    origin, origin_source = get_weather_timeline(
+        origin_icao, departures,
+        taf=tafs.get(origin_icao, {}), metar=metars.get(origin_icao, {})
+    )
+    dest, dest_source = get_weather_timeline(
+        dest_icao, arrivals,
+        taf=tafs.get(dest_icao, {}), metar=metars.get(dest_icao, {})
+    )
+
+    # Same column order as feature_service.build_features
+    X = np.column_stack([
+        _hour_utc(departures),
+        origin["taf_min_vis_km"],
+        origin["taf_volatility"],
+        origin["taf_fog_probability"],
+        origin["taf_change_intensity"],
+        _hour_utc(arrivals),
+        dest["taf_min_vis_km"],
+        dest["taf_volatility"],
+        dest["taf_fog_probability"],
+        dest["taf_change_intensity"]
+    ])
+
+    predictions = run_inference_batch(X.tolist(), variant=variant)
+    delay_probs = np.array([p.delay_probability for p in predictions])
+
+    takeoff_ok = check_takeoff_feasible_batch(
+        [origin_icao] * n, origin["taf_min_vis_km"]
+    )
+    landing_ok = check_landing_feasible_batch(
+        [dest_icao] * n, dest["taf_min_vis_km"]
+    )
+
+    decisions = decisions_from_rules(engine.evaluate(
+        delay_probs,
+        dest["taf_min_vis_km"],
+        dest["taf_fog_probability"],
+        dest["taf_volatility"],
+        takeoff_ok,
+        landing_ok
+    ))
+
+    slots = [
+        {
+            "scheduled_departure": _format_utc(departures[i]),
+            "scheduled_arrival": _format_utc(arrivals[i]),
+            "delay_minutes": int(offsets[i] // 60),
+            "origin_min_vis_km": float(origin["taf_min_vis_km"][i]),
+            "destination_min_vis_km": float(dest["taf_min_vis_km"][i]),
+            "weather_source": {
+                "origin": origin_source[i],
+                "destination": dest_source[i]
+            },
+            "prediction": predictions[i],
+            "decision": decisions[i]
+        }
+        for i in range(n)
+    ]
+
+    # Flyable: both ends within CAT minima
+    feasible = [
+        slot for slot, t_ok, l_ok in zip(slots, takeoff_ok, landing_ok)
+        if t_ok and l_ok
+    ]
+
+    ranked = sorted(
+        feasible,
+        key=lambda slot: (
+            slot["prediction"].delay_probability,
+            slot["delay_minutes"]
+        )
+    )
+
+    return {
+        "horizon_h": horizon_h,
+        "step_min": step_min,
+        "candidates": n,
+        "feasible": len(feasible),
+        "scheduled": slots[0],
+        "earliest_feasible": feasible[0] if feasible else None,
+        "best_slots": ranked[:limit]
+    }
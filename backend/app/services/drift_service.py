@@ -0,0 +1,453 @@
+import os
+import time
+import bisect
+import threading
+import numpy as np
+
+from .config import DATASET_PATH
+from .explainability_service import FEATURE_NAMES
+from .model_registry import resolve_variant
+
+# -----------------------------
+# Configuration
+# -----------------------------
+# Histogram bins per feature (edges at baseline quantiles: every bin
+# holds ~1/DRIFT_BINS of the training data)
+DRIFT_BINS = int(os.getenv("DRIFT_BINS", "20"))
+
+# Live sketches cover the current and the previous window, so old
+# traffic ages out while memory stays fixed
+DRIFT_WINDOW_S = float(os.getenv("DRIFT_WINDOW_S", "86400"))
+
+# Population stability index thresholds, and the sample size below
+# which no verdict is given
+DRIFT_PSI_WARN = float(os.getenv("DRIFT_PSI_WARN", "0.1"))
+DRIFT_PSI_ALERT = float(os.getenv("DRIFT_PSI_ALERT", "0.25"))
+DRIFT_MIN_SAMPLES = int(os.getenv("DRIFT_MIN_SAMPLES", "100"))
+
+# Hours are categorical: one bin per hour
+HOUR_FEATURES = ("dep_hour", "arr_hour")
+HOUR_EDGES = [h + 0.5 for h in range(23)]
+
+# delay_probability lives in [0, 1]: fixed-width bins
+PREDICTION_EDGES = [round(i / DRIFT_BINS, 6) for i in range(1, DRIFT_BINS)]
+
+QUANTILES = (0.1, 0.5, 0.9)
+
+
+class StreamingHistogram:
+    """
+    Fixed-bin histogram with count / sum / min / max: O(log bins)
+    updates, constant memory, mergeable by adding counts.
+    """
+
+    __slots__ = ("edges", "counts", "n", "total", "minimum", "maximum")
+
+    def __init__(self, edges: list):
+        self.edges = edges
+        self.counts = [0] * (len(edges) + 1)
+        self.n = 0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = float("-inf")
+
+    def add(self, value: float):
+        self.counts[bisect.bisect_right(self.edges, value)] += 1
+        self.n += 1
+        self.total += value
+
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    def add_many(self, values: np.ndarray):
+        if not len(values):
+            return
+
+        bins = np.searchsorted(self.edges, values, side="right")
+        counts = np.bincount(bins, minlength=len(self.counts))
+
+        self.counts = [a + int(b) for a, b in zip(self.counts, counts)]
+        self.n += len(values)
+        self.total += float(values.sum())
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+
+    def merged(self, other: "StreamingHistogram") -> "StreamingHistogram":
+        result = StreamingHistogram(self.edges)
+        result.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        result.n = self.n + other.n
+        result.total = self.total + other.total
+        result.minimum = min(self.minimum, other.minimum)
+        result.maximum = max(self.maximum, other.maximum)
+        return result
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Approximate quantile (linear within the bin; outer bins are
+        bounded by the observed min / max).
+        """
+        if not self.n:
+            return None
+
+        bounds = [self.minimum] + list(self.edges) + [self.maximum]
+        target = q * self.n
+        seen = 0
+
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= target:
+                lo = max(bounds[i], self.minimum)
+                hi = min(bounds[i + 1], self.maximum)
+                return lo + (hi - lo) * (target - seen) / count
+            seen += count
+
+        return self.maximum
+
+    def summary(self) -> dict:
+        return {
+            "count": self.n,
+            "mean": round(self.total / self.n, 4) if self.n else None,
+            **{
+                f"p{int(q * 100)}": (
+                    round(self.quantile(q), 4) if self.n else None
+                )
+                for q in QUANTILES
+            }
+        }
+
+
+def _histogram_from(values: np.ndarray, edges: list) -> StreamingHistogram:
+    histogram = StreamingHistogram(edges)
+    histogram.add_many(np.asarray(values, dtype=float))
+    return histogram
+
+
+def _quantile_edges(values: np.ndarray) -> list:
+    """
+    Interior bin edges at baseline quantiles (duplicates merged).
+    """
+    qs = np.linspace(0, 1, DRIFT_BINS + 1)[1:-1]
+    return sorted(set(np.quantile(values, qs).round(6).tolist()))
+
+
+def compare(live: StreamingHistogram, baseline: StreamingHistogram) -> dict:
+    """
+    Drift of a live histogram against the baseline on the same bins:
+    population stability index and Kolmogorov–Smirnov distance.
+    """
+    result = {
+        "live": live.summary(),
+        "baseline": baseline.summary()
+    }
+
+    if live.n < DRIFT_MIN_SAMPLES:
+        return {**result, "psi": None, "ks": None, "status": "insufficient_data"}
+
+    # Smoothed bin shares (empty bins would make PSI infinite)
+    eps = 1e-4
+    p = (np.asarray(live.counts) + eps) / (live.n + eps * len(live.counts))
+    q = (np.asarray(baseline.counts) + eps) / (baseline.n + eps * len(baseline.counts))
+
+    psi = float(np.sum((p - q) * np.log(p / q)))
+    ks = float(np.max(np.abs(np.cumsum(p) - np.cumsum(q))))
+
+    if psi >= DRIFT_PSI_ALERT:
+        status = "alert"
+    elif psi >= DRIFT_PSI_WARN:
+        status = "warn"
+    else:
+        status = "ok"
+
+    return {**result, "psi": round(psi, 4), "ks": round(ks, 4), "status": status}
+
+
+class DriftMonitor:
+    """
+    Per-process sketches of the live feature vectors and delay
+    probabilities, compared against the training dataset on demand.
+
+    Feature sketches cover all traffic; delay probabilities are kept
+    per model variant, since each is compared with that variant's own
+    output on the dataset.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._edges = None          # per feature, from the dataset
+        self._baseline = None       # feature → StreamingHistogram
+        self._prediction_baseline = {}  # variant → (model version, StreamingHistogram)
+        self._building = set()      # variants whose baseline is being computed
+        self._current = None
+        self._previous = None
+        self._window_start = time.monotonic()
+
+    # -- baseline --------------------------------------------------------
+    def load_baseline(self):
+        if self._edges is not None:
+            return
+
+        with self._lock:
+            if self._edges is not None:
+                return
+
+            data = np.loadtxt(DATASET_PATH, delimiter=",", skiprows=1)
+            X = data[:, :len(FEATURE_NAMES)]
+
+            edges = [
+                HOUR_EDGES if name in HOUR_FEATURES else _quantile_edges(X[:, i])
+                for i, name in enumerate(FEATURE_NAMES)
+            ]
+
+            self._baseline = {
+                name: _histogram_from(X[:, i], edges[i])
+                for i, name in enumerate(FEATURE_NAMES)
+            }
+            self._current = self._empty_window(edges)
+            self._previous = self._empty_window(edges)
+            self._edges = edges
+
+    @staticmethod
+    def _empty_window(edges: list) -> dict:
+        window = {
+            name: StreamingHistogram(edges[i])
+            for i, name in enumerate(FEATURE_NAMES)
+        }
+        window["delay_probability"] = {}  # variant → StreamingHistogram
+        return window
+
+    @staticmethod
+    def _predictions(window: dict, variant: str) -> StreamingHistogram:
+        # Caller holds the lock
+        histogram = window["delay_probability"].get(variant)
+
+        if histogram is None:
+            histogram = StreamingHistogram(PREDICTION_EDGES)
+            window["delay_probability"][variant] = histogram
+
+        return histogram
+
+    def _rotate(self):
+        # Caller holds the lock
+        if time.monotonic() - self._window_start >= DRIFT_WINDOW_S:
+            self._previous = self._current
+            self._current = self._empty_window(self._edges)
+            self._window_start = time.monotonic()
+
+    def prediction_baseline(
+        self, variant: str, model_version: str
+    ) -> StreamingHistogram | None:
+        """
+        A variant's output on the training dataset, if it was computed
+        for this model version.
+        """
+        with self._lock:
+            cached = self._prediction_baseline.get(variant)
+
+        if cached is None or cached[0] != model_version:
+            return None
+
+        return cached[1]
+
+    def build_prediction_baseline(
+        self, variant: str, model_version: str, predict
+    ) -> bool:
+        """
+        Score the training dataset with a variant (once per model
+        version). `predict` maps a feature matrix to delay probabilities.
+
+        Returns
+        -------
+        bool
+            False if another thread is already computing it
+        """
+        with self._lock:
+            cached = self._prediction_baseline.get(variant)
+
+            if cached is not None and cached[0] == model_version:
+                return True
+            if variant in self._building:
+                return False
+
+            self._building.add(variant)
+
+        try:
+            data = np.loadtxt(DATASET_PATH, delimiter=",", skiprows=1)
+            probs = predict(data[:, :len(FEATURE_NAMES)])
+
+            with self._lock:
+                self._prediction_baseline[variant] = (
+                    model_version, _histogram_from(probs, PREDICTION_EDGES)
+                )
+        finally:
+            with self._lock:
+                self._building.discard(variant)
+
+        return True
+
+    # -- request path ----------------------------------------------------
+    def observe(self, features: list, delay_probability: float, variant: str):
+        """
+        Add one feature vector scored by `variant` (a few bisects per
+        feature).
+        """
+        self.load_baseline()
+
+        with self._lock:
+            self._rotate()
+            window = self._current
+
+            for name, value in zip(FEATURE_NAMES, features):
+                window[name].add(float(value))
+
+            self._predictions(window, variant).add(float(delay_probability))
+
+    def observe_batch(self, X, delay_probabilities, variant: str):
+        """
+        Add a feature matrix scored by `variant` (batch scoring paths).
+        """
+        X = np.asarray(X, dtype=float)
+
+        if not len(X):
+            return
+
+        self.load_baseline()
+
+        with self._lock:
+            self._rotate()
+            window = self._current
+
+            for i, name in enumerate(FEATURE_NAMES):
+                window[name].add_many(X[:, i])
+
+            self._predictions(window, variant).add_many(
+                np.asarray(delay_probabilities, dtype=float)
+            )
+
+    # -- report ----------------------------------------------------------
+    def report(
+        self,
+        variant: str,
+        prediction_baseline: StreamingHistogram | None = None
+    ) -> dict:
+        self.load_baseline()
+
+        with self._lock:
+            live = {
+                name: self._current[name].merged(self._previous[name])
+                for name in FEATURE_NAMES
+            }
+            live_predictions = self._predictions(self._current, variant).merged(
+                self._predictions(self._previous, variant)
+            )
+            window_age_s = time.monotonic() - self._window_start
+
+        features = {
+            name: compare(live[name], self._baseline[name])
+            for name in FEATURE_NAMES
+        }
+
+        predictions = (
+            compare(live_predictions, prediction_baseline)
+            if prediction_baseline is not None
+            else {"live": live_predictions.summary(), "status": "baseline_pending"}
+        )
+
+        scored = [
+            (name, result["psi"]) for name, result in features.items()
+            if result["psi"] is not None
+        ]
+        statuses = [result["status"] for result in features.values()]
+        statuses.append(predictions.get("status", "insufficient_data"))
+
+        if "alert" in statuses:
+            status = "alert"
+        elif "warn" in statuses:
+            status = "warn"
+        elif "ok" in statuses:
+            status = "ok"
+        else:
+            status = "insufficient_data"
+
+        return {
+            "status": status,
+            "variant": variant,
+            "samples": live[FEATURE_NAMES[0]].n,
+            "window_s": DRIFT_WINDOW_S,
+            "current_window_age_s": round(window_age_s, 1),
+            "most_drifted_feature": (
+                max(scored, key=lambda item: item[1])[0] if scored else None
+            ),
+            "features": features,
+            "delay_probability": predictions
+        }
+
+
+monitor = DriftMonitor()
+
+
+def observe_prediction(
+    features: list, delay_probability: float, variant: str | None = None
+):
+    monitor.observe(features, delay_probability, resolve_variant(variant))
+
+
+def observe_batch(X, delay_probabilities, variant: str | None = None):
+    monitor.observe_batch(X, delay_probabilities, resolve_variant(variant))
+
+
+def _build_prediction_baseline(variant: str):
+    from .model_registry import get_model_version
+    from .executor_service import run_inference_batch
+
+    def predict(X):
+        return np.array([
+            p.delay_probability
+            for p in run_inference_batch(X.tolist(), variant=variant)
+        ])
+
+    monitor.build_prediction_baseline(
+        variant, get_model_version(variant), predict
+    )
+
+
+def drift_report(variant: str | None = None) -> dict:
+    """
+    Live feature distributions vs the training dataset, and the live
+    delay_probability of requests served by `variant` vs that
+    variant's output on the dataset.
+
+    That output is computed at warm-up; after a model swap it is
+    recomputed in the background (status "baseline_pending" until
+    then), never on the request path.
+    """
+    from .model_registry import get_model_version
+
+    variant = resolve_variant(variant)
+    baseline = monitor.prediction_baseline(variant, get_model_version(variant))
+
+    if baseline is None:
+        threading.Thread(
+            target=_build_prediction_baseline,
+            args=(variant,),
+            name="drift-baseline",
+            daemon=True
+        ).start()
+
+    return monitor.report(variant, baseline)
+
+
+def preload_baseline() -> dict:
+    """
+    Build the feature baseline and every variant's prediction baseline
+    ahead of the first request (warm-up).
+    """
+    from .model_registry import available_variants
+
+    monitor.load_baseline()
+
+    variants = available_variants()
+    for variant in variants:
+        _build_prediction_baseline(variant)
+
+    return {"features": len(FEATURE_NAMES), "bins": DRIFT_BINS, "variants": variants}
@@ -0,0 +1,402 @@
+import os
+import queue
+import threading
+import time
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+# -----------------------------
+# Configuration
+# -----------------------------
+# process → CPU work runs in worker processes (no GIL contention)
+# thread  → dedicated thread pool (NumPy / tree traversal release the GIL)
+# inline  → run in the calling thread (development / debugging)
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "process").lower()
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+
+# Requests arriving within this window are scored in one model call
+INFERENCE_BATCH_WINDOW_MS = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", "5"))
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "64"))
+INFERENCE_TIMEOUT_S = float(os.getenv("INFERENCE_TIMEOUT_S", "30"))
+
+if INFERENCE_EXECUTOR not in ("process", "thread", "inline"):
+    raise RuntimeError(
+        f"Unknown INFERENCE_EXECUTOR '{INFERENCE_EXECUTOR}' "
+        "(expected process, thread or inline)"
+    )
+
+
+# -----------------------------
+# Worker-side functions
+# -----------------------------
+def _preload_worker():
+    """
+    Load the model and SHAP explainer once per worker process,
+    so no request pays the load cost.
+    """
+    from .model_registry import get_model
+    from .explainability_service import get_explainer
+
+    get_model()
+    get_explainer()
+
+
+def _worker_id() -> str:
+    """
+    Identify the worker running this job. A pool worker only takes jobs
+    once its initializer (_preload_worker) has returned.
+    """
+    return f"{os.getpid()}:{threading.get_ident()}"
+
+
+def _run_batch(rows: list, explain_mask: list, variant: str | None = None):
+    """
+    Score a micro-batch with one model variant and explain the rows
+    that asked for it.
+
+    Returns
+    -------
+    tuple[list[Prediction], list[list[dict] | None]]
+        Predictions and explanations, aligned with rows
+    """
+    from .prediction_service import predict_delay_risk_batch
+    from .explainability_service import explain_prediction_batch
+
+    X = np.asarray(rows, dtype=float)
+
+    predictions = predict_delay_risk_batch(X, variant)
+    explanations = [None] * len(rows)
+
+    explain_idx = [i for i, explain in enumerate(explain_mask) if explain]
+
+    if explain_idx:
+        for i, explanation in zip(
+            explain_idx, explain_prediction_batch(X[explain_idx], variant)
+        ):
+            explanations[i] = explanation
+
+    return predictions, explanations
+
+
+# -----------------------------
+# Micro-batcher
+# -----------------------------
+class MicroBatcher:
+    """
+    Collects inference requests for a short window and dispatches
+    them to the executor as a single batch.
+    """
+
+    def __init__(self, executor, window_s: float, max_batch: int):
+        self._executor = executor
+        self._window_s = window_s
+        self._max_batch = max_batch
+        self._queue = queue.Queue()
+
+        self._thread = threading.Thread(
+            target=self._loop,
+            name="inference-batcher",
+            daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def executor(self):
+        return self._executor
+
+    def close(self):
+        """
+        Stop the dispatch thread and the executor behind it.
+        """
+        self._queue.put(None)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(
+        self,
+        features: list,
+        explain: bool,
+        variant: str | None = None
+    ) -> Future:
+        future = Future()
+        self._queue.put((features, explain, variant, future))
+        return future
+
+    def _loop(self):
+        closed = False
+
+        while not closed:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self._window_s
+
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closed = True
+                    break
+                batch.append(item)
+
+            # One model call per variant present in the window
+            by_variant = {}
+            for item in batch:
+                by_variant.setdefault(item[2], []).append(item)
+
+            for variant, items in by_variant.items():
+                self._dispatch(items, variant)
+
+    def _dispatch(self, batch: list, variant: str | None):
+        rows = [features for features, _, _, _ in batch]
+        explain_mask = [explain for _, explain, _, _ in batch]
+
+        try:
+            job = self._executor.submit(
+                _run_batch, rows, explain_mask, variant
+            )
+        except Exception as e:
+            for _, _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        job.add_done_callback(lambda done: self._resolve(done, batch))
+
+    @staticmethod
+    def _resolve(job: Future, batch: list):
+        error = job.exception()
+
+        if error is not None:
+            for _, _, _, future in batch:
+                future.set_exception(error)
+            return
+
+        predictions, explanations = job.result()
+
+        for (_, _, _, future), prediction, explanation in zip(
+            batch, predictions, explanations
+        ):
+            future.set_result((prediction, explanation))
+
+
+# -----------------------------
+# Executor lifecycle
+# -----------------------------
+_executor = None
+_batcher = None
+_lock = threading.Lock()
+
+# Production inference calls currently running (load signal for
+# background work such as shadow models)
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
+
+@contextmanager
+def _tracked():
+    global _in_flight
+
+    with _in_flight_lock:
+        _in_flight += 1
+    try:
+        yield
+    finally:
+        with _in_flight_lock:
+            _in_flight -= 1
+
+
+def inference_load() -> int:
+    """
+    Number of production inference calls in flight in this process.
+    """
+    return _in_flight
+
+
+def _get_batcher() -> MicroBatcher:
+    global _executor, _batcher
+
+    if _batcher is None:
+        with _lock:
+            if _batcher is None:
+                if INFERENCE_EXECUTOR == "process":
+                    # spawn: workers must not inherit server threads/sockets
+                    _executor = ProcessPoolExecutor(
+                        max_workers=INFERENCE_WORKERS,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_preload_worker
+                    )
+                else:
+                    _executor = ThreadPoolExecutor(
+                        max_workers=INFERENCE_WORKERS,
+                        thread_name_prefix="inference",
+                        initializer=_preload_worker
+                    )
+
+                _batcher = MicroBatcher(
+                    _executor,
+                    window_s=INFERENCE_BATCH_WINDOW_MS / 1000,
+                    max_batch=INFERENCE_MAX_BATCH
+                )
+
+    return _batcher
+
+
+def _reset_batcher(broken: MicroBatcher):
+    """
+    Drop a batcher whose process pool broke (a worker died, e.g. killed
+    by the OOM killer): the pool accepts no more jobs, so the next call
+    starts a new one.
+    """
+    global _executor, _batcher
+
+    with _lock:
+        if _batcher is broken:
+            _executor = None
+            _batcher = None
+
+    broken.close()
+
+
+def _with_restart(call):
+    """
+    Run call(batcher), retrying once on a new pool if the current one
+    is broken.
+    """
+    batcher = _get_batcher()
+
+    try:
+        return call(batcher)
+    except BrokenProcessPool:
+        _reset_batcher(batcher)
+        return call(_get_batcher())
+
+
+def prestart_workers(timeout_s: float = INFERENCE_TIMEOUT_S) -> dict:
+    """
+    Start every inference worker and wait until each has preloaded the
+    model (pools otherwise start workers lazily, one per queued job).
+
+    Raises
+    ------
+    TimeoutError
+        If not every worker answered within timeout_s
+    """
+
+    if INFERENCE_EXECUTOR == "inline":
+        _preload_worker()
+        return {"workers": 1}
+
+    executor = _get_batcher().executor
+    deadline = time.monotonic() + timeout_s
+    seen = set()
+
+    # One round submits a job per worker at once; a worker that finished
+    # loading first can take several, so repeat until all have answered
+    while len(seen) < INFERENCE_WORKERS:
+        remaining = deadline - time.monotonic()
+
+        if remaining <= 0:
+            raise TimeoutError(
+                f"{len(seen)} of {INFERENCE_WORKERS} inference workers "
+                f"ready after {timeout_s}s"
+            )
+
+        jobs = [executor.submit(_worker_id) for _ in range(INFERENCE_WORKERS)]
+
+        for job in jobs:
+            seen.add(job.result(timeout=max(deadline - time.monotonic(), 0.01)))
+
+    return {"workers": len(seen)}
+
+
+def run_inference(
+    features: list,
+    explain: bool = True,
+    variant: str | None = None
+):
+    """
+    Predict (and optionally explain) a single feature vector
+    on the configured executor.
+
+    Parameters
+    ----------
+    features : list[float]
+        Feature vector from feature_service
+    explain : bool
+        Whether to compute SHAP contributions
+    variant : str, optional
+        Model variant from model_registry
+
+    Returns
+    -------
+    tuple[Prediction, list[dict] | None]
+        Prediction and explanation (None if not requested)
+    """
+
+    with _tracked():
+        if INFERENCE_EXECUTOR == "inline":
+            predictions, explanations = _run_batch(
+                [features], [explain], variant
+            )
+            return predictions[0], explanations[0]
+
+        return _with_restart(
+            lambda batcher: batcher.submit(
+                features, explain, variant
+            ).result(timeout=INFERENCE_TIMEOUT_S)
+        )
+
+
+def run_inference_batch(
+    rows: list,
+    variant: str | None = None
+) -> list:
+    """
+    Predict a whole feature matrix as one job on the configured executor
+    (batch paths: it is already a batch, so it skips the micro-batcher).
+
+    Returns
+    -------
+    list[Prediction]
+        Predictions aligned with rows
+    """
+
+    if not rows:
+        return []
+
+    explain_mask = [False] * len(rows)
+
+    with _tracked():
+        if INFERENCE_EXECUTOR == "inline":
+            return _run_batch(rows, explain_mask, variant)[0]
+
+        return _with_restart(
+            lambda batcher: batcher.executor.submit(
+                _run_batch, rows, explain_mask, variant
+            ).result(timeout=INFERENCE_TIMEOUT_S)[0]
+        )
+
+
+def shutdown_executor():
+    """
+    Stop worker processes/threads (called on application shutdown).
+    """
+    global _executor, _batcher
+
+    with _lock:
+        batcher = _batcher
+        _executor = None
+        _batcher = None
+
+    if batcher is not None:
+        batcher.close()
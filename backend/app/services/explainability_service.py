@@ -1,20 +1,44 @@
-import os
-import joblib
-import shap
+import threading
 import numpy as np
 
+from .memory_service import budget
+from .model_registry import get_model, resolve_variant
+from .treeshap import ForestExplainer
+
 # -----------------------------
-# Load trained model
+# TreeSHAP explainer, one per model variant
 # -----------------------------
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-MODEL_PATH = os.path.join(BASE_DIR, "models", "delay_model.pkl")
+# Flattened path tables are built from the forest on the first
+# explanation (or at warm-up), never at application startup.
+_explainers = {}  # variant → (model, explainer)
+_lock = threading.Lock()
 
-model = joblib.load(MODEL_PATH)
 
-# -----------------------------
-# SHAP Explainer (Tree-based)
-# -----------------------------
-explainer = shap.TreeExplainer(model)
+def get_explainer(variant: str | None = None):
+    variant = resolve_variant(variant)
+    model = get_model(variant)
+
+    # Rebuilt when a new model version has been published
+    cached = _explainers.get(variant)
+    if cached is not None and cached[0] is model:
+        return cached[1]
+
+    with _lock:
+        cached = _explainers.get(variant)
+
+        if cached is not None and cached[0] is model:
+            return cached[1]
+
+        explainer = ForestExplainer(model)
+        _explainers[variant] = (model, explainer)
+
+        # Pinned: rebuilding takes ~0.5 s, on the request path
+        budget.charge("explainers", variant, explainer.nbytes, pinned=True)
+
+    return explainer
+
+
+budget.register("explainers")
 
 # Feature names MUST match feature order
 FEATURE_NAMES = [
@@ -31,7 +55,7 @@ FEATURE_NAMES = [
 ]
 
 
-def explain_prediction(features: list):
+def explain_prediction(features: list, variant: str | None = None):
     """
     Generate SHAP explanation for a single prediction.
 
@@ -39,6 +63,8 @@ def explain_prediction(features: list):
     ----------
     features : list[float]
         Feature vector used for prediction
+    variant : str, optional
+        Model variant from model_registry
 
     Returns
     -------
@@ -46,37 +72,50 @@ def explain_prediction(features: list):
         Feature-wise SHAP contributions
     """
 
-    X = np.array(features).reshape(1, -1)
-
-    shap_values = explainer.shap_values(X)
-
-    # Handle both old and new SHAP formats safely
-    if isinstance(shap_values, list):
-        # Old format: list of arrays per class
-        class_1_shap = shap_values[1][0]
-    else:
-        # New format: single array already for positive class
-        class_1_shap = shap_values[0]
+    return explain_prediction_batch([features], variant)[0]
 
 
-    explanation = []
-
-    for name, value, shap_val in zip(
-        FEATURE_NAMES, features, class_1_shap
-    ):
-        if hasattr(shap_val, "__len__"):
-            shap_val = shap_val[0]
+def explain_prediction_batch(X, variant: str | None = None):
+    """
+    Generate SHAP explanations for a batch of predictions
+    with one explainer call.
 
-        explanation.append({
-            "feature": name,
-            "value": round(float(value), 3),
-            "shap_contribution": round(float(shap_val), 4)
-        })
+    Parameters
+    ----------
+    X : array-like, shape (n_rows, n_features)
+        Stacked feature vectors
+    variant : str, optional
+        Model variant from model_registry
 
-    # Sort by absolute impact
-    explanation.sort(
-        key=lambda x: abs(x["shap_contribution"]),
-        reverse=True
-    )
+    Returns
+    -------
+    list[list[dict]]
+        Per-row feature contributions, sorted by absolute impact
+    """
 
-    return explanation
\ No newline at end of file
+    X = np.asarray(X, dtype=float)
+
+    contributions = [
+        [round(c, 4) for c in row]
+        for row in get_explainer(variant).shap_values(X).tolist()
+    ]
+    values = [[round(v, 3) for v in row] for row in X.tolist()]
+
+    # Sort by absolute impact (stable: ties keep feature order)
+    order = np.argsort(
+        -np.abs(contributions), axis=1, kind="stable"
+    ).tolist()
+
+    return [
+        [
+            {
+                "feature": FEATURE_NAMES[i],
+                "value": row_values[i],
+                "shap_contribution": row_contributions[i]
+            }
+            for i in row_order
+        ]
+        for row_values, row_contributions, row_order in zip(
+            values, contributions, order
+        )
+    ]
@@ -1,7 +1,10 @@
+from .records import Flight, WeatherFeatures
+
+
 def build_features(
-    flight: dict,
-    origin_weather: dict,
-    destination_weather: dict
+    flight: Flight,
+    origin_weather: WeatherFeatures,
+    destination_weather: WeatherFeatures
 ):
     """
     Convert flight + origin & destination weather context
@@ -21,27 +24,24 @@ def build_features(
     # -----------------------------
     # Time-based features
     # -----------------------------
-    dep_hour = int(flight["scheduled_departure"][11:13])
-    arr_hour = int(flight["scheduled_arrival"][11:13])
-
-    origin_icao = flight["origin"]["icao"]
-    dest_icao = flight["destination"]["icao"]
+    dep_hour = int(flight.scheduled_departure[11:13])
+    arr_hour = int(flight.scheduled_arrival[11:13])
 
     # -----------------------------
     # Origin weather features
     # -----------------------------
-    o_min_vis = origin_weather.get("taf_min_vis_km", 10.0)
-    o_vol = origin_weather.get("taf_volatility", 0.0)
-    o_fog = origin_weather.get("taf_fog_probability", 0.0)
-    o_change = origin_weather.get("taf_change_intensity", 0.0)
+    o_min_vis = origin_weather.taf_min_vis_km
+    o_vol = origin_weather.taf_volatility
+    o_fog = origin_weather.taf_fog_probability
+    o_change = origin_weather.taf_change_intensity
 
     # -----------------------------
     # Destination weather features
     # -----------------------------
-    d_min_vis = destination_weather.get("taf_min_vis_km", 10.0)
-    d_vol = destination_weather.get("taf_volatility", 0.0)
-    d_fog = destination_weather.get("taf_fog_probability", 0.0)
-    d_change = destination_weather.get("taf_change_intensity", 0.0)
+    d_min_vis = destination_weather.taf_min_vis_km
+    d_vol = destination_weather.taf_volatility
+    d_fog = destination_weather.taf_fog_probability
+    d_change = destination_weather.taf_change_intensity
 
     # -----------------------------
     # FINAL FEATURE VECTOR
@@ -63,26 +63,27 @@ def build_features(
 
 # Example usage
 '''if __name__ == "__main__":
-    flight = {
-        "scheduled_departure": "2026-01-08T19:30:00+05:30",
-        "scheduled_arrival": "2026-01-08T21:05:00+05:30",
-        "origin": {"icao": "VILK"},
-        "destination": {"icao": "CYYC"}
-    }
+    flight = Flight(
+        flight_number="6E7027",
+        origin="VILK",
+        destination="CYYC",
+        scheduled_departure="2026-01-08T19:30:00+05:30",
+        scheduled_arrival="2026-01-08T21:05:00+05:30"
+    )
 
-    origin_weather = {
-        "taf_min_vis_km": 0.5,
-        "taf_volatility": 0.12,
-        "taf_fog_probability": 1.0,
-        "taf_change_intensity": 0.4
-    }
+    origin_weather = WeatherFeatures(
+        taf_min_vis_km=0.5,
+        taf_volatility=0.12,
+        taf_fog_probability=1.0,
+        taf_change_intensity=0.4
+    )
 
-    destination_weather = {
-        "taf_min_vis_km": 0.2,
-        "taf_volatility": 0.3,
-        "taf_fog_probability": 1.0,
-        "taf_change_intensity": 0.6
-    }
+    destination_weather = WeatherFeatures(
+        taf_min_vis_km=0.2,
+        taf_volatility=0.3,
+        taf_fog_probability=1.0,
+        taf_change_intensity=0.6
+    )
 
     features = build_features(
         flight,
@@ -0,0 +1,367 @@
+import os
+import threading
+import collections
+import time
+import uuid
+import numpy as np
+
+from .config import BACKEND_DIR
+
+# -----------------------------
+# Storage
+# -----------------------------
+FEEDBACK_DIR = os.getenv(
+    "FEEDBACK_DIR", os.path.join(BACKEND_DIR, "data", "feedback")
+)
+
+# v2: full-length trace ids (v1 files used 8-character ids); one
+# segment file per UTC day in each directory
+FEATURES_DIR = os.path.join(FEEDBACK_DIR, "features_v2")
+OUTCOMES_DIR = os.path.join(FEEDBACK_DIR, "outcomes_v2")
+
+# Days of archived predictions / outcomes kept (older segments are
+# deleted)
+FEEDBACK_RETENTION_DAYS = int(os.getenv("FEEDBACK_RETENTION_DAYS", "30"))
+
+# Must match feature_service.build_features
+N_FEATURES = 10
+
+# Full uuid4 string: the permanent key joining outcomes to features
+TRACE_ID_BYTES = 36
+
+# Most recent archived predictions indexed in memory for /feedback
+# lookups; outcomes for older ones are rejected
+FEEDBACK_INDEX_SIZE = int(os.getenv("FEEDBACK_INDEX_SIZE", "100000"))
+
+# Lookup misses re-read the archive tail (predictions made by other
+# workers) at most this often
+FEEDBACK_REFRESH_S = float(os.getenv("FEEDBACK_REFRESH_S", "1"))
+
+# Fixed-size binary records: one per /predict (features) and one per
+# reported outcome. Files are only ever appended to.
+FEATURE_RECORD = np.dtype([
+    ("trace_id", f"S{TRACE_ID_BYTES}"),
+    ("timestamp", "<f8"),
+    ("model_version", "S24"),
+    ("features", "<f4", (N_FEATURES,)),
+    ("delay_probability", "<f4")
+])
+
+OUTCOME_RECORD = np.dtype([
+    ("trace_id", f"S{TRACE_ID_BYTES}"),
+    ("timestamp", "<f8"),
+    ("outcome", "u1")
+])
+
+# Outcome codes (index) → name; everything but on_time counts as delayed
+OUTCOMES = ("on_time", "delayed", "diverted", "cancelled")
+
+
+class AppendOnlyLog:
+    """
+    File of fixed-size numpy records, appended with one write per call
+    (O_APPEND: safe across worker processes).
+    """
+
+    def __init__(self, path: str, dtype: np.dtype):
+        self.path = path
+        self.dtype = dtype
+
+    def append(self, record: tuple):
+        self.extend([record])
+
+    def extend(self, records: list):
+        """
+        Append several records with a single write.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        data = np.array(records, dtype=self.dtype).tobytes()
+
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+    def read(self, start: int = 0, count: int | None = None) -> np.ndarray:
+        """
+        Records from index `start` on, at most `count` of them
+        (complete records only).
+        """
+        if not os.path.exists(self.path):
+            return np.empty(0, dtype=self.dtype)
+
+        with open(self.path, "rb") as f:
+            f.seek(start * self.dtype.itemsize)
+            data = f.read(-1 if count is None else count * self.dtype.itemsize)
+
+        usable = len(data) - len(data) % self.dtype.itemsize
+        return np.frombuffer(data[:usable], dtype=self.dtype)
+
+    def __len__(self):
+        if not os.path.exists(self.path):
+            return 0
+        return os.path.getsize(self.path) // self.dtype.itemsize
+
+
+class SegmentedLog:
+    """
+    Append-only records split into one AppendOnlyLog per UTC day.
+    Segments older than the retention are ignored and deleted (by the
+    first append of each day in every process).
+    """
+
+    def __init__(self, directory: str, dtype: np.dtype, retention_days: int):
+        self.directory = directory
+        self.dtype = dtype
+        self.retention_days = retention_days
+        self._pruned_day = None
+
+    @staticmethod
+    def _day(timestamp: float | None = None) -> str:
+        return time.strftime("%Y%m%d", time.gmtime(timestamp))
+
+    def _cutoff(self) -> str:
+        return self._day(time.time() - self.retention_days * 86400)
+
+    def segment(self, day: str) -> AppendOnlyLog:
+        return AppendOnlyLog(os.path.join(self.directory, f"{day}.bin"), self.dtype)
+
+    def _segment_days(self) -> list:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+
+        return sorted(name[:-4] for name in names if name.endswith(".bin"))
+
+    def days(self) -> list:
+        """
+        Retained days, oldest first.
+        """
+        cutoff = self._cutoff()
+        return [day for day in self._segment_days() if day >= cutoff]
+
+    def _prune(self, today: str):
+        if self._pruned_day == today:
+            return
+
+        cutoff = self._cutoff()
+
+        for day in self._segment_days():
+            if day < cutoff:
+                try:
+                    os.remove(self.segment(day).path)
+                except FileNotFoundError:
+                    pass  # pruned by another worker
+
+        self._pruned_day = today
+
+    def append(self, record: tuple):
+        self.extend([record])
+
+    def extend(self, records: list):
+        today = self._day()
+        self._prune(today)
+        self.segment(today).extend(records)
+
+    def read(self) -> np.ndarray:
+        """
+        All retained records, oldest first.
+        """
+        parts = [self.segment(day).read() for day in self.days()]
+
+        if not parts:
+            return np.empty(0, dtype=self.dtype)
+
+        return np.concatenate(parts)
+
+    def sizes(self) -> tuple:
+        """
+        (day, record count) of the retained segments: changes whenever
+        a record is appended or a segment expires.
+        """
+        return tuple((day, len(self.segment(day))) for day in self.days())
+
+
+features_log = SegmentedLog(FEATURES_DIR, FEATURE_RECORD, FEEDBACK_RETENTION_DAYS)
+outcomes_log = SegmentedLog(OUTCOMES_DIR, OUTCOME_RECORD, FEEDBACK_RETENTION_DAYS)
+
+# trace_id → (day, record index) of the FEEDBACK_INDEX_SIZE most recently
+# archived predictions (all workers append to the same segments)
+_index = collections.OrderedDict()
+_indexed = {}       # day → records of that segment already indexed
+_refreshed_at = float("-inf")
+_lock = threading.Lock()
+
+
+def _refresh_index():
+    """
+    Index predictions archived since the last refresh. Reads at most
+    FEEDBACK_INDEX_SIZE records, and only once per FEEDBACK_REFRESH_S:
+    unknown trace_ids cannot make lookups scan the archive.
+    """
+    global _indexed, _refreshed_at
+
+    now = time.monotonic()
+    if now - _refreshed_at < FEEDBACK_REFRESH_S:
+        return
+    _refreshed_at = now
+
+    # Newest segments first, down to the oldest record the index keeps
+    remaining = FEEDBACK_INDEX_SIZE
+    unread = []
+
+    for day, total in reversed(features_log.sizes()):
+        start = max(_indexed.get(day, 0), total - remaining)
+
+        if start < total:
+            unread.append((day, start, total))
+
+        remaining -= min(total, remaining)
+        if not remaining:
+            break
+
+    for day, start, total in reversed(unread):
+        records = features_log.segment(day).read(start, total - start)
+
+        for offset, trace_id in enumerate(records["trace_id"]):
+            _index[trace_id.decode()] = (day, start + offset)
+
+        _indexed[day] = start + len(records)
+
+    while len(_index) > FEEDBACK_INDEX_SIZE:
+        _index.popitem(last=False)
+
+    retained = set(features_log.days())
+    _indexed = {day: n for day, n in _indexed.items() if day in retained}
+
+
+def _lookup(trace_id: str):
+    """
+    Archived prediction for a trace_id (None if unknown or no longer
+    indexed / retained).
+    """
+    with _lock:
+        location = _index.get(trace_id)
+
+        if location is None:
+            _refresh_index()
+            location = _index.get(trace_id)
+
+    if location is None:
+        return None
+
+    day, position = location
+    records = features_log.segment(day).read(position, 1)
+
+    # Segment deleted by retention since it was indexed
+    if not len(records) or records[0]["trace_id"] != trace_id.encode():
+        return None
+
+    return records[0]
+
+
+def archive_features(trace_id: str, model_version: str, features: list, delay_probability: float):
+    """
+    Keep the feature vector behind a /predict response so an outcome
+    reported later can be turned into a training row.
+    """
+    features_log.append((
+        trace_id.encode()[:TRACE_ID_BYTES],
+        time.time(),
+        model_version.encode()[:24],
+        np.asarray(features, dtype=np.float32),
+        delay_probability
+    ))
+
+
+def record_outcome(trace_id: str, outcome: str) -> dict:
+    """
+    Store an observed outcome against an archived prediction.
+
+    Raises
+    ------
+    ValueError
+        Unknown outcome name or malformed trace_id
+    KeyError
+        No archived prediction for this trace_id among the
+        FEEDBACK_INDEX_SIZE most recent ones
+    """
+    if outcome not in OUTCOMES:
+        raise ValueError(
+            f"Unknown outcome '{outcome}'. Allowed: {', '.join(OUTCOMES)}"
+        )
+
+    try:
+        uuid.UUID(trace_id)
+    except ValueError:
+        raise ValueError(f"Malformed trace_id '{trace_id}'")
+
+    record = _lookup(trace_id)
+
+    if record is None:
+        raise KeyError(
+            f"No archived prediction for trace_id {trace_id} (unknown, or "
+            f"older than the last {FEEDBACK_INDEX_SIZE} predictions / "
+            f"{FEEDBACK_RETENTION_DAYS} days)"
+        )
+
+    outcomes_log.append((
+        trace_id.encode()[:TRACE_ID_BYTES], time.time(), OUTCOMES.index(outcome)
+    ))
+
+    return {
+        "trace_id": trace_id,
+        "outcome": outcome,
+        "model_version": record["model_version"].decode(),
+        "delay_probability": round(float(record["delay_probability"]), 3)
+    }
+
+
+def training_data():
+    """
+    Feedback rows for retraining: archived features joined with the
+    latest reported outcome per trace_id.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        X (n, N_FEATURES) and binary delay labels y
+    """
+    features = features_log.read()
+    outcomes = outcomes_log.read()
+
+    # Later reports override earlier ones
+    latest = {}
+    for record in outcomes:
+        latest[record["trace_id"]] = record["outcome"]
+
+    rows = {record["trace_id"]: record["features"] for record in features}
+    keys = [key for key in latest if key in rows]
+
+    X = np.array([rows[key] for key in keys], dtype=float).reshape(-1, N_FEATURES)
+    y = np.array([int(latest[key] != 0) for key in keys], dtype=int)
+
+    return X, y
+
+
+_distinct = (None, 0)   # (since, outcomes_log.sizes()) → count
+
+
+def distinct_outcomes(since: float = 0.0) -> int:
+    """
+    Predictions with an outcome reported after `since` (epoch seconds);
+    a trace_id reported several times counts once.
+    """
+    global _distinct
+
+    signature = (since, outcomes_log.sizes())
+
+    if _distinct[0] != signature:
+        outcomes = outcomes_log.read()
+        recent = outcomes["trace_id"][outcomes["timestamp"] > since]
+        _distinct = (signature, len(np.unique(recent)))
+
+    return _distinct[1]
@@ -1,24 +1,190 @@
 import os
-import requests
+import json
+import datetime
 from dotenv import load_dotenv
 
+from .http_client import session
+from .cache_service import TTLCache
+from .records import Flight
+from .rate_limiter import (
+    TokenBucketLimiter,
+    RateLimitExceeded,
+    PRIORITY_INTERACTIVE
+)
+
 # Load environment variables
 load_dotenv()
 
+# aerodatabox → RapidAPI (production)
+# stub        → local schedule in app/data/stub_flights.json (tests / dev)
+FLIGHT_RESOLVER = os.getenv("FLIGHT_RESOLVER", "aerodatabox").lower()
+
 AERODATABOX_API_KEY = os.getenv("AERODATABOX_API_KEY")
 
-if not AERODATABOX_API_KEY:
+if FLIGHT_RESOLVER == "aerodatabox" and not AERODATABOX_API_KEY:
     raise RuntimeError("AERODATABOX_API_KEY not set in .env")
 
 BASE_URL = "https://aerodatabox.p.rapidapi.com/flights/number"
+AIRPORT_URL = "https://aerodatabox.p.rapidapi.com/flights/airports/icao"
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # app/
+STUB_FILE = os.path.join(BASE_DIR, "data", "stub_flights.json")
+
+# Schedules rarely change within a day; each miss costs API quota
+FLIGHT_CACHE_TTL_S = float(os.getenv("FLIGHT_CACHE_TTL_S", "1800"))
+
+# Misses cost a quota-limited AeroDataBox call (memory budget weight)
+flight_cache = TTLCache(
+    "flight", maxsize=4096, ttl_s=FLIGHT_CACHE_TTL_S, cost=1000.0
+)
+departures_cache = TTLCache(
+    "departures", maxsize=256, ttl_s=FLIGHT_CACHE_TTL_S, cost=1000.0
+)
+
+# -----------------------------
+# Upstream rate control (RapidAPI plan limits)
+# -----------------------------
+# Host-wide: workers share one bucket and quota through the SQLite
+# cache tier. With SHARED_CACHE_BACKEND=none each worker has its own,
+# so divide the rate / burst by the worker count.
+AERODATABOX_RATE_PER_S = float(os.getenv("AERODATABOX_RATE_PER_S", "1"))
+AERODATABOX_BURST = int(os.getenv("AERODATABOX_BURST", "3"))
+
+# Longest an interactive request queues before failing fast
+AERODATABOX_MAX_WAIT_S = float(os.getenv("AERODATABOX_MAX_WAIT_S", "10"))
+
+# Monthly requests kept for interactive traffic only
+AERODATABOX_QUOTA_RESERVE = int(os.getenv("AERODATABOX_QUOTA_RESERVE", "50"))
+
+limiter = TokenBucketLimiter(
+    "aerodatabox",
+    rate_per_s=AERODATABOX_RATE_PER_S,
+    burst=AERODATABOX_BURST,
+    max_wait_s=AERODATABOX_MAX_WAIT_S,
+    quota_reserve=AERODATABOX_QUOTA_RESERVE
+)
+
+
+def _headers():
+    return {
+        "x-rapidapi-key": AERODATABOX_API_KEY,
+        "x-rapidapi-host": "aerodatabox.p.rapidapi.com"
+    }
+
+
+def _parse_flight(flight: dict, flight_number: str):
+    """
+    Normalize an AeroDataBox flight (with leg info) into our flight record.
+    """
+    return Flight(
+        flight_number=flight_number,
+        airline=flight["airline"]["icao"],
+        origin=flight["departure"]["airport"]["icao"],
+        destination=flight["arrival"]["airport"]["icao"],
+        scheduled_departure=flight["departure"]["scheduledTime"]["utc"],
+        scheduled_arrival=flight["arrival"]["scheduledTime"]["utc"],
+        aircraft_registration=(flight.get("aircraft") or {}).get("reg"),
+        source="AERODATABOX"
+    )
+
+
+def _get(url: str, params: dict, priority: int):
+    """
+    Rate-limited GET against AeroDataBox.
+
+    Records the plan quota from RapidAPI headers; a 429 pauses the
+    limiter for Retry-After and surfaces as RateLimitExceeded.
+    """
+    limiter.acquire(priority)
+
+    response = session.get(
+        url,
+        headers=_headers(),
+        params=params,
+        timeout=15
+    )
+
+    headers = response.headers
+    limiter.update_quota(
+        limit=headers.get("x-ratelimit-requests-limit"),
+        remaining=headers.get("x-ratelimit-requests-remaining"),
+        reset_s=headers.get("x-ratelimit-requests-reset")
+    )
+
+    if response.status_code == 429:
+        try:
+            retry_after = float(headers.get("retry-after", 1))
+        except ValueError:
+            retry_after = 1.0
+
+        limiter.pause(retry_after)
+        raise RateLimitExceeded(
+            "AeroDataBox rate limit / quota exceeded", retry_after
+        )
+
+    response.raise_for_status()
+
+    return response
 
 
-def resolve_flight(flight_number: str, date: str):
+# -----------------------------
+# Local stub schedule
+# -----------------------------
+def _stub_flights(date: str):
+    """
+    Materialize the stub schedule (UTC times of day) for a date.
+    """
+    with open(STUB_FILE, "r") as f:
+        schedule = json.load(f)["flights"]
+
+    day = datetime.date.fromisoformat(date)
+    flights = []
+
+    for entry in schedule:
+        hour, minute = map(int, entry["departure_utc"].split(":"))
+        departure = datetime.datetime(
+            day.year, day.month, day.day, hour, minute,
+            tzinfo=datetime.UTC
+        )
+        arrival = departure + datetime.timedelta(minutes=entry["duration_min"])
+
+        flights.append(Flight(
+            flight_number=entry["flight_number"],
+            airline=entry["airline"],
+            origin=entry["origin"],
+            destination=entry["destination"],
+            scheduled_departure=departure.strftime("%Y-%m-%d %H:%MZ"),
+            scheduled_arrival=arrival.strftime("%Y-%m-%d %H:%MZ"),
+            aircraft_registration=entry.get("aircraft_registration"),
+            source="STUB"
+        ))
+
+    return flights
+
+
+# -----------------------------
+# Single flight
+# -----------------------------
+def resolve_flight(
+    flight_number: str,
+    date: str,
+    priority: int = PRIORITY_INTERACTIVE
+):
     """
     Resolve flight using AeroDataBox API.
     Returns origin, destination, scheduled departure and arrival times.
     """
 
+    cached = flight_cache.get((flight_number, date))
+    if cached is not None:
+        return cached
+
+    if FLIGHT_RESOLVER == "stub":
+        for flight in _stub_flights(date):
+            if flight.flight_number == flight_number:
+                return flight
+        raise Exception("No flight data returned from stub schedule")
+
     url = f"{BASE_URL}/{flight_number}/{date}"
 
     querystring = {
@@ -28,40 +194,81 @@ def resolve_flight(flight_number: str, date: str):
         "dateLocalRole": "Both"
     }
 
-    headers = {
-        "x-rapidapi-key": AERODATABOX_API_KEY,
-        "x-rapidapi-host": "aerodatabox.p.rapidapi.com"
-    }
-
-    response = requests.get(
-        url,
-        headers=headers,
-        params=querystring,
-        timeout=15
-    )
-    response.raise_for_status()
-
-    data = response.json()
+    data = _get(url, querystring, priority).json()
 
     if not data:
         raise Exception("No flight data returned from AeroDataBox")
 
-    flight = data[0]
+    flight = _parse_flight(data[0], flight_number)
+    flight_cache.set((flight_number, date), flight)
 
-    return {
-        "flight_number": flight_number,
-        "airline": flight["airline"]["icao"],
-        "origin": {
-            "icao": flight["departure"]["airport"]["icao"]
-        },
-        "destination": {
-            "icao": flight["arrival"]["airport"]["icao"]
-        },
-        "scheduled_departure": flight["departure"]["scheduledTime"]["utc"],
-        "scheduled_arrival": flight["arrival"]["scheduledTime"]["utc"],
-        "source": "AERODATABOX"
+    return flight
+
+
+# -----------------------------
+# Airport departure schedule
+# -----------------------------
+def resolve_departures(
+    icao: str,
+    date: str,
+    priority: int = PRIORITY_INTERACTIVE
+):
+    """
+    Resolve every scheduled departure from an airport on a date.
+
+    `date` is the airport's local date, like the flight date of
+    resolve_flight: AeroDataBox airport queries take local times, and
+    caps them at 12 hours, so a day is two local windows. Returned
+    times are UTC, so a board can start or end on the neighbouring UTC
+    day. The stub schedule has no time zones: its day is UTC.
+
+    Each window returns all flights with leg info, so no per-flight
+    lookup is needed.
+    """
+
+    cached = departures_cache.get((icao, date))
+    if cached is not None:
+        return cached
+
+    if FLIGHT_RESOLVER == "stub":
+        flights = [
+            flight for flight in _stub_flights(date)
+            if flight.origin == icao
+        ]
+        departures_cache.set((icao, date), flights)
+        return flights
+
+    querystring = {
+        "direction": "Departure",
+        "withLeg": "true",
+        "withCancelled": "false",
+        "withCodeshared": "false",
+        "withCargo": "false",
+        "withPrivate": "false",
+        "withLocation": "false"
     }
 
+    flights = []
+
+    # Local times of day
+    for window in (("00:00", "11:59"), ("12:00", "23:59")):
+        url = f"{AIRPORT_URL}/{icao}/{date}T{window[0]}/{date}T{window[1]}"
+
+        response = _get(url, querystring, priority)
+
+        for flight in (response.json() or {}).get("departures", []):
+            try:
+                flights.append(
+                    _parse_flight(flight, flight["number"].replace(" ", ""))
+                )
+            except (KeyError, TypeError):
+                # Incomplete legs (no ICAO / schedule) cannot be scored
+                continue
+
+    departures_cache.set((icao, date), flights)
+
+    return flights
+
 
 # Local test (optional)
 if __name__ == "__main__":
@@ -0,0 +1,40 @@
+import os
+import requests
+from requests.adapters import HTTPAdapter
+
+# -----------------------------
+# Shared upstream HTTP session
+# -----------------------------
+# Keeps TLS connections to aviationweather.gov / AeroDataBox alive
+# across requests instead of a new handshake per call.
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+
+session = requests.Session()
+
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=HTTP_POOL_SIZE
+)
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
+
+
+def warm_connections(urls: list, timeout: float = 5.0) -> dict:
+    """
+    Open pooled connections to upstream hosts (HEAD requests).
+
+    Returns
+    -------
+    dict
+        url → "ok" or the error message
+    """
+    results = {}
+
+    for url in urls:
+        try:
+            session.head(url, timeout=timeout, allow_redirects=False)
+            results[url] = "ok"
+        except Exception as e:
+            results[url] = str(e)
+
+    return results
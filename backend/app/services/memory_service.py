@@ -0,0 +1,262 @@
+import os
+import sys
+import math
+import heapq
+import itertools
+import threading
+
+# -----------------------------
+# Configuration
+# -----------------------------
+# Per-worker budget for everything registered here (caches, models,
+# explainer tables; the serving artifacts are pinned, caches
+# evicted); 0 → account only, never evict
+MEMORY_BUDGET_MB = float(os.getenv("MEMORY_BUDGET_MB", "512"))
+
+# Objects visited per size estimate (large containers are extrapolated)
+SIZE_SAMPLE_LIMIT = int(os.getenv("SIZE_SAMPLE_LIMIT", "2000"))
+
+
+# -----------------------------
+# Size estimates
+# -----------------------------
+def estimate_size(obj) -> int:
+    """
+    Approximate deep size in bytes: containers, slotted records and
+    plain objects are walked; arrays count their buffers (nbytes).
+    Shared objects are counted once.
+    """
+    seen = set()
+    budget = [SIZE_SAMPLE_LIMIT]
+
+    def size(o) -> int:
+        if id(o) in seen or budget[0] <= 0:
+            return 0
+
+        seen.add(id(o))
+        budget[0] -= 1
+
+        total = sys.getsizeof(o, 0)
+
+        if isinstance(o, (str, bytes, bytearray, int, float, bool, type(None))):
+            return total
+
+        # numpy arrays (views report their base's buffer)
+        nbytes = getattr(o, "nbytes", None)
+        if isinstance(nbytes, int):
+            return total + nbytes
+
+        if isinstance(o, dict):
+            return total + sum(size(k) + size(v) for k, v in o.items())
+
+        if isinstance(o, (list, tuple, set, frozenset)):
+            items = list(o)
+            counted = sum(size(item) for item in items)
+
+            # Extrapolate when the sample budget ran out mid-container
+            if budget[0] <= 0 and items:
+                visited = sum(1 for item in items if id(item) in seen)
+                counted = counted * len(items) // max(visited, 1)
+
+            return total + counted
+
+        for slot in getattr(type(o), "__slots__", ()):
+            if hasattr(o, slot):
+                total += size(getattr(o, slot))
+
+        if hasattr(o, "__dict__"):
+            total += size(vars(o))
+
+        return total
+
+    return size(obj)
+
+
+# -----------------------------
+# Budget (GreedyDual-Size)
+# -----------------------------
+class MemoryBudget:
+    """
+    Byte accounting for every registered owner (a cache, the model
+    registry, ...) with eviction across owners under one budget.
+
+    Eviction is GreedyDual-Size: an entry's priority is
+
+        H = L + cost / size
+
+    (cost: relative time to recompute it, e.g. an upstream call). The
+    lowest H is evicted first and L rises to it, so entries not touched
+    since age out; a hit resets H from the current L. Large,
+    cheap-to-rebuild entries go first.
+
+    Pinned entries (serving models, explainer tables: a reload
+    would land on the request path) count towards the budget but are
+    never evicted; evictable entries share what they leave.
+
+    Lock order is owner lock → budget lock: owners may charge / release
+    while holding their own lock, and run the returned evictions once
+    they have released it.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self.used = 0
+        self.pinned = 0
+        self.inflation = 0.0
+        self.evictions = 0
+
+        self._entries = {}  # (owner, key) → (priority, size, cost, seq, pinned)
+        self._heap = []     # (priority, seq, owner, key); stale items skipped
+        self._owners = {}   # name → {"evict": callback, counters}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def register(self, owner: str, evict=None):
+        """
+        `evict(key)` drops an entry chosen for eviction (called without
+        the budget lock held; must release the key if it still holds
+        it). Owners with pinned entries only need no callback.
+        """
+        with self._lock:
+            stats = self._owners.setdefault(
+                owner, {"entries": 0, "bytes": 0, "evictions": 0}
+            )
+            stats["evict"] = evict
+
+    def _remove(self, owner: str, key):
+        # Caller holds the lock
+        entry = self._entries.pop((owner, key), None)
+
+        if entry is not None:
+            self.used -= entry[1]
+            if entry[4]:
+                self.pinned -= entry[1]
+
+            stats = self._owners[owner]
+            stats["entries"] -= 1
+            stats["bytes"] -= entry[1]
+
+        return entry
+
+    def _push(self, owner: str, key, size: int, cost: float):
+        # Caller holds the lock
+        priority = self.inflation + cost / max(size, 1)
+        seq = next(self._seq)
+
+        self._entries[(owner, key)] = (priority, size, cost, seq, False)
+        heapq.heappush(self._heap, (priority, seq, owner, key))
+
+        # Drop stale heap items once they outnumber live entries
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [
+                (e[0], e[3], o, k)
+                for (o, k), e in self._entries.items() if not e[4]
+            ]
+            heapq.heapify(self._heap)
+
+    def charge(
+        self,
+        owner: str,
+        key,
+        size: int,
+        cost: float = 0.0,
+        pinned: bool = False
+    ) -> list:
+        """
+        Account for a new (or replaced) entry and pick victims across
+        owners while over budget.
+
+        Returns
+        -------
+        list
+            Evictions to run with evict() once the caller's own lock is
+            released
+        """
+        victims = []
+
+        with self._lock:
+            self._remove(owner, key)
+
+            if pinned:
+                self._entries[(owner, key)] = (math.inf, size, cost, -1, True)
+                self.pinned += size
+            else:
+                self._push(owner, key, size, cost)
+
+            stats = self._owners[owner]
+            stats["entries"] += 1
+            stats["bytes"] += size
+            self.used += size
+
+            while self.budget_bytes and self.used > self.budget_bytes and self._heap:
+                priority, seq, victim_owner, victim_key = heapq.heappop(self._heap)
+
+                entry = self._entries.get((victim_owner, victim_key))
+                if entry is None or entry[3] != seq:
+                    continue
+
+                self._remove(victim_owner, victim_key)
+                self.inflation = priority
+                self.evictions += 1
+                self._owners[victim_owner]["evictions"] += 1
+
+                victims.append((self._owners[victim_owner]["evict"], victim_key))
+
+        return victims
+
+    @staticmethod
+    def evict(victims: list):
+        """
+        Run evictions returned by charge().
+        """
+        for evict, key in victims:
+            evict(key)
+
+    def touch(self, owner: str, key):
+        """
+        Entry used: restore its priority from the current L.
+        """
+        with self._lock:
+            entry = self._entries.get((owner, key))
+
+            if entry is not None and not entry[4]:
+                self._push(owner, key, entry[1], entry[2])
+
+    def release(self, owner: str, key):
+        """
+        Entry dropped by its owner (expiry, own size limit, replacement).
+        """
+        with self._lock:
+            self._remove(owner, key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "budget_bytes": self.budget_bytes,
+                "used_bytes": self.used,
+                "pinned_bytes": self.pinned,
+                "utilization": (
+                    round(self.used / self.budget_bytes, 3)
+                    if self.budget_bytes else None
+                ),
+                "evictions": self.evictions,
+                "inflation": round(self.inflation, 6),
+                "owners": {
+                    name: {k: v for k, v in stats.items() if k != "evict"}
+                    for name, stats in sorted(self._owners.items())
+                }
+            }
+
+    def owner_bytes(self, owner: str) -> int:
+        stats = self._owners.get(owner)
+        return stats["bytes"] if stats else 0
+
+
+budget = MemoryBudget(int(MEMORY_BUDGET_MB * 1024 * 1024))
+
+
+def memory_stats() -> dict:
+    """
+    Bytes accounted per owner and evictions under the worker budget.
+    """
+    return budget.stats()
@@ -1,14 +1,28 @@
-import requests
+import os
+
+from .http_client import session
+from .cache_service import TTLCache
 
 METAR_API = "https://aviationweather.gov/api/data/metar"
 
+# METARs are issued every 30–60 min
+METAR_CACHE_TTL_S = float(os.getenv("METAR_CACHE_TTL_S", "300"))
+
+metar_cache = TTLCache(
+    "metar", maxsize=1024, ttl_s=METAR_CACHE_TTL_S, cost=300.0
+)
+
 
 def get_metar(icao: str):
     """
     Fetch NOAA METAR for an airport ICAO code.
     Returns parsed JSON dict.
     """
-    response = requests.get(
+    cached = metar_cache.get(icao)
+    if cached is not None:
+        return cached
+
+    response = session.get(
         f"{METAR_API}?ids={icao}&format=json",
         timeout=10
     )
@@ -19,8 +33,44 @@ def get_metar(icao: str):
     if not data:
         raise RuntimeError(f"No METAR data returned for {icao}")
 
+    metar_cache.set(icao, data[0])
+
     return data[0]
 
+
+def get_metars(icaos: list, chunk_size: int = 50):
+    """
+    Fetch NOAA METARs for many airports with one request per chunk.
+    Returns {icao: metar dict}; airports without a METAR are omitted.
+    """
+    icaos = list(dict.fromkeys(icaos))
+    metars = {}
+
+    for icao in icaos:
+        cached = metar_cache.get(icao)
+        if cached is not None:
+            metars[icao] = cached
+
+    missing = [icao for icao in icaos if icao not in metars]
+
+    for start in range(0, len(missing), chunk_size):
+        chunk = missing[start:start + chunk_size]
+
+        response = session.get(
+            f"{METAR_API}?ids={','.join(chunk)}&format=json",
+            timeout=10
+        )
+        response.raise_for_status()
+
+        # Latest observation first: keep the first one seen per airport
+        for metar in response.json() or []:
+            icao = metar.get("icaoId")
+            if icao not in metars:
+                metars[icao] = metar
+                metar_cache.set(icao, metar)
+
+    return metars
+
 #example usage
 if __name__ == "__main__":
-    print(get_metar("VIDP")["rawOb"])
\ No newline at end of file
+    print(get_metar("VIDP")["rawOb"])
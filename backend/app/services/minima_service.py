@@ -1,5 +1,6 @@
 import json
 import os
+import numpy as np
 
 # -----------------------------
 # CAT minima reference (meters)
@@ -83,6 +84,38 @@ def check_landing_feasible(icao: str, taf_min_vis_km: float) -> bool:
     rvr_m = km_to_rvr_m(taf_min_vis_km)
     return rvr_m >= required_rvr
 
+
+# -----------------------------
+# Vectorized feasibility checks
+# -----------------------------
+def _required_rvr(icaos, kind: str) -> np.ndarray:
+    """
+    Required RVR (m) per airport; kind is "takeoff_rvr" or "landing_rvr".
+    """
+    return np.array(
+        [CAT_MINIMA[get_airport_category(icao)][kind] for icao in icaos],
+        dtype=float
+    )
+
+
+def _rvr_m(taf_min_vis_km) -> np.ndarray:
+    # Same truncation as km_to_rvr_m
+    return np.trunc(np.asarray(taf_min_vis_km, dtype=float) * 1000)
+
+
+def check_takeoff_feasible_batch(icaos, taf_min_vis_km) -> np.ndarray:
+    """
+    Array form of check_takeoff_feasible (one airport per row).
+    """
+    return _rvr_m(taf_min_vis_km) >= _required_rvr(icaos, "takeoff_rvr")
+
+
+def check_landing_feasible_batch(icaos, taf_min_vis_km) -> np.ndarray:
+    """
+    Array form of check_landing_feasible (one airport per row).
+    """
+    return _rvr_m(taf_min_vis_km) >= _required_rvr(icaos, "landing_rvr")
+
 # Example usage
 '''if __name__ == "__main__":
     # Airport explicitly in JSON
@@ -0,0 +1,42 @@
+import numpy as np
+
+# -----------------------------
+# Accuracy guard
+# -----------------------------
+# Largest tolerated loss of a candidate model against the reference on a
+# holdout (compact variant vs full forest, retrained vs production)
+GUARD_MAX_AUC_DROP = 0.01
+GUARD_MAX_F1_DROP = 0.02
+GUARD_MAX_PROB_DEVIATION = 0.10
+
+
+def guard_report(reference_model, candidate_model, X_holdout, y_holdout) -> dict:
+    """
+    AUC / F1 of both models and max probability deviation on a holdout.
+
+    Returns
+    -------
+    dict
+        Metrics and `passed` (candidate within the guard limits)
+    """
+    # sklearn.metrics is only needed by training / retraining jobs
+    from sklearn.metrics import f1_score, roc_auc_score
+
+    p_reference = reference_model.predict_proba(X_holdout)[:, 1]
+    p_candidate = candidate_model.predict_proba(X_holdout)[:, 1]
+
+    report = {
+        "auc_reference": float(roc_auc_score(y_holdout, p_reference)),
+        "auc_candidate": float(roc_auc_score(y_holdout, p_candidate)),
+        "f1_reference": float(f1_score(y_holdout, (p_reference >= 0.5).astype(int))),
+        "f1_candidate": float(f1_score(y_holdout, (p_candidate >= 0.5).astype(int))),
+        "max_prob_deviation": float(np.abs(p_reference - p_candidate).max())
+    }
+
+    report["passed"] = (
+        report["auc_reference"] - report["auc_candidate"] <= GUARD_MAX_AUC_DROP and
+        report["f1_reference"] - report["f1_candidate"] <= GUARD_MAX_F1_DROP and
+        report["max_prob_deviation"] <= GUARD_MAX_PROB_DEVIATION
+    )
+
+    return report
@@ -0,0 +1,237 @@
+import os
+import time
+import hashlib
+import threading
+
+from .memory_service import budget
+
+# -----------------------------
+# Model artifacts
+# -----------------------------
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+MODEL_DIR = os.path.join(BASE_DIR, "models")
+
+# variant name → artifact file (see train_delay_model.py)
+MODEL_VARIANTS = {
+    "full": "delay_model.pkl",
+    "compact": "delay_model_compact.pkl"
+}
+
+# Deployment default; /predict?model=... overrides per request
+DEFAULT_MODEL_VARIANT = os.getenv("MODEL_VARIANT", "full")
+
+_models = {}    # variant / candidate → (artifact mtime, model)
+_versions = {}  # variant → (artifact mtime, content hash)
+_lock = threading.Lock()
+
+
+def resolve_variant(variant: str | None) -> str:
+    """
+    Validate a variant name (None → deployment default).
+    """
+    variant = variant or DEFAULT_MODEL_VARIANT
+
+    if variant not in MODEL_VARIANTS:
+        raise ValueError(
+            f"Unknown model variant '{variant}'. "
+            f"Allowed: {', '.join(MODEL_VARIANTS)}"
+        )
+
+    return variant
+
+
+def model_path(variant: str | None = None) -> str:
+    return os.path.join(MODEL_DIR, MODEL_VARIANTS[resolve_variant(variant)])
+
+
+def available_variants() -> list:
+    """
+    Variants whose artifact exists on disk.
+    """
+    return [
+        name for name in MODEL_VARIANTS
+        if os.path.exists(model_path(name))
+    ]
+
+
+def _artifact_stamp(path: str):
+    """
+    Modification time of an artifact (None if missing). A republished
+    artifact (retrain_service) gets a new stamp and is reloaded.
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _load_model(key: str, path: str, missing_message: str):
+    """
+    Load an artifact once per modification time, cached under `key`.
+    """
+    stamp = _artifact_stamp(path)
+
+    cached = _models.get(key)
+    if cached is not None and cached[0] == stamp:
+        budget.touch("models", key)
+        return cached[1]
+
+    with _lock:
+        cached = _models.get(key)
+
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        if stamp is None:
+            raise RuntimeError(missing_message)
+
+        # joblib / sklearn are imported on first load only
+        import joblib
+
+        start = time.perf_counter()
+        model = joblib.load(path)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        # Tree arrays are stored raw: the artifact size is the model's
+        # memory footprint, and reloading costs what this load did
+        size = os.path.getsize(path)
+
+        # Parallelism comes from the inference executor, not from
+        # joblib threads spun up per call (which dominate latency
+        # for small batches)
+        model.n_jobs = 1
+
+        _models[key] = (stamp, model)
+
+        # Serving variants are pinned (a reload would block /predict);
+        # shadow candidates only run in the background and may go
+        victims = budget.charge(
+            "models", key, size, load_ms, pinned=not key.startswith("candidate:")
+        )
+
+    budget.evict(victims)
+
+    return model
+
+
+def _evict_model(key: str):
+    """
+    Candidate dropped under memory pressure: reloaded from disk on next
+    use.
+    """
+    with _lock:
+        _models.pop(key, None)
+        budget.release("models", key)
+
+
+budget.register("models", _evict_model)
+
+
+def get_model(variant: str | None = None):
+    """
+    Load (once per published artifact) and return the model for a variant.
+    """
+    variant = resolve_variant(variant)
+
+    return _load_model(
+        variant,
+        model_path(variant),
+        f"{MODEL_VARIANTS[variant]} not found. Train the model first."
+    )
+
+
+def candidate_path(name: str) -> str:
+    """
+    Artifact of a candidate model: a variant name or a file in MODEL_DIR.
+    """
+    if name in MODEL_VARIANTS:
+        return model_path(name)
+
+    return os.path.join(MODEL_DIR, os.path.basename(name))
+
+
+def get_candidate_model(name: str):
+    """
+    Load a candidate model (shadow evaluation) by variant or file name.
+    """
+    path = candidate_path(name)
+
+    return _load_model(
+        f"candidate:{path}", path, f"Candidate model {name} not found"
+    )
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def get_model_version(variant: str | None = None) -> str:
+    """
+    Content hash of the variant's artifact: identifies the model
+    in ETags / logs. Does not load the model (the web process may
+    never need it when inference runs in worker processes).
+    """
+    variant = resolve_variant(variant)
+    path = model_path(variant)
+    stamp = _artifact_stamp(path)
+
+    cached = _versions.get(variant)
+    if cached is None or cached[0] != stamp:
+        with open(path, "rb") as f:
+            cached = (stamp, _content_hash(f.read()))
+        _versions[variant] = cached
+
+    return f"{variant}-{cached[1]}"
+
+
+def _write_artifact(model, path: str, label: str) -> str:
+    """
+    Write a model next to `path` and atomically move it into place.
+    """
+    import joblib
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    joblib.dump(model, tmp_path)
+
+    try:
+        with open(tmp_path, "rb") as f:
+            version = f"{label}-{_content_hash(f.read())}"
+
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return version
+
+
+def publish_model(model, variant: str | None = None) -> str:
+    """
+    Atomically replace a variant's artifact: serving processes pick up
+    the new file (new mtime) on their next get_model call.
+
+    Returns
+    -------
+    str
+        Version of the published model
+    """
+    variant = resolve_variant(variant)
+
+    return _write_artifact(model, model_path(variant), variant)
+
+
+def publish_candidate(model, name: str) -> str:
+    """
+    Atomically write a candidate artifact (not served; shadow mode can
+    evaluate it by file name, see shadow_service.SHADOW_MODELS).
+
+    Returns
+    -------
+    str
+        Version of the candidate
+    """
+    if name in MODEL_VARIANTS:
+        raise ValueError(f"'{name}' is a served variant, not a candidate")
+
+    return _write_artifact(model, candidate_path(name), "candidate")
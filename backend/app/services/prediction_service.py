@@ -1,67 +1,66 @@
-import os
-import joblib
 import numpy as np
 
-# -----------------------------
-# Load trained model
-# -----------------------------
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-MODEL_PATH = os.path.join(BASE_DIR, "models", "delay_model.pkl")
+from .model_registry import get_model
+from .records import Prediction
 
-if not os.path.exists(MODEL_PATH):
-    raise RuntimeError("delay_model.pkl not found. Train the model first.")
+# Models are loaded lazily by model_registry (first call / warm-up),
+# keeping sklearn off the import path.
 
-model = joblib.load(MODEL_PATH)
 
-# Expected number of features (must match training)
-EXPECTED_FEATURE_COUNT = model.n_features_in_
-
-
-def predict_delay_risk(features: list):
+def predict_delay_risk_batch(X, variant: str | None = None):
     """
-    Predict delay probability using trained ML model.
+    Predict delay probabilities for a batch of feature vectors
+    in a single model call.
 
     Parameters
     ----------
-    features : list[float]
-        Feature vector from feature_service (length = 12)
+    X : array-like, shape (n_rows, n_features)
+        Stacked feature vectors from feature_service
+    variant : str, optional
+        Model variant from model_registry (default: deployment default)
 
     Returns
     -------
-    dict
-        Delay probability and risk band
+    list[Prediction]
+        One prediction per row
     """
 
-    # -----------------------------
-    # Validation
-    # -----------------------------
-    if len(features) != EXPECTED_FEATURE_COUNT:
+    model = get_model(variant)
+
+    X = np.asarray(X, dtype=float)
+
+    if X.ndim != 2 or X.shape[1] != model.n_features_in_:
         raise ValueError(
-            f"Expected {EXPECTED_FEATURE_COUNT} features, "
-            f"got {len(features)}"
+            f"Expected batch of shape (n, {model.n_features_in_}), "
+            f"got {X.shape}"
         )
 
-    # Convert to numpy for safety
-    X = np.array(features).reshape(1, -1)
-
-    # -----------------------------
-    # Prediction
-    # -----------------------------
-    delay_prob = float(model.predict_proba(X)[0][1])
-
-    # -----------------------------
-    # Risk banding
-    # -----------------------------
-    if delay_prob >= 0.7:
-        risk_band = "HIGH"
-    elif delay_prob >= 0.4:
-        risk_band = "MEDIUM"
-    else:
-        risk_band = "LOW"
-
-    return {
-        "delay_probability": round(delay_prob, 3)
-    }
+    delay_probs = model.predict_proba(X)[:, 1]
+
+    return [
+        Prediction(round(float(p), 3))
+        for p in delay_probs
+    ]
+
+
+def predict_delay_risk(features: list, variant: str | None = None) -> Prediction:
+    """
+    Predict delay probability for a single feature vector.
+
+    Parameters
+    ----------
+    features : list[float]
+        Feature vector from feature_service
+    variant : str, optional
+        Model variant from model_registry (default: deployment default)
+
+    Returns
+    -------
+    Prediction
+        Delay probability
+    """
+
+    return predict_delay_risk_batch([features], variant)[0]
 
 
 # Example standalone test
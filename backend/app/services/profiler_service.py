@@ -0,0 +1,312 @@
+import os
+import sys
+import time
+import random
+import functools
+import threading
+
+from .config import BACKEND_DIR
+
+# -----------------------------
+# Configuration
+# -----------------------------
+# Bounds on an admin-started profiling session
+PROFILE_MAX_DURATION_S = float(os.getenv("PROFILE_MAX_DURATION_S", "300"))
+PROFILE_MIN_INTERVAL_MS = float(os.getenv("PROFILE_MIN_INTERVAL_MS", "1"))
+PROFILE_DEFAULT_INTERVAL_MS = float(os.getenv("PROFILE_DEFAULT_INTERVAL_MS", "5"))
+
+# Distinct stacks kept per session (further stacks are counted under
+# a single "[truncated]" entry)
+PROFILE_MAX_STACKS = int(os.getenv("PROFILE_MAX_STACKS", "10000"))
+PROFILE_MAX_DEPTH = int(os.getenv("PROFILE_MAX_DEPTH", "96"))
+
+TRUNCATED = ("[truncated]",)
+
+try:
+    _CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):
+    _CLOCK_TICKS = None
+
+
+def _thread_cpu_ticks(native_id: int):
+    """
+    CPU time (clock ticks) consumed so far by a thread of this process
+    (Linux /proc; None where unavailable).
+    """
+    try:
+        with open(f"/proc/self/task/{native_id}/stat", "rb") as f:
+            stat = f.read()
+    except OSError:
+        return None
+
+    # Fields after the parenthesised command name; utime / stime are
+    # fields 14 / 15 of the full line
+    fields = stat[stat.rindex(b")") + 2:].split()
+    return int(fields[11]) + int(fields[12])
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+
+    if filename.startswith(BACKEND_DIR):
+        filename = os.path.relpath(filename, BACKEND_DIR)
+    else:
+        filename = os.path.basename(filename)
+
+    return f"{code.co_qualname} ({filename})"
+
+
+class ProfileSession:
+    """
+    Samples the stacks of the request threads being profiled.
+
+    Wall-clock samples count every sample, whatever the thread is doing
+    (running, blocked on an upstream socket, waiting for the inference
+    executor). CPU samples are weighted by the CPU time the thread used
+    since the previous sample, so blocked time drops out.
+    """
+
+    def __init__(self, duration_s: float, sample_rate: float, interval_ms: float):
+        self.duration_s = duration_s
+        self.sample_rate = sample_rate
+        self.interval_s = interval_ms / 1000
+
+        self.started_at = time.time()
+        self.deadline = time.monotonic() + duration_s
+        self.stopped_at = None
+
+        self.requests = 0
+        self.samples = 0
+        self.wall = {}      # stack → samples
+        self.cpu = {}       # stack → CPU ms
+
+        self._threads = {}  # thread id → (native id, root code, last CPU ticks)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self._sampler = threading.Thread(
+            target=self._loop, name="profiler", daemon=True
+        )
+
+    @property
+    def running(self) -> bool:
+        return self.stopped_at is None
+
+    def start(self):
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+
+    # -- request threads -------------------------------------------------
+    def enter(self, root_code):
+        ident = threading.get_ident()
+        native_id = threading.get_native_id()
+
+        with self._lock:
+            self.requests += 1
+            self._threads[ident] = (
+                native_id, root_code, _thread_cpu_ticks(native_id)
+            )
+
+    def leave(self):
+        with self._lock:
+            self._threads.pop(threading.get_ident(), None)
+
+    # -- sampler ---------------------------------------------------------
+    def _stack(self, frame, root_code) -> tuple:
+        labels = []
+
+        while frame is not None and len(labels) < PROFILE_MAX_DEPTH:
+            labels.append(_frame_label(frame.f_code))
+
+            # Start the stack at the profiled endpoint
+            if frame.f_code is root_code:
+                break
+
+            frame = frame.f_back
+
+        return tuple(reversed(labels))
+
+    def _count(self, table: dict, stack: tuple, weight):
+        if stack not in table and len(table) >= PROFILE_MAX_STACKS:
+            stack = TRUNCATED
+
+        table[stack] = table.get(stack, 0) + weight
+
+    def _sample(self):
+        frames = sys._current_frames()
+
+        with self._lock:
+            threads = list(self._threads.items())
+
+        for ident, (native_id, root_code, last_ticks) in threads:
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+
+            stack = self._stack(frame, root_code)
+            ticks = _thread_cpu_ticks(native_id)
+
+            with self._lock:
+                if ident not in self._threads:
+                    continue
+
+                self.samples += 1
+                self._count(self.wall, stack, 1)
+
+                if ticks is not None and last_ticks is not None and _CLOCK_TICKS:
+                    cpu_ms = (ticks - last_ticks) * 1000 / _CLOCK_TICKS
+                    if cpu_ms > 0:
+                        self._count(self.cpu, stack, cpu_ms)
+
+                self._threads[ident] = (native_id, root_code, ticks)
+
+    def _loop(self):
+        try:
+            while not self._stop.is_set() and time.monotonic() < self.deadline:
+                self._sample()
+                self._stop.wait(self.interval_s)
+        finally:
+            self.stopped_at = time.time()
+
+    # -- results ---------------------------------------------------------
+    def collapsed(self, kind: str = "wall") -> str:
+        """
+        Collapsed-stack text ("frame;frame;frame value" per line), the
+        input format of flamegraph.pl / speedscope.
+        """
+        with self._lock:
+            table = dict(self.wall if kind == "wall" else self.cpu)
+
+        return "".join(
+            f"{';'.join(stack)} {round(value) if kind == 'cpu' else value}\n"
+            for stack, value in sorted(table.items(), key=lambda item: -item[1])
+            if value >= 0.5
+        )
+
+    def summary(self, top: int = 20) -> dict:
+        with self._lock:
+            wall = dict(self.wall)
+            cpu = dict(self.cpu)
+
+        def top_frames(table: dict):
+            # Inclusive weight per frame (each frame counted once per stack)
+            inclusive = {}
+            for stack, value in table.items():
+                for label in set(stack):
+                    inclusive[label] = inclusive.get(label, 0) + value
+
+            total = sum(table.values()) or 1
+
+            return [
+                {"frame": label, "share": round(value / total, 4)}
+                for label, value in sorted(
+                    inclusive.items(), key=lambda item: -item[1]
+                )[:top]
+            ]
+
+        return {
+            "running": self.running,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+            "duration_s": self.duration_s,
+            "sample_rate": self.sample_rate,
+            "interval_ms": self.interval_s * 1000,
+            "requests_profiled": self.requests,
+            "samples": self.samples,
+            "wall_ms": round(self.samples * self.interval_s * 1000, 1),
+            "cpu_ms": round(sum(cpu.values()), 1),
+            "cpu_available": _CLOCK_TICKS is not None,
+            "distinct_stacks": len(wall),
+            "top_wall_frames": top_frames(wall),
+            "top_cpu_frames": top_frames(cpu)
+        }
+
+
+# -----------------------------
+# Process-wide profiler
+# -----------------------------
+_session = None
+_lock = threading.Lock()
+
+
+def start_profile(
+    duration_s: float = 30,
+    sample_rate: float = 1.0,
+    interval_ms: float = PROFILE_DEFAULT_INTERVAL_MS
+) -> dict:
+    """
+    Start a bounded profiling session (one at a time per process).
+
+    Raises
+    ------
+    ValueError
+        Invalid bounds
+    RuntimeError
+        A session is already running
+    """
+    global _session
+
+    if not 0 < duration_s <= PROFILE_MAX_DURATION_S:
+        raise ValueError(
+            f"duration_s must be in (0, {PROFILE_MAX_DURATION_S:g}]"
+        )
+    if not 0 < sample_rate <= 1:
+        raise ValueError("sample_rate must be in (0, 1]")
+    if interval_ms < PROFILE_MIN_INTERVAL_MS:
+        raise ValueError(
+            f"interval_ms must be at least {PROFILE_MIN_INTERVAL_MS:g}"
+        )
+
+    with _lock:
+        if _session is not None and _session.running:
+            raise RuntimeError("A profiling session is already running")
+
+        _session = ProfileSession(duration_s, sample_rate, interval_ms)
+        _session.start()
+
+        return _session.summary()
+
+
+def stop_profile():
+    session = _session
+
+    if session is not None:
+        session.stop()
+
+    return session
+
+
+def current_profile():
+    """
+    The running or most recent session (None if never started).
+    """
+    return _session
+
+
+def profiled(func):
+    """
+    Endpoint decorator: requests are sampled while a session runs
+    (one global read per request otherwise).
+    """
+    root_code = func.__code__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        session = _session
+
+        if (
+            session is None
+            or not session.running
+            or random.random() >= session.sample_rate
+        ):
+            return func(*args, **kwargs)
+
+        session.enter(root_code)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            session.leave()
+
+    return wrapper
@@ -0,0 +1,285 @@
+import heapq
+import itertools
+import threading
+import time
+
+from .cache_service import get_shared_store
+
+# -----------------------------
+# Request priorities (lower is served first)
+# -----------------------------
+PRIORITY_INTERACTIVE = 0   # /predict, departure boards
+PRIORITY_BACKGROUND = 1    # startup warm-up
+PRIORITY_BATCH = 2         # offline / bulk jobs
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+    PRIORITY_BATCH: "batch"
+}
+
+# -----------------------------
+# Limiter registry (name → limiter), for reporting
+# -----------------------------
+LIMITERS = {}
+
+
+class RateLimitExceeded(Exception):
+    """
+    No upstream capacity for this request: the queue wait would exceed
+    its budget, the upstream answered 429, or the remaining quota is
+    reserved for higher-priority traffic.
+    """
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket with a priority queue of waiters.
+
+    Tokens refill at `rate_per_s` up to `burst`. A waiter only takes a
+    token when it is at the head of the queue, so interactive requests
+    overtake queued warm-up / batch work.
+
+    Remaining quota (e.g. the monthly plan) is tracked from upstream
+    response headers; once it drops to `quota_reserve`, only interactive
+    requests are let through.
+
+    `shared` limiters keep the bucket, 429 pauses and quota in the
+    host-wide SQLite store, so N workers stay within one upstream rate;
+    the priority queue is per process. Without the shared tier
+    (SHARED_CACHE_BACKEND=none) every process has its own bucket.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_s: float,
+        burst: int,
+        max_wait_s: float,
+        quota_reserve: int = 0,
+        shared: bool = True
+    ):
+        self.name = name
+        self.rate_per_s = rate_per_s
+        self.burst = burst
+        self.max_wait_s = max_wait_s
+        self.quota_reserve = quota_reserve
+        self.shared = shared
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+        self._waiters = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+        self.quota_limit = None
+        self.quota_remaining = None
+        self.quota_reset_s = None
+
+        self._waits = {
+            name: {"requests": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0}
+            for name in PRIORITY_NAMES.values()
+        }
+        self.rejected = 0
+        self.throttled = 0
+
+        LIMITERS[name] = self
+
+    def _refill(self, now: float):
+        self._tokens = min(
+            self.burst,
+            self._tokens + (now - self._updated) * self.rate_per_s
+        )
+        self._updated = now
+
+    def _store(self):
+        return get_shared_store() if self.shared else None
+
+    def _take_token(self, store, now: float) -> float:
+        """
+        Take a token (caller holds the lock and heads the queue).
+
+        Returns
+        -------
+        float
+            0.0 if taken, else seconds until one may be
+        """
+        if store is not None:
+            wait = store.take_token(self.name, self.rate_per_s, self.burst)
+            if wait is not None:
+                return wait
+
+        self._refill(now)
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+
+        return (1 - self._tokens) / self.rate_per_s
+
+    def _sync_quota(self, store):
+        # Quota last reported to any worker on the host
+        quota = store.quota(self.name) if store is not None else None
+
+        if quota is not None:
+            remaining, reset_at = quota
+
+            with self._cond:
+                self.quota_remaining = remaining
+                if reset_at is not None:
+                    self.quota_reset_s = max(reset_at - time.time(), 0.0)
+
+    def _reject(self, message: str, retry_after: float):
+        self.rejected += 1
+        raise RateLimitExceeded(f"{self.name}: {message}", retry_after)
+
+    def acquire(self, priority: int = PRIORITY_INTERACTIVE) -> float:
+        """
+        Block until a token is available for this request.
+
+        Returns
+        -------
+        float
+            Time spent queued (seconds)
+
+        Raises
+        ------
+        RateLimitExceeded
+            If the wait would exceed max_wait_s, or the quota left is
+            reserved for interactive requests.
+        """
+        start = time.monotonic()
+        deadline = start + self.max_wait_s
+
+        store = self._store()
+        self._sync_quota(store)
+
+        with self._cond:
+            if (
+                priority != PRIORITY_INTERACTIVE
+                and self.quota_remaining is not None
+                and self.quota_remaining <= self.quota_reserve
+            ):
+                self._reject(
+                    "remaining quota reserved for interactive requests",
+                    self.quota_reset_s or 60
+                )
+
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiters, entry)
+
+            try:
+                while True:
+                    now = time.monotonic()
+
+                    if now < self._paused_until:
+                        ready_at = self._paused_until
+                    elif self._waiters[0] == entry:
+                        wait = self._take_token(store, now)
+                        if not wait:
+                            break
+                        ready_at = now + wait
+                    else:
+                        # Behind other waiters: woken when the head leaves
+                        ready_at = now + 1 / self.rate_per_s
+
+                    if ready_at > deadline:
+                        self._reject(
+                            "rate limit queue wait exceeds "
+                            f"{self.max_wait_s:.0f} s",
+                            ready_at - now
+                        )
+
+                    self._cond.wait(timeout=max(ready_at - now, 0.001))
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+        waited = time.monotonic() - start
+        self._record_wait(priority, waited)
+
+        return waited
+
+    def _record_wait(self, priority: int, waited: float):
+        stats = self._waits[PRIORITY_NAMES[priority]]
+        waited_ms = waited * 1000
+
+        with self._cond:
+            stats["requests"] += 1
+            stats["total_wait_ms"] += waited_ms
+            stats["max_wait_ms"] = max(stats["max_wait_ms"], waited_ms)
+
+    def pause(self, seconds: float):
+        """
+        Stop granting tokens for `seconds` (upstream answered 429).
+        """
+        with self._cond:
+            self.throttled += 1
+            self._paused_until = max(
+                self._paused_until, time.monotonic() + seconds
+            )
+            self._tokens = 0.0
+
+        store = self._store()
+        if store is not None:
+            store.pause_bucket(self.name, time.time() + seconds)
+
+    def update_quota(self, limit=None, remaining=None, reset_s=None):
+        """
+        Record quota state reported by the upstream (header values).
+        """
+        with self._cond:
+            if limit is not None:
+                self.quota_limit = int(limit)
+            if remaining is not None:
+                self.quota_remaining = int(remaining)
+            if reset_s is not None:
+                self.quota_reset_s = float(reset_s)
+
+        store = self._store()
+        if store is not None and remaining is not None:
+            store.set_quota(
+                self.name,
+                int(remaining),
+                time.time() + float(reset_s) if reset_s is not None else None
+            )
+
+    def stats(self) -> dict:
+        with self._cond:
+            waits = {
+                name: {
+                    "requests": s["requests"],
+                    "avg_wait_ms": (
+                        round(s["total_wait_ms"] / s["requests"], 1)
+                        if s["requests"] else None
+                    ),
+                    "max_wait_ms": round(s["max_wait_ms"], 1)
+                }
+                for name, s in self._waits.items()
+            }
+
+            return {
+                "rate_per_s": self.rate_per_s,
+                "burst": self.burst,
+                "shared": self._store() is not None,
+                "queued": len(self._waiters),
+                "queue_wait": waits,
+                "rejected": self.rejected,
+                "throttled": self.throttled,
+                "quota": {
+                    "limit": self.quota_limit,
+                    "remaining": self.quota_remaining,
+                    "reset_s": self.quota_reset_s
+                }
+            }
+
+
+def limiter_stats() -> dict:
+    return {name: limiter.stats() for name, limiter in LIMITERS.items()}
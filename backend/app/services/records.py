@@ -0,0 +1,127 @@
+from dataclasses import dataclass, replace
+
+# -----------------------------
+# Pipeline records
+# -----------------------------
+# Slotted records passed between pipeline stages (resolver → weather →
+# features → inference → decision → response). Defaults are defined
+# here only: consumers read attributes instead of .get(key, default).
+#
+# JSON_FIELDS describes the API representation as (key, attribute,
+# kind) and drives to_dict() (also used by response_service to encode
+# records). Kinds:
+#   "value"    any JSON value
+#   "number"   float / int
+#   "optional" omitted when None
+#   "icao"     nested {"icao": value}
+
+
+class Record:
+    """
+    Shared behaviour of the pipeline records.
+    """
+
+    __slots__ = ()
+
+    JSON_FIELDS = ()
+
+    def to_dict(self) -> dict:
+        """
+        API representation (same keys / nesting as the JSON response).
+        """
+        data = {}
+
+        for key, attr, kind in self.JSON_FIELDS:
+            value = getattr(self, attr)
+
+            if kind == "optional" and value is None:
+                continue
+
+            data[key] = {"icao": value} if kind == "icao" else value
+
+        return data
+
+
+@dataclass(slots=True)
+class Flight(Record):
+    flight_number: str
+    origin: str                 # ICAO
+    destination: str            # ICAO
+    scheduled_departure: str    # ISO, UTC
+    scheduled_arrival: str      # ISO, UTC
+    airline: str | None = None
+    aircraft_registration: str | None = None
+    source: str = "AERODATABOX"
+
+    JSON_FIELDS = (
+        ("flight_number", "flight_number", "value"),
+        ("airline", "airline", "value"),
+        ("origin", "origin", "icao"),
+        ("destination", "destination", "icao"),
+        ("scheduled_departure", "scheduled_departure", "value"),
+        ("scheduled_arrival", "scheduled_arrival", "value"),
+        ("aircraft_registration", "aircraft_registration", "value"),
+        ("source", "source", "value")
+    )
+
+
+@dataclass(slots=True)
+class WeatherFeatures(Record):
+    # Model features (defaults: clear weather)
+    taf_min_vis_km: float = 10.0
+    taf_mean_vis_km: float = 10.0
+    taf_trend: float = 0.0
+    taf_volatility: float = 0.0
+    taf_fog_probability: float = 0.0
+    taf_change_intensity: float = 0.0
+
+    # Provenance
+    weather_source: str = "UNKNOWN"     # TAF / METAR / DEFAULT
+    taf_issue_time_utc: str | None = None
+    taf_valid_from_utc: str | None = None
+    taf_valid_to_utc: str | None = None
+    taf_raw: str | None = None
+    metar_time_utc: str | None = None
+    metar_raw: str | None = None
+
+    JSON_FIELDS = (
+        ("taf_min_vis_km", "taf_min_vis_km", "number"),
+        ("taf_mean_vis_km", "taf_mean_vis_km", "number"),
+        ("taf_trend", "taf_trend", "number"),
+        ("taf_volatility", "taf_volatility", "number"),
+        ("taf_fog_probability", "taf_fog_probability", "number"),
+        ("taf_change_intensity", "taf_change_intensity", "number"),
+        ("weather_source", "weather_source", "value"),
+        ("taf_issue_time_utc", "taf_issue_time_utc", "optional"),
+        ("taf_valid_from_utc", "taf_valid_from_utc", "optional"),
+        ("taf_valid_to_utc", "taf_valid_to_utc", "optional"),
+        ("taf_raw", "taf_raw", "optional"),
+        ("metar_time_utc", "metar_time_utc", "optional"),
+        ("metar_raw", "metar_raw", "optional")
+    )
+
+    @property
+    def issue_key(self) -> str:
+        """
+        Identify the forecast / observation the features were derived from.
+        """
+        return (
+            self.taf_issue_time_utc
+            or self.metar_time_utc
+            or self.weather_source
+        )
+
+    def compact(self) -> "WeatherFeatures":
+        """
+        Copy without raw TAF / METAR text.
+        """
+        return replace(self, taf_raw=None, metar_raw=None)
+
+
+@dataclass(slots=True)
+class Prediction(Record):
+    delay_probability: float
+
+    JSON_FIELDS = (
+        ("delay_probability", "delay_probability", "number"),
+    )
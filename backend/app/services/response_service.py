@@ -0,0 +1,167 @@
+import hashlib
+import json
+import numbers
+
+from fastapi.responses import JSONResponse
+
+from .records import Record, Flight, WeatherFeatures
+
+# Top-level keys of the /predict response that can be selected
+PREDICT_FIELDS = (
+    "flight",
+    "origin_weather",
+    "destination_weather",
+    "operational_feasibility",
+    "prediction",
+    "explainability",
+    "decision"
+)
+
+
+# -----------------------------
+# Field selection
+# -----------------------------
+def parse_fields(fields: str | None):
+    """
+    Parse a comma-separated `fields=` selector.
+
+    Returns
+    -------
+    tuple[str, ...] | None
+        Selected fields in canonical order, or None for the full payload
+    """
+    if not fields:
+        return None
+
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested.difference(PREDICT_FIELDS)
+
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(sorted(unknown))}. "
+            f"Allowed: {', '.join(PREDICT_FIELDS)}"
+        )
+
+    return tuple(f for f in PREDICT_FIELDS if f in requested)
+
+
+def select_fields(body: dict, selected):
+    """
+    Trim a response body to the selected fields (trace_id is always kept).
+    """
+    if selected is None:
+        return body
+
+    return {
+        key: value
+        for key, value in body.items()
+        if key == "trace_id" or key in selected
+    }
+
+
+# -----------------------------
+# ETag helpers
+# -----------------------------
+def build_etag(
+    model_version: str,
+    flight: Flight,
+    origin_weather: WeatherFeatures,
+    destination_weather: WeatherFeatures,
+    variant: dict,
+    alternates: list | None = None
+) -> str:
+    """
+    Deterministic (weak) ETag for a /predict representation.
+
+    Everything the response depends on is either in the flight record,
+    fixed by the TAF/METAR issue time, or fixed by the model version.
+    `variant` carries request options that change the body (fields,
+    explain, ...).
+
+    Diversion alternates depend on other airports' forecasts as well:
+    a response listing them is tagged with the list itself, so its ETag
+    never equals the one computed before inference (which can then only
+    match a response without alternates, i.e. the same decision).
+    """
+    inputs = {
+        "model": model_version,
+        "flight": flight.to_dict(),
+        "origin_issue": origin_weather.issue_key,
+        "destination_issue": destination_weather.issue_key,
+        "variant": variant
+    }
+
+    if alternates is not None:
+        inputs["alternates"] = alternates
+
+    key = json.dumps(
+        inputs,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:20]
+
+    # Weak: the body is semantically stable, but trace_id and
+    # content-encoding differ between responses
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against an ETag.
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return any(
+        opaque(candidate) == opaque(etag)
+        for candidate in if_none_match.split(",")
+    )
+
+
+# -----------------------------
+# Response encoding
+# -----------------------------
+# Same bytes as JSONResponse (compact separators, ensure_ascii=False,
+# allow_nan=False), without FastAPI's jsonable_encoder walk: records are
+# written through to_dict() by the encoder's `default` hook.
+def _record_default(obj):
+    if isinstance(obj, Record):
+        return obj.to_dict()
+
+    # NumPy scalars (float32 / int64 ...) register as numbers
+    if isinstance(obj, numbers.Integral):
+        return int(obj)
+    if isinstance(obj, numbers.Real):
+        return float(obj)
+
+    raise TypeError(
+        f"Object of type {type(obj).__name__} is not JSON serializable"
+    )
+
+
+dumps = json.JSONEncoder(
+    ensure_ascii=False,
+    allow_nan=False,
+    check_circular=False,
+    separators=(",", ":"),
+    default=_record_default
+).encode
+
+
+class RecordJSONResponse(JSONResponse):
+    """
+    JSONResponse for bodies holding pipeline records.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content).encode("utf-8")
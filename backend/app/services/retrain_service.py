@@ -0,0 +1,294 @@
+import os
+import json
+import time
+import multiprocessing
+import numpy as np
+
+from .config import DATASET_PATH
+from .feedback_service import FEEDBACK_DIR, distinct_outcomes, training_data
+
+# -----------------------------
+# Incremental retraining
+# -----------------------------
+# Predictions with a new outcome needed before a retrain is due
+RETRAIN_MIN_OUTCOMES = int(os.getenv("RETRAIN_MIN_OUTCOMES", "200"))
+
+# Warm-started trees added per retrain; the oldest trees are dropped
+# beyond RETRAIN_MAX_TREES so the forest is refreshed, not just grown
+RETRAIN_ADD_TREES = int(os.getenv("RETRAIN_ADD_TREES", "50"))
+RETRAIN_MAX_TREES = int(os.getenv("RETRAIN_MAX_TREES", "400"))
+
+# Synthetic rows replayed with the feedback (keeps both classes and the
+# original feature coverage), and the weight of a real outcome
+RETRAIN_REPLAY_ROWS = int(os.getenv("RETRAIN_REPLAY_ROWS", "5000"))
+RETRAIN_FEEDBACK_WEIGHT = float(os.getenv("RETRAIN_FEEDBACK_WEIGHT", "5"))
+
+# Share of the synthetic dataset held out (fixed split, never replayed)
+# to check a retrained forest against production before it is kept
+RETRAIN_HOLDOUT_FRACTION = float(os.getenv("RETRAIN_HOLDOUT_FRACTION", "0.25"))
+
+# A lock older than this belongs to a crashed job
+RETRAIN_LOCK_TIMEOUT_S = float(os.getenv("RETRAIN_LOCK_TIMEOUT_S", "3600"))
+
+RETRAIN_VARIANT = "full"
+
+# Retrained forests that pass the guard land here, never in production:
+# shadow them (SHADOW_MODELS=delay_model_candidate.pkl), then promote
+# with `python -m app.services.retrain_service --promote`
+RETRAIN_CANDIDATE = "delay_model_candidate.pkl"
+
+STATE_FILE = os.path.join(FEEDBACK_DIR, "retrain_state.json")
+LOCK_FILE = os.path.join(FEEDBACK_DIR, "retrain.lock")
+
+
+def _read_state() -> dict:
+    try:
+        with open(STATE_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"outcome_cutoff": 0.0}
+
+
+def _write_state(state: dict):
+    tmp_path = f"{STATE_FILE}.tmp"
+
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+
+    os.replace(tmp_path, STATE_FILE)
+
+
+def _acquire_lock() -> bool:
+    """
+    One retrain at a time across all workers (exclusive lock file).
+    """
+    os.makedirs(FEEDBACK_DIR, exist_ok=True)
+
+    try:
+        if time.time() - os.path.getmtime(LOCK_FILE) > RETRAIN_LOCK_TIMEOUT_S:
+            os.remove(LOCK_FILE)
+    except FileNotFoundError:
+        pass
+
+    try:
+        fd = os.open(LOCK_FILE, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+
+    os.write(fd, str(os.getpid()).encode())
+    os.close(fd)
+
+    return True
+
+
+def _release_lock():
+    try:
+        os.remove(LOCK_FILE)
+    except FileNotFoundError:
+        pass
+
+
+def _dataset_split(rng) -> tuple:
+    """
+    Replay sample and holdout from the synthetic dataset. The holdout is
+    the same fixed slice on every run; replay rows never come from it.
+
+    Returns
+    -------
+    tuple
+        X_replay, y_replay, X_holdout, y_holdout
+    """
+    data = np.loadtxt(DATASET_PATH, delimiter=",", skiprows=1)
+
+    order = np.random.default_rng(42).permutation(len(data))
+    n_holdout = int(len(data) * RETRAIN_HOLDOUT_FRACTION)
+    holdout, pool = data[order[:n_holdout]], data[order[n_holdout:]]
+
+    idx = rng.choice(
+        len(pool), size=min(RETRAIN_REPLAY_ROWS, len(pool)), replace=False
+    )
+
+    return (
+        pool[idx, :-1], pool[idx, -1].astype(int),
+        holdout[:, :-1], holdout[:, -1].astype(int)
+    )
+
+
+def run_retrain() -> dict:
+    """
+    Grow the deployed forest with warm-started trees fitted on feedback
+    (+ replayed synthetic rows) and drop the oldest trees beyond the cap.
+
+    The result is checked against production on a fixed holdout
+    (model_guard.guard_report) and, if it passes, written as the
+    RETRAIN_CANDIDATE artifact. Production is never replaced here: see
+    promote_candidate. Runs in its own process.
+    """
+    import joblib
+
+    from .model_guard import guard_report
+    from .model_registry import model_path, publish_candidate
+
+    start = time.perf_counter()
+
+    # Outcomes reported from here on count towards the next retrain
+    outcome_cutoff = time.time()
+    X_feedback, y_feedback = training_data()
+
+    if not len(X_feedback):
+        return {"status": "skipped", "reason": "no feedback rows"}
+
+    rng = np.random.default_rng()
+    X_replay, y_replay, X_holdout, y_holdout = _dataset_split(rng)
+
+    X = np.vstack([X_replay, X_feedback])
+    y = np.concatenate([y_replay, y_feedback])
+    sample_weight = np.concatenate([
+        np.ones(len(y_replay)),
+        np.full(len(y_feedback), RETRAIN_FEEDBACK_WEIGHT)
+    ])
+
+    production = joblib.load(model_path(RETRAIN_VARIANT))
+    model = joblib.load(model_path(RETRAIN_VARIANT))
+    trees_before = len(model.estimators_)
+
+    model.set_params(
+        warm_start=True,
+        n_estimators=trees_before + RETRAIN_ADD_TREES,
+        n_jobs=-1,
+        random_state=int(rng.integers(2**31))
+    )
+    model.fit(X, y, sample_weight=sample_weight)
+
+    # Refresh: keep the newest trees only
+    if len(model.estimators_) > RETRAIN_MAX_TREES:
+        model.estimators_ = model.estimators_[-RETRAIN_MAX_TREES:]
+
+    model.set_params(
+        warm_start=False,
+        n_estimators=len(model.estimators_),
+        n_jobs=1
+    )
+
+    # Feedback is unauthenticated: nothing it produced is kept unless it
+    # holds up against production on data it could not touch
+    guard = guard_report(production, model, X_holdout, y_holdout)
+
+    result = {
+        "status": "candidate" if guard["passed"] else "rejected",
+        "candidate_version": (
+            publish_candidate(model, RETRAIN_CANDIDATE)
+            if guard["passed"] else None
+        ),
+        "guard": guard,
+        "feedback_rows": int(len(X_feedback)),
+        "replay_rows": int(len(X_replay)),
+        "holdout_rows": int(len(X_holdout)),
+        "trees_before": trees_before,
+        "trees_after": len(model.estimators_),
+        "duration_s": round(time.perf_counter() - start, 1)
+    }
+
+    _write_state({
+        "outcome_cutoff": outcome_cutoff,
+        "finished_at": time.time(),
+        **result
+    })
+
+    return result
+
+
+def promote_candidate() -> dict:
+    """
+    Publish the RETRAIN_CANDIDATE artifact as the production variant
+    (operator action, after reviewing its shadow comparison).
+    """
+    import joblib
+
+    from .model_registry import candidate_path, publish_model
+
+    path = candidate_path(RETRAIN_CANDIDATE)
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No candidate model at {path}")
+
+    version = publish_model(joblib.load(path), RETRAIN_VARIANT)
+
+    os.remove(path)
+
+    return {"status": "published", "model_version": version}
+
+
+def _retrain_job():
+    try:
+        run_retrain()
+    finally:
+        _release_lock()
+
+
+def retrain_due() -> bool:
+    """
+    Outcomes reported for enough distinct predictions since the last
+    retrain (resubmitting one trace_id does not count again).
+    """
+    since = _read_state().get("outcome_cutoff", 0.0)
+
+    return distinct_outcomes(since) >= RETRAIN_MIN_OUTCOMES
+
+
+def maybe_start_retrain(force: bool = False) -> bool:
+    """
+    Start a background retrain (separate process) once enough new
+    outcomes have been reported since the last one (admin action:
+    POST /admin/retrain).
+
+    Returns
+    -------
+    bool
+        True if a retrain was started
+    """
+    # Reap a finished previous job
+    multiprocessing.active_children()
+
+    if not force and not retrain_due():
+        return False
+
+    if not _acquire_lock():
+        return False
+
+    # spawn: no copy of the serving process' threads / executors
+    process = multiprocessing.get_context("spawn").Process(
+        target=_retrain_job, name="retrain"
+    )
+    process.start()
+
+    return True
+
+
+def retrain_status() -> dict:
+    """
+    Outcome of the last retrain and whether one is running.
+    """
+    return {
+        "running": os.path.exists(LOCK_FILE),
+        "due": retrain_due(),
+        "last": _read_state()
+    }
+
+
+if __name__ == "__main__":
+    # Manual run (from backend/):
+    #   python -m app.services.retrain_service [--promote]
+    import sys
+
+    if "--promote" in sys.argv:
+        print(json.dumps(promote_candidate(), indent=2))
+        raise SystemExit
+
+    if not _acquire_lock():
+        raise SystemExit("A retrain is already running")
+
+    try:
+        print(json.dumps(run_retrain(), indent=2))
+    finally:
+        _release_lock()
@@ -0,0 +1,252 @@
+import os
+import heapq
+import datetime
+import threading
+import time
+import numpy as np
+
+from .cache_service import TTLCache
+from .weather_service import get_weather_risk_bulk
+from .departure_board_service import score_flights
+
+# -----------------------------
+# Rotation model
+# -----------------------------
+# Minimum ground time between an arrival and the same tail's next departure
+MIN_TURNAROUND_MIN = float(os.getenv("MIN_TURNAROUND_MIN", "35"))
+
+# Mean delay of a delayed leg: the model predicts delayed / not delayed,
+# expected minutes = probability × this
+DELAYED_LEG_MINUTES = float(os.getenv("DELAYED_LEG_MINUTES", "60"))
+
+ROTATION_CACHE_TTL_S = float(os.getenv("ROTATION_CACHE_TTL_S", "1800"))
+
+# Graphs are mutated in place by incremental updates: per-process only
+# (and rebuilt from the cached flights after a restart)
+graph_cache = TTLCache(
+    "rotations",
+    maxsize=64,
+    ttl_s=ROTATION_CACHE_TTL_S,
+    shared=False,
+    persist=False,
+    cost=200.0
+)
+
+
+def _epoch_min(timestamp: str) -> float:
+    dt = datetime.datetime.fromisoformat(timestamp)
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.UTC)
+
+    return dt.timestamp() / 60
+
+
+class ScheduleGraph:
+    """
+    Legs linked by aircraft registration: each leg's predecessor is the
+    same tail's previous leg, provided it arrives where this leg departs
+    before it departs. Otherwise the rotation is broken there (the legs
+    in between are not in the network): no delay is propagated across
+    the gap. Expected delay propagates along the links:
+
+        inherited = max(0, expected(predecessor) − slack)
+        expected  = own + inherited
+
+    where slack is the scheduled ground time beyond the minimum
+    turnaround and own = delay probability × DELAYED_LEG_MINUTES.
+
+    Legs are kept in departure order, which is a topological order of
+    the graph (links always point forward in time).
+
+    Graphs are shared through the rotation cache: hold `lock` around
+    an update and the read of its result.
+    """
+
+    def __init__(self, flights: list, min_turnaround_min: float = MIN_TURNAROUND_MIN):
+        self.flights = sorted(
+            flights, key=lambda f: _epoch_min(f.scheduled_departure)
+        )
+        self.min_turnaround_min = min_turnaround_min
+        self.lock = threading.Lock()
+
+        n = len(self.flights)
+
+        departure = np.array(
+            [_epoch_min(f.scheduled_departure) for f in self.flights]
+        )
+        arrival = np.array(
+            [_epoch_min(f.scheduled_arrival) for f in self.flights]
+        )
+
+        self.predecessor = np.full(n, -1, dtype=int)
+        self.successor = np.full(n, -1, dtype=int)
+        self.slack = np.zeros(n)
+
+        last_leg = {}
+        for i, flight in enumerate(self.flights):
+            tail = flight.aircraft_registration
+            if not tail:
+                continue
+
+            j = last_leg.get(tail)
+
+            if (
+                j is not None
+                and self.flights[j].destination == flight.origin
+                and departure[i] >= arrival[j]
+            ):
+                self.predecessor[i] = j
+                self.successor[j] = i
+                self.slack[i] = departure[i] - arrival[j] - min_turnaround_min
+
+            last_leg[tail] = i
+
+        self.probability = np.zeros(n)
+        self.own = np.zeros(n)
+        self.inherited = np.zeros(n)
+        self.expected = np.zeros(n)
+
+    def __len__(self):
+        return len(self.flights)
+
+    def _recompute(self, i: int) -> bool:
+        """
+        Recompute leg i from its predecessor. Returns True if its
+        expected delay (what its successor inherits from) changed.
+        """
+        p = self.predecessor[i]
+        inherited = (
+            max(0.0, self.expected[p] - self.slack[i]) if p != -1 else 0.0
+        )
+        expected = self.own[i] + inherited
+
+        changed = expected != self.expected[i]
+        self.inherited[i] = inherited
+        self.expected[i] = expected
+
+        return changed
+
+    def set_predictions(self, delay_probabilities) -> int:
+        """
+        Apply per-leg delay probabilities (aligned with self.flights);
+        only legs whose probability changed, and their downstream
+        rotation, are recomputed.
+
+        Returns
+        -------
+        int
+            Number of legs recomputed
+        """
+        probability = np.asarray(delay_probabilities, dtype=float)
+        changed = np.flatnonzero(probability != self.probability)
+
+        self.probability = probability
+        self.own = probability * DELAYED_LEG_MINUTES
+
+        # Worklist in departure order: every upstream change is settled
+        # before a leg is visited, so each leg is recomputed at most once
+        pending = changed.tolist()
+        queued = set(pending)
+        recomputed = 0
+
+        while pending:
+            i = heapq.heappop(pending)
+            recomputed += 1
+
+            successor = int(self.successor[i])
+            if self._recompute(i) and successor != -1 and successor not in queued:
+                heapq.heappush(pending, successor)
+                queued.add(successor)
+
+        return recomputed
+
+    def legs(self) -> list:
+        return [
+            {
+                "flight_number": flight.flight_number,
+                "aircraft_registration": flight.aircraft_registration,
+                "origin": flight.origin,
+                "destination": flight.destination,
+                "scheduled_departure": flight.scheduled_departure,
+                "previous_leg": (
+                    self.flights[self.predecessor[i]].flight_number
+                    if self.predecessor[i] != -1 else None
+                ),
+                "turnaround_slack_min": (
+                    round(float(self.slack[i]), 1)
+                    if self.predecessor[i] != -1 else None
+                ),
+                "delay_probability": round(float(self.probability[i]), 3),
+                "own_delay_min": round(float(self.own[i]), 1),
+                "propagated_delay_min": round(float(self.inherited[i]), 1),
+                "expected_delay_min": round(float(self.expected[i]), 1)
+            }
+            for i, flight in enumerate(self.flights)
+        ]
+
+
+def _network_key(flights: list) -> tuple:
+    return tuple(sorted(
+        (f.flight_number, f.scheduled_departure, f.aircraft_registration)
+        for f in flights
+    ))
+
+
+def score_network(
+    flights: list,
+    variant: str | None = None
+):
+    """
+    Score a day's legs and propagate delay along aircraft rotations.
+
+    The graph is cached per network: when re-scored, only legs whose
+    prediction changed (and their downstream legs) are recomputed.
+
+    Returns
+    -------
+    dict
+        Legs in departure order with own / propagated / expected delay
+    """
+    key = _network_key(flights)
+    graph = graph_cache.get(key)
+
+    if graph is None:
+        graph = ScheduleGraph(flights)
+        graph_cache.set(key, graph)
+
+    ordered = graph.flights
+
+    # Bulk weather for both ends, one batch through the model
+    origin_weathers = get_weather_risk_bulk(
+        [(f.origin, f.scheduled_departure) for f in ordered]
+    )
+    destination_weathers = get_weather_risk_bulk(
+        [(f.destination, f.scheduled_arrival) for f in ordered]
+    )
+
+    results = score_flights(
+        ordered,
+        origin_weathers,
+        destination_weathers,
+        variant=variant
+    )
+
+    # Concurrent requests for the same network update one cached graph:
+    # each applies its predictions and reads its legs under the lock
+    with graph.lock:
+        start = time.perf_counter()
+        recomputed = graph.set_predictions(
+            [r["prediction"].delay_probability for r in results]
+        )
+        propagation_ms = (time.perf_counter() - start) * 1000
+
+        legs = graph.legs()
+
+    return {
+        "legs_total": len(graph),
+        "legs_recomputed": recomputed,
+        "propagation_ms": round(propagation_ms, 3),
+        "min_turnaround_min": graph.min_turnaround_min,
+        "legs": legs
+    }
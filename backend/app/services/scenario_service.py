@@ -0,0 +1,129 @@
+import datetime
+import itertools
+import dataclasses
+import numpy as np
+
+from .taf_service import get_tafs
+from .taf_temporal import taf_scenarios, MAX_TAF_SCENARIOS
+from .weather_service import get_weather_risk
+from .feature_service import build_features
+from .executor_service import run_inference_batch
+from .records import Flight
+
+
+def _epoch(timestamp: str) -> float:
+    dt = datetime.datetime.fromisoformat(timestamp)
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.UTC)
+
+    return dt.timestamp()
+
+
+def _weather_paths(icao: str, event_time: str, taf: dict | None):
+    """
+    Weather records for each TAF path at the event time, with probabilities.
+
+    A path overrides visibility / fog at the event time; volatility and
+    change intensity keep the TAF-wide values the model was trained on.
+    Without a usable TAF the single get_weather_risk result is the only
+    path.
+    """
+    weather = get_weather_risk(icao, event_time)
+
+    scenarios = (
+        taf_scenarios(taf, _epoch(event_time)) if taf is not None else []
+    )
+
+    if weather.weather_source != "TAF" or not scenarios:
+        return [(
+            1.0,
+            weather,
+            {"groups": [], "source": weather.weather_source}
+        )]
+
+    return [
+        (
+            scenario["probability"],
+            dataclasses.replace(
+                weather,
+                taf_min_vis_km=scenario["vis"],
+                taf_fog_probability=scenario["fog"]
+            ),
+            {"groups": scenario["groups"], "source": "TAF"}
+        )
+        for scenario in scenarios
+    ]
+
+
+def score_scenarios(
+    flight: Flight,
+    variant: str | None = None,
+    max_scenarios: int = MAX_TAF_SCENARIOS
+):
+    """
+    Probability-weighted delay risk over origin × destination TAF paths,
+    all paths scored in one batched model call.
+
+    Returns
+    -------
+    dict
+        Expected delay probability, its spread and the scored paths
+        (most likely first)
+    """
+    origin_icao = flight.origin
+    dest_icao = flight.destination
+
+    try:
+        tafs = get_tafs([origin_icao, dest_icao])
+    except Exception:
+        tafs = {}
+
+    origin_paths = _weather_paths(
+        origin_icao, flight.scheduled_departure, tafs.get(origin_icao)
+    )
+    dest_paths = _weather_paths(
+        dest_icao, flight.scheduled_arrival, tafs.get(dest_icao)
+    )
+
+    # Joint paths (origin and destination forecasts are independent)
+    paths = sorted(
+        itertools.product(origin_paths, dest_paths),
+        key=lambda pair: -pair[0][0] * pair[1][0]
+    )[:max_scenarios]
+
+    weights = np.array([o[0] * d[0] for o, d in paths])
+    weights /= weights.sum()
+
+    rows = [build_features(flight, o[1], d[1]) for o, d in paths]
+    predictions = run_inference_batch(rows, variant=variant)
+
+    delay_probs = np.array([p.delay_probability for p in predictions])
+
+    expected = float(weights @ delay_probs)
+    spread = float(np.sqrt(weights @ (delay_probs - expected) ** 2))
+
+    return {
+        "expected_delay_probability": round(expected, 3),
+        "delay_probability_std": round(spread, 3),
+        "delay_probability_min": float(delay_probs.min()),
+        "delay_probability_max": float(delay_probs.max()),
+        "scenario_count": len(paths),
+        "scenarios": [
+            {
+                "probability": round(float(weight), 4),
+                "origin": {
+                    **o[2],
+                    "min_vis_km": o[1].taf_min_vis_km,
+                    "fog": o[1].taf_fog_probability
+                },
+                "destination": {
+                    **d[2],
+                    "min_vis_km": d[1].taf_min_vis_km,
+                    "fog": d[1].taf_fog_probability
+                },
+                "delay_probability": prediction.delay_probability
+            }
+            for (o, d), weight, prediction in zip(paths, weights, predictions)
+        ]
+    }
@@ -0,0 +1,358 @@
+import os
+import queue
+import threading
+import time
+import numpy as np
+
+from .config import BACKEND_DIR
+from .feedback_service import TRACE_ID_BYTES, AppendOnlyLog
+from .decision_service import recommend_actions_batch, ACTION_SEVERITY
+from .executor_service import inference_load
+
+# -----------------------------
+# Configuration
+# -----------------------------
+# Candidate models evaluated on live /predict traffic: variant names or
+# artifact files in app/models (comma-separated); empty → disabled
+SHADOW_MODELS = [
+    name.strip()
+    for name in os.getenv("SHADOW_MODELS", "").split(",")
+    if name.strip()
+]
+
+# Pending comparisons; beyond this, new ones are dropped
+SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", "256"))
+SHADOW_MAX_BATCH = int(os.getenv("SHADOW_MAX_BATCH", "32"))
+
+# Shadow work only runs while production inference calls in flight are
+# at or below this (0: only when production is idle)
+SHADOW_MAX_INFLIGHT = int(os.getenv("SHADOW_MAX_INFLIGHT", "0"))
+
+# Comparisons waiting longer than this are dropped, not caught up
+SHADOW_MAX_AGE_S = float(os.getenv("SHADOW_MAX_AGE_S", "30"))
+
+# The production model is re-run (only to time it against the
+# candidates) on one batch per variant per interval
+SHADOW_TIMING_INTERVAL_S = float(os.getenv("SHADOW_TIMING_INTERVAL_S", "60"))
+
+# |candidate − production| delay probability counted as a disagreement
+SHADOW_DISAGREE_DELTA = float(os.getenv("SHADOW_DISAGREE_DELTA", "0.1"))
+
+SHADOW_DIR = os.getenv("SHADOW_DIR", os.path.join(BACKEND_DIR, "data", "shadow"))
+
+# One record per (request, candidate)
+SHADOW_RECORD = np.dtype([
+    ("trace_id", f"S{TRACE_ID_BYTES}"),
+    ("timestamp", "<f8"),
+    ("candidate", "S32"),
+    ("production_probability", "<f4"),
+    ("candidate_probability", "<f4"),
+    ("production_action", "u1"),
+    ("candidate_action", "u1"),
+    # Per-row predict_proba time of each model on the same rows
+    # (production_ms: NaN on batches where production was not timed)
+    ("production_ms", "<f4"),
+    ("candidate_ms", "<f4")
+])
+
+# v2: full-length trace ids
+shadow_log = AppendOnlyLog(
+    os.path.join(SHADOW_DIR, "shadow_v2.bin"), SHADOW_RECORD
+)
+
+# Action name ↔ code stored in the log (codes are severities: unique)
+ACTION_NAMES = {code: action for action, code in ACTION_SEVERITY.items()}
+
+
+class ShadowRunner:
+    """
+    Background comparison of candidate models against production.
+
+    /predict hands over its feature vector after the response is sent;
+    a single low-priority thread scores queued vectors in batches with
+    every candidate. Nothing runs while production inference is busy:
+    comparisons are skipped when submitted under load, held back while
+    load persists and dropped once stale or when the queue is full.
+    """
+
+    def __init__(self, candidates: list):
+        self.candidates = list(candidates)
+        self._queue = queue.Queue(maxsize=SHADOW_QUEUE_SIZE)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._timed_at = {}  # production variant → last timing (monotonic)
+
+        self._counters = {
+            "submitted": 0,
+            "skipped_load": 0,
+            "dropped_queue_full": 0,
+            "dropped_stale": 0,
+            "errors": 0
+        }
+        self._stats = {
+            name: {
+                "compared": 0,
+                "probability_disagreements": 0,
+                "action_disagreements": 0,
+                "abs_diff_sum": 0.0,
+                "max_abs_diff": 0.0,
+                "candidate_ms_sum": 0.0,
+                "production_ms_sum": 0.0,
+                "production_timed": 0
+            }
+            for name in self.candidates
+        }
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._loop, name="shadow-models", daemon=True
+                    )
+                    self._thread.start()
+
+    def submit(self, comparison: dict):
+        """
+        Queue a production prediction for comparison (never blocks).
+        """
+        if inference_load() > SHADOW_MAX_INFLIGHT:
+            self._count("skipped_load")
+            return
+
+        self._start()
+
+        try:
+            self._queue.put_nowait((time.monotonic(), comparison))
+        except queue.Full:
+            self._count("dropped_queue_full")
+            return
+
+        self._count("submitted")
+
+    def _next_batch(self) -> list:
+        batch = [self._queue.get()]
+
+        while len(batch) < SHADOW_MAX_BATCH:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+
+            # Yield to production: wait for an idle moment
+            while inference_load() > SHADOW_MAX_INFLIGHT:
+                time.sleep(0.05)
+
+            cutoff = time.monotonic() - SHADOW_MAX_AGE_S
+            fresh = [comparison for queued_at, comparison in batch if queued_at >= cutoff]
+
+            for _ in range(len(batch) - len(fresh)):
+                self._count("dropped_stale")
+
+            if not fresh:
+                continue
+
+            try:
+                self._compare(fresh)
+            except Exception:
+                self._count("errors")
+
+    def _compare(self, batch: list):
+        from .model_registry import get_model, get_candidate_model
+
+        X = np.array([c["features"] for c in batch], dtype=float)
+
+        # Rows served by each production variant; production and every
+        # candidate are timed the same way, as a bare predict_proba on
+        # the same rows (the request's own inference time also counts
+        # executor queueing and hand-off). Production is only re-run
+        # for that once per SHADOW_TIMING_INTERVAL_S.
+        groups = {}
+        for i, c in enumerate(batch):
+            groups.setdefault(c["variant"], []).append(i)
+
+        production_ms = np.full(len(batch), np.nan)
+        now = time.monotonic()
+
+        for variant, rows in groups.items():
+            if now - self._timed_at.get(variant, float("-inf")) >= SHADOW_TIMING_INTERVAL_S:
+                self._timed_at[variant] = now
+                _, production_ms[rows] = _timed_predict(get_model(variant), X[rows])
+
+        timed = ~np.isnan(production_ms)
+
+        production_probs = np.array([c["delay_probability"] for c in batch])
+        production_actions = [c["action"] for c in batch]
+
+        dest_vis = [c["destination_weather"].taf_min_vis_km for c in batch]
+        dest_fog = [c["destination_weather"].taf_fog_probability for c in batch]
+        dest_vol = [c["destination_weather"].taf_volatility for c in batch]
+        takeoff_ok = [c["origin_takeoff_ok"] for c in batch]
+        landing_ok = [c["destination_landing_ok"] for c in batch]
+
+        for name in self.candidates:
+            model = get_candidate_model(name)
+
+            probs = np.empty(len(batch))
+            candidate_ms = np.empty(len(batch))
+            for rows in groups.values():
+                probs[rows], candidate_ms[rows] = _timed_predict(model, X[rows])
+
+            probs = np.round(probs, 3)
+
+            actions = recommend_actions_batch(
+                probs, dest_vis, dest_fog, dest_vol, takeoff_ok, landing_ok
+            )
+
+            diffs = np.abs(probs - production_probs)
+            now = time.time()
+
+            shadow_log.extend([
+                (
+                    c["trace_id"].encode()[:TRACE_ID_BYTES],
+                    now,
+                    name.encode()[:32],
+                    c["delay_probability"],
+                    p,
+                    ACTION_SEVERITY[c["action"]],
+                    ACTION_SEVERITY[str(action)],
+                    p_ms,
+                    c_ms
+                )
+                for c, p, action, p_ms, c_ms in zip(
+                    batch, probs, actions, production_ms, candidate_ms
+                )
+            ])
+
+            with self._lock:
+                stats = self._stats[name]
+                stats["compared"] += len(batch)
+                stats["probability_disagreements"] += int(
+                    (diffs > SHADOW_DISAGREE_DELTA).sum()
+                )
+                stats["action_disagreements"] += sum(
+                    str(a) != b for a, b in zip(actions, production_actions)
+                )
+                stats["abs_diff_sum"] += float(diffs.sum())
+                stats["max_abs_diff"] = max(
+                    stats["max_abs_diff"], float(diffs.max())
+                )
+                stats["candidate_ms_sum"] += float(candidate_ms.sum())
+                stats["production_ms_sum"] += float(production_ms[timed].sum())
+                stats["production_timed"] += int(timed.sum())
+
+    def stats(self) -> dict:
+        with self._lock:
+            candidates = {}
+
+            for name, s in self._stats.items():
+                n = s["compared"]
+                candidates[name] = {
+                    "compared": n,
+                    "probability_disagreements": s["probability_disagreements"],
+                    "action_disagreements": s["action_disagreements"],
+                    "mean_abs_diff": round(s["abs_diff_sum"] / n, 4) if n else None,
+                    "max_abs_diff": round(s["max_abs_diff"], 4),
+                    "mean_candidate_ms": round(s["candidate_ms_sum"] / n, 3) if n else None,
+                    "mean_production_ms": (
+                        round(s["production_ms_sum"] / s["production_timed"], 3)
+                        if s["production_timed"] else None
+                    ),
+                    "production_timed": s["production_timed"]
+                }
+
+            return {
+                "enabled": True,
+                "disagree_delta": SHADOW_DISAGREE_DELTA,
+                "queued": self._queue.qsize(),
+                **self._counters,
+                "candidates": candidates
+            }
+
+
+def _timed_predict(model, X: np.ndarray) -> tuple:
+    """
+    Delay probabilities for X and the per-row predict_proba time (ms).
+    """
+    start = time.perf_counter()
+    probs = model.predict_proba(X)[:, 1]
+
+    return probs, (time.perf_counter() - start) * 1000 / len(X)
+
+
+_runner = ShadowRunner(SHADOW_MODELS) if SHADOW_MODELS else None
+
+
+def shadow_enabled() -> bool:
+    return _runner is not None
+
+
+def submit_shadow(
+    trace_id: str,
+    features: list,
+    prediction,
+    decision: dict,
+    variant: str,
+    destination_weather,
+    origin_takeoff_ok: int,
+    destination_landing_ok: int
+):
+    """
+    Compare candidate models on one /predict request in the background
+    (no-op when shadow mode is off).
+    """
+    if _runner is None:
+        return
+
+    _runner.submit({
+        "trace_id": trace_id,
+        "features": features,
+        "delay_probability": prediction.delay_probability,
+        "action": decision["action"],
+        "variant": variant,
+        "destination_weather": destination_weather,
+        "origin_takeoff_ok": origin_takeoff_ok,
+        "destination_landing_ok": destination_landing_ok
+    })
+
+
+def shadow_stats() -> dict:
+    if _runner is None:
+        return {"enabled": False}
+
+    return _runner.stats()
+
+
+def recent_comparisons(limit: int) -> list:
+    """
+    Last `limit` logged comparisons (action codes resolved to names).
+    """
+    start = max(0, len(shadow_log) - limit)
+
+    return [
+        {
+            "trace_id": record["trace_id"].decode(),
+            "timestamp": float(record["timestamp"]),
+            "candidate": record["candidate"].decode(),
+            "production_probability": round(float(record["production_probability"]), 3),
+            "candidate_probability": round(float(record["candidate_probability"]), 3),
+            "production_action": ACTION_NAMES[int(record["production_action"])],
+            "candidate_action": ACTION_NAMES[int(record["candidate_action"])],
+            "production_ms": (
+                None if np.isnan(record["production_ms"])
+                else round(float(record["production_ms"]), 3)
+            ),
+            "candidate_ms": round(float(record["candidate_ms"]), 3)
+        }
+        for record in shadow_log.read(start)[-limit:]
+    ]
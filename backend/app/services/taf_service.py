@@ -1,14 +1,32 @@
-import requests
+import os
+
+from .http_client import session
+from .cache_service import TTLCache, ttl_until
 
 TAF_API = "https://aviationweather.gov/api/data/taf"
 
+# TAFs are issued every 6h (amendments in between): re-check every 10 min
+TAF_CACHE_TTL_S = float(os.getenv("TAF_CACHE_TTL_S", "600"))
+
+taf_cache = TTLCache("taf", maxsize=1024, ttl_s=TAF_CACHE_TTL_S, cost=300.0)
+
+
+def _cache_taf(icao: str, taf: dict):
+    taf_cache.set(
+        icao, taf, ttl_until(taf.get("validTimeTo"), TAF_CACHE_TTL_S)
+    )
+
 
 def get_taf(icao: str):
     """
     Fetch NOAA TAF for an airport ICAO code.
     Returns parsed JSON dict.
     """
-    response = requests.get(
+    cached = taf_cache.get(icao)
+    if cached is not None:
+        return cached
+
+    response = session.get(
         f"{TAF_API}?ids={icao}&format=json",
         timeout=10
     )
@@ -19,8 +37,44 @@ def get_taf(icao: str):
     if not data:
         raise RuntimeError(f"No TAF data returned for {icao}")
 
+    _cache_taf(icao, data[0])
+
     return data[0]
 
+
+def get_tafs(icaos: list, chunk_size: int = 50):
+    """
+    Fetch NOAA TAFs for many airports with one request per chunk.
+    Returns {icao: taf dict}; airports without a TAF are omitted.
+    """
+    icaos = list(dict.fromkeys(icaos))
+    tafs = {}
+
+    for icao in icaos:
+        cached = taf_cache.get(icao)
+        if cached is not None:
+            tafs[icao] = cached
+
+    missing = [icao for icao in icaos if icao not in tafs]
+
+    for start in range(0, len(missing), chunk_size):
+        chunk = missing[start:start + chunk_size]
+
+        response = session.get(
+            f"{TAF_API}?ids={','.join(chunk)}&format=json",
+            timeout=10
+        )
+        response.raise_for_status()
+
+        # Latest TAF first: keep the first one seen per airport
+        for taf in response.json() or []:
+            icao = taf.get("icaoId")
+            if icao not in tafs:
+                tafs[icao] = taf
+                _cache_taf(icao, taf)
+
+    return tafs
+
 #example usage
 #if __name__ == "__main__":
-#    print(get_taf("VIDP")["rawTAF"])
\ No newline at end of file
+#    print(get_taf("VIDP")["rawTAF"])
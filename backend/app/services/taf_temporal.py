@@ -45,7 +45,10 @@ def extract_taf_temporal_features(taf: dict, scheduled_departure: str):
         time_diff_hours = abs((start - dep_utc).total_seconds()) / 3600
 
         if start <= dep_utc <= end or time_diff_hours <= 6:
-            vis_km = fcst.get("visib", 10.0)
+            # Parsed like the timeline paths: a raw "6+" used to turn
+            # the TAF into strings and make the airport fall back to
+            # METAR (behaviour change, same values for numeric visib)
+            vis_km = _visib_km(fcst.get("visib", 10.0))
             wx = fcst.get("wxString") or ""
             change = fcst.get("fcstChange")
 
@@ -84,6 +87,225 @@ def extract_taf_temporal_features(taf: dict, scheduled_departure: str):
     }
 
 
+# -----------------------------
+# Vectorized TAF timeline
+# -----------------------------
+# Forecast groups within this distance of an event time count toward it
+# (same rule as extract_taf_temporal_features)
+TAF_NEAR_WINDOW_S = 6 * 3600
+
+
+def _visib_km(value) -> float:
+    # aviationweather.gov reports open-ended visibility as e.g. "6+"
+    return float(str(value).rstrip("+"))
+
+
+def taf_timeline(taf: dict) -> dict:
+    """
+    TAF forecast groups as parallel arrays (epoch seconds, UTC).
+    """
+    fcsts = taf.get("fcsts", []) or []
+
+    return {
+        "start": np.array([f["timeFrom"] for f in fcsts], dtype=float),
+        "end": np.array([f["timeTo"] for f in fcsts], dtype=float),
+        "vis": np.array(
+            [_visib_km(f.get("visib", 10.0)) for f in fcsts], dtype=float
+        ),
+        "fog": np.array([
+            any(x in (f.get("wxString") or "") for x in ("FG", "BR", "MIFG"))
+            for f in fcsts
+        ], dtype=float),
+        "change": np.array([
+            f.get("fcstChange") in ("BECMG", "TEMPO", "PROB30", "PROB40")
+            for f in fcsts
+        ], dtype=float)
+    }
+
+
+def extract_taf_temporal_features_batch(timeline: dict, event_times) -> dict:
+    """
+    extract_taf_temporal_features for many event times at once.
+
+    Parameters
+    ----------
+    timeline : dict
+        Output of taf_timeline
+    event_times : array-like
+        Event times, epoch seconds (UTC)
+
+    Returns
+    -------
+    dict
+        Feature name → array aligned with event_times; taf_min_vis_km
+        is NaN where no forecast group applies
+    """
+    t = np.asarray(event_times, dtype=float)[:, None]
+
+    # (n_times, n_groups): group covers the event or starts near it
+    mask = (
+        ((timeline["start"] <= t) & (t <= timeline["end"]))
+        | (np.abs(timeline["start"] - t) <= TAF_NEAR_WINDOW_S)
+    )
+    count = mask.sum(axis=1)
+    found = count > 0
+    n = np.maximum(count, 1)
+
+    vis = np.broadcast_to(timeline["vis"], mask.shape)
+
+    mean_vis = np.where(mask, vis, 0.0).sum(axis=1) / n
+    deviation = np.where(mask, vis - mean_vis[:, None], 0.0)
+    volatility = np.sqrt((deviation ** 2).sum(axis=1) / n)
+
+    # Least-squares slope over the matched groups' positions (0..k-1)
+    position = np.cumsum(mask, axis=1) - 1
+    x = np.where(mask, position - (count[:, None] - 1) / 2, 0.0)
+    sxx = (x ** 2).sum(axis=1)
+    trend = np.divide(
+        (x * deviation).sum(axis=1), sxx,
+        out=np.zeros(len(t)), where=sxx > 0
+    )
+
+    return {
+        "taf_min_vis_km": np.where(
+            found, np.where(mask, vis, np.inf).min(axis=1, initial=np.inf),
+            np.nan
+        ),
+        "taf_mean_vis_km": np.where(found, mean_vis, np.nan),
+        "taf_trend": trend,
+        "taf_volatility": volatility,
+        "taf_fog_probability": (mask * timeline["fog"]).sum(axis=1) / n,
+        "taf_change_intensity": (mask * timeline["change"]).sum(axis=1) / n
+    }
+
+
+# -----------------------------
+# TAF scenario expansion
+# -----------------------------
+# TEMPO without a PROB qualifier: temporary fluctuations lasting less
+# than half of the period
+TEMPO_PROBABILITY = 0.3
+
+# BECMG in progress: equally likely to have / not have changed yet
+BECMG_PROBABILITY = 0.5
+
+MAX_TAF_SCENARIOS = 16
+
+
+def _group_probability(fcst: dict):
+    """
+    Probability that an optional group (TEMPO / PROBnn / BECMG in
+    progress) applies; None for groups that define the base state.
+    """
+    change = fcst.get("fcstChange") or ""
+
+    if fcst.get("probability"):
+        return float(fcst["probability"]) / 100
+
+    if change.startswith("PROB") and change[4:].isdigit():
+        return float(change[4:]) / 100
+
+    if change == "TEMPO":
+        return TEMPO_PROBABILITY
+
+    return None
+
+
+def _group_state(fcst: dict, state: dict) -> dict:
+    """
+    Weather state with a group's reported elements laid over it.
+    """
+    state = dict(state)
+
+    if fcst.get("visib") is not None:
+        state["vis"] = _visib_km(fcst["visib"])
+
+    if fcst.get("wxString") is not None or fcst.get("visib") is not None:
+        wx = fcst.get("wxString") or ""
+        state["fog"] = float(any(x in wx for x in ("FG", "BR", "MIFG")))
+
+    return state
+
+
+def taf_scenarios(taf: dict, event_time: float, max_scenarios: int = MAX_TAF_SCENARIOS):
+    """
+    Expand a TAF into weather paths at an event time (epoch seconds).
+
+    The base state is the latest FM / initial group (or completed BECMG)
+    covering the event. Each TEMPO / PROBnn group, and a BECMG still in
+    its transition, is an independent on/off branch with its probability;
+    every combination is a path. Only the most likely `max_scenarios`
+    paths are kept and their probabilities renormalized.
+
+    Returns
+    -------
+    list[dict]
+        {"probability", "vis", "fog", "groups"} per path, most likely
+        first; empty if no group covers the event
+    """
+    base = None
+    base_start = None
+    branches = []
+
+    for fcst in taf.get("fcsts", []) or []:
+        start, end = fcst["timeFrom"], fcst["timeTo"]
+        change = fcst.get("fcstChange")
+        p = _group_probability(fcst)
+
+        if p is not None:
+            if start <= event_time <= end:
+                branches.append((p, fcst))
+            continue
+
+        if change == "BECMG":
+            if start <= event_time <= end:
+                branches.append((BECMG_PROBABILITY, fcst))
+                continue
+            if start > event_time:
+                continue
+        elif not start <= event_time <= end:
+            continue
+
+        # Latest base-defining group wins (BECMG builds on it)
+        if base_start is None or start >= base_start:
+            base = _group_state(fcst, base or {"vis": 10.0, "fog": 0.0})
+            base_start = start
+
+    if base is None:
+        return []
+
+    paths = [(1.0, base, [])]
+
+    # Prevailing changes (BECMG) first, temporary deviations on top
+    branches.sort(key=lambda branch: branch[1].get("fcstChange") != "BECMG")
+
+    for p, fcst in branches:
+        label = fcst.get("fcstChange") or "PROB"
+
+        expanded = []
+        for prob, state, groups in paths:
+            expanded.append((prob * (1 - p), state, groups))
+            expanded.append(
+                (prob * p, _group_state(fcst, state), groups + [label])
+            )
+
+        expanded.sort(key=lambda path: -path[0])
+        paths = expanded[:max_scenarios]
+
+    total = sum(prob for prob, _, _ in paths)
+
+    return [
+        {
+            "probability": prob / total,
+            "vis": state["vis"],
+            "fog": state["fog"],
+            "groups": groups
+        }
+        for prob, state, groups in paths
+        if prob > 0
+    ]
+
+
 
 #if __name__ == "__main__":
 #    from .taf_service import get_taf
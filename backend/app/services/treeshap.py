@@ -0,0 +1,293 @@
+import os
+import math
+import numpy as np
+
+# -----------------------------
+# Configuration
+# -----------------------------
+# Rows explained per vectorised pass (bounds the (rows, path features)
+# intermediate arrays)
+TREESHAP_CHUNK_ROWS = int(os.getenv("TREESHAP_CHUNK_ROWS", "8"))
+
+
+def _tree_leaves(tree, positive_class: int):
+    """
+    Root-to-leaf paths of one fitted sklearn tree.
+
+    Repeated splits on a feature collapse into one interval (lo, hi]
+    and one zero fraction (product of the cover ratios), as in the
+    path-dependent TreeSHAP recursion.
+
+    Yields
+    ------
+    tuple
+        (features, lo, hi, zero_fractions, value)
+    """
+    left = tree.children_left
+    right = tree.children_right
+    feature = tree.feature
+    threshold = tree.threshold
+    cover = tree.weighted_n_node_samples
+    values = tree.value[:, 0, :]
+
+    # node, {feature: (lo, hi, zero fraction)} in first-split order
+    stack = [(0, {})]
+
+    while stack:
+        node, path = stack.pop()
+
+        if left[node] == -1:
+            features = list(path)
+            yield (
+                features,
+                [path[f][0] for f in features],
+                [path[f][1] for f in features],
+                [path[f][2] for f in features],
+                values[node, positive_class] / values[node].sum()
+            )
+            continue
+
+        f = int(feature[node])
+        t = float(threshold[node])
+        lo, hi, zero = path.get(f, (-np.inf, np.inf, 1.0))
+
+        # sklearn goes left when x <= threshold
+        for child, bounds in (
+            (left[node], (lo, min(hi, t))),
+            (right[node], (max(lo, t), hi))
+        ):
+            child_path = dict(path)
+            child_path[f] = (*bounds, zero * cover[child] / cover[node])
+            stack.append((child, child_path))
+
+
+def _leaf_tables(zero: np.ndarray, value: np.ndarray) -> np.ndarray:
+    """
+    SHAP contributions of leaves sharing a path length d, for every
+    pattern of which path features the row satisfies.
+
+    For path feature i of a leaf with value v:
+
+        phi_i = v (o_i − z_i) Σ_k w(k) c_k,   w(k) = k! (d−k−1)! / d!
+
+    where c_k are the coefficients of Π_{j≠i} (z_j + o_j t), z the zero
+    fractions and o ∈ {0, 1} the row's pattern.
+
+    Parameters
+    ----------
+    zero : ndarray, shape (n_leaves, d)
+    value : ndarray, shape (n_leaves,)
+
+    Returns
+    -------
+    ndarray, shape (n_leaves, 2**d, d)
+        Indexed by pattern (bit j set: path feature j satisfied)
+    """
+    n_leaves, d = zero.shape
+    patterns = (np.arange(2 ** d)[:, None] >> np.arange(d)) & 1  # (2**d, d)
+
+    weights = np.array([
+        math.factorial(k) * math.factorial(d - k - 1) for k in range(d)
+    ]) / math.factorial(d)
+
+    phi = np.empty((n_leaves, 2 ** d, d))
+
+    for i in range(d):
+        coef = np.zeros((n_leaves, 2 ** d, d))
+        coef[:, :, 0] = 1.0
+
+        for j in range(d):
+            if j == i:
+                continue
+
+            grown = coef * zero[:, None, j, None]
+            grown[:, :, 1:] += coef[:, :, :-1] * patterns[None, :, j, None]
+            coef = grown
+
+        phi[:, :, i] = (
+            value[:, None]
+            * (patterns[None, :, i] - zero[:, i, None])
+            * (coef @ weights)
+        )
+
+    return phi
+
+
+class ForestExplainer:
+    """
+    Exact path-dependent TreeSHAP for a fitted sklearn forest, over
+    flattened arrays built once per model.
+
+    A leaf's contribution to each feature depends on the row only
+    through which of its path intervals the row falls in, so it is
+    tabulated per leaf and pattern at load. Explaining a batch is then:
+
+    1. bin each feature against the forest's thresholds
+    2. test the distinct (feature, interval) conditions
+    3. combine them into one pattern per leaf (sparse product)
+    4. gather the tabulated contributions and sum them per feature
+
+    Output is the positive-class probability, like
+    shap.TreeExplainer(model).shap_values(X)[..., 1], with
+    expected_value + Σ phi equal to predict_proba.
+    """
+
+    def __init__(self, model, positive_class: int = 1):
+        # scipy comes with scikit-learn (already loaded with the model)
+        from scipy.sparse import csr_matrix
+
+        n_trees = len(model.estimators_)
+        self.n_features = int(model.n_features_in_)
+
+        groups = {}  # path length → leaves
+        self.expected_value = 0.0
+
+        for estimator in model.estimators_:
+            for features, lo, hi, zero, value in _tree_leaves(
+                estimator.tree_, positive_class
+            ):
+                value /= n_trees
+                self.expected_value += value * math.prod(zero)
+
+                # Single-node trees only shift the expected value
+                if features:
+                    groups.setdefault(len(features), []).append(
+                        (features, lo, hi, zero, value)
+                    )
+
+        leaves = [leaf for d in sorted(groups) for leaf in groups[d]]
+
+        # Feature bins: a row's bin is the number of thresholds below it
+        bounds = [[] for _ in range(self.n_features)]
+        for features, lo, hi, _, _ in leaves:
+            for f, a, b in zip(features, lo, hi):
+                bounds[f] += (a, b)
+
+        self._thresholds = [
+            np.unique([b for b in feature_bounds if np.isfinite(b)])
+            for feature_bounds in bounds
+        ]
+
+        # One (leaf, position) pair per path feature, and the table
+        # offset of each leaf (pattern-major, d contributions per pattern)
+        pair_leaf, pair_position, pair_feature, pair_lo, pair_hi = [], [], [], [], []
+        leaf_offset, leaf_length = [], []
+        tables = []
+        n_values = 0
+
+        for d in sorted(groups):
+            tables.append(_leaf_tables(
+                np.array([leaf[3] for leaf in groups[d]]),
+                np.array([leaf[4] for leaf in groups[d]])
+            ).ravel())
+
+            for features, lo, hi, _, _ in groups[d]:
+                pair_leaf += [len(leaf_offset)] * d
+                pair_position += range(d)
+                pair_feature += features
+                pair_lo += lo
+                pair_hi += hi
+
+                leaf_offset.append(n_values)
+                leaf_length.append(d)
+                n_values += 2 ** d * d
+
+        pair_feature = np.array(pair_feature, dtype=np.intp)
+        pair_lo = np.array(pair_lo)
+        pair_hi = np.array(pair_hi)
+
+        # Intervals in bin space: lo bin < row bin <= hi bin
+        lo_bin = np.full(len(pair_feature), -1, dtype=np.int32)
+        hi_bin = np.empty(len(pair_feature), dtype=np.int32)
+
+        for f, thresholds in enumerate(self._thresholds):
+            mask = pair_feature == f
+            lo_bin[mask] = np.searchsorted(thresholds, pair_lo[mask])
+            hi_bin[mask] = np.searchsorted(thresholds, pair_hi[mask])
+
+        lo_bin[np.isinf(pair_lo)] = -1
+
+        # Distinct conditions are tested once per row
+        conditions, pair_condition = np.unique(
+            np.stack([pair_feature, lo_bin, hi_bin], axis=1),
+            axis=0,
+            return_inverse=True
+        )
+
+        self.n_leaves = len(leaf_offset)
+        self._table = np.concatenate(tables) if tables else np.zeros(0)
+        self._leaf_offset = np.array(leaf_offset, dtype=np.int32)
+        self._leaf_length = np.array(leaf_length, dtype=np.int32)
+
+        self._condition_feature = conditions[:, 0]
+        self._condition_lo = conditions[:, 1].astype(np.int32)
+        self._condition_hi = conditions[:, 2].astype(np.int32)
+
+        # condition → pattern bit of every leaf testing it
+        self._pattern_bits = csr_matrix(
+            (
+                np.left_shift(1, pair_position).astype(np.float32),
+                (pair_condition.ravel(), pair_leaf)
+            ),
+            shape=(len(conditions), self.n_leaves)
+        )
+
+        # Pairs grouped by feature, for one reduceat per batch
+        order = np.argsort(pair_feature, kind="stable")
+        pair_feature = pair_feature[order]
+
+        self._pair_leaf = np.array(pair_leaf, dtype=np.intp)[order]
+        self._pair_position = np.array(pair_position, dtype=np.int32)[order]
+        self._explained = np.unique(pair_feature)
+        self._feature_start = np.searchsorted(pair_feature, self._explained)
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self._table.nbytes
+            + self._pattern_bits.data.nbytes
+            + self._pair_leaf.nbytes
+            + self._pair_position.nbytes
+        )
+
+    def shap_values(self, X) -> np.ndarray:
+        """
+        Parameters
+        ----------
+        X : array-like, shape (n_rows, n_features)
+
+        Returns
+        -------
+        ndarray, shape (n_rows, n_features)
+            Positive-class SHAP values; each row sums to the model's
+            probability minus expected_value
+        """
+        # sklearn compares float32 features against the thresholds
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32)).astype(float)
+
+        bins = np.empty(X.shape, dtype=np.int32)
+        for f, thresholds in enumerate(self._thresholds):
+            bins[:, f] = np.searchsorted(thresholds, X[:, f], side="left")
+
+        phi = np.zeros((len(X), self.n_features))
+
+        if not self.n_leaves:
+            return phi
+
+        for start in range(0, len(X), TREESHAP_CHUNK_ROWS):
+            rows = bins[start:start + TREESHAP_CHUNK_ROWS][:, self._condition_feature]
+
+            satisfied = (
+                (rows > self._condition_lo) & (rows <= self._condition_hi)
+            ).astype(np.float32)
+            patterns = (satisfied @ self._pattern_bits).astype(np.int32)
+
+            offsets = self._leaf_offset + patterns * self._leaf_length
+            index = np.take(offsets, self._pair_leaf, axis=1)
+            index += self._pair_position
+
+            phi[start:start + len(rows), self._explained] = np.add.reduceat(
+                np.take(self._table, index), self._feature_start, axis=1
+            )
+
+        return phi
@@ -0,0 +1,189 @@
+import os
+import datetime
+import threading
+import time
+
+from .http_client import warm_connections
+
+# -----------------------------
+# Configuration
+# -----------------------------
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+
+# Airports whose weather / departures are preloaded at startup
+WARMUP_AIRPORTS = [
+    icao.strip().upper()
+    for icao in os.getenv("WARMUP_AIRPORTS", "").split(",")
+    if icao.strip()
+]
+
+WARMUP_UPSTREAMS = [
+    "https://aviationweather.gov/api/data/taf",
+    "https://aerodatabox.p.rapidapi.com/"
+]
+
+# Representative feature vectors (clear day / dense fog night) that
+# exercise both sides of the forest's main splits
+SYNTHETIC_FEATURES = [
+    [12, 9.0, 0.1, 0.05, 0.1, 14, 8.0, 0.1, 0.05, 0.1],
+    [5, 0.3, 0.6, 0.9, 0.5, 7, 0.2, 0.7, 1.0, 0.6],
+    [21, 1.5, 0.3, 0.5, 0.3, 23, 0.8, 0.4, 0.6, 0.4]
+]
+
+# Phases that must succeed before the worker reports ready
+REQUIRED_PHASES = ("workers", "model", "explainer")
+
+_state = {
+    "started": False,
+    "finished": False,
+    "phases": {}
+}
+_lock = threading.Lock()
+
+
+def _run_phase(name: str, fn):
+    """
+    Run one warm-up phase, recording its duration and outcome.
+    """
+    start = time.perf_counter()
+
+    try:
+        detail = fn()
+        status = "ok"
+    except Exception as e:
+        detail = str(e)
+        status = "error"
+
+    _state["phases"][name] = {
+        "status": status,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+        "detail": detail
+    }
+
+
+# -----------------------------
+# Phases
+# -----------------------------
+def _warm_workers():
+    from .executor_service import prestart_workers
+
+    return prestart_workers()
+
+
+def _warm_model():
+    from .executor_service import run_inference
+    from .model_registry import available_variants
+
+    variants = available_variants()
+
+    for variant in variants:
+        for features in SYNTHETIC_FEATURES:
+            run_inference(features, explain=False, variant=variant)
+
+    return {"variants": variants}
+
+
+def _warm_explainer():
+    from .executor_service import run_inference
+
+    for features in SYNTHETIC_FEATURES:
+        run_inference(features, explain=True)
+
+    return {"rows": len(SYNTHETIC_FEATURES)}
+
+
+def _warm_drift_baseline():
+    from .drift_service import preload_baseline
+
+    return preload_baseline()
+
+
+def _warm_connections():
+    return warm_connections(WARMUP_UPSTREAMS)
+
+
+def _warm_caches():
+    from .taf_service import get_tafs
+    from .metar_service import get_metars
+    from .flight_resolver import resolve_departures
+    from .rate_limiter import PRIORITY_BACKGROUND
+
+    if not WARMUP_AIRPORTS:
+        return {"airports": []}
+
+    today = datetime.datetime.now(datetime.UTC).date().isoformat()
+
+    tafs = get_tafs(WARMUP_AIRPORTS)
+    metars = get_metars(WARMUP_AIRPORTS)
+
+    departures = {}
+    for icao in WARMUP_AIRPORTS:
+        try:
+            departures[icao] = len(
+                resolve_departures(icao, today, priority=PRIORITY_BACKGROUND)
+            )
+        except Exception as e:
+            departures[icao] = str(e)
+
+    return {
+        "airports": WARMUP_AIRPORTS,
+        "tafs": len(tafs),
+        "metars": len(metars),
+        "departures": departures
+    }
+
+
+def run_warmup():
+    """
+    Run all warm-up phases (blocking).
+    """
+    with _lock:
+        if _state["started"]:
+            return
+        _state["started"] = True
+
+    start = time.perf_counter()
+
+    _run_phase("workers", _warm_workers)
+    _run_phase("model", _warm_model)
+    _run_phase("explainer", _warm_explainer)
+    _run_phase("drift_baseline", _warm_drift_baseline)
+    _run_phase("connections", _warm_connections)
+    _run_phase("caches", _warm_caches)
+
+    _state["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    _state["finished"] = True
+
+
+def start_warmup():
+    """
+    Run warm-up in the background so the server can answer /ready
+    (not-ready) while it is in progress.
+    """
+    if not WARMUP_ENABLED:
+        _state["started"] = _state["finished"] = True
+        return
+
+    threading.Thread(target=run_warmup, name="warmup", daemon=True).start()
+
+
+def readiness() -> dict:
+    """
+    Readiness state: ready once warm-up finished and required phases
+    succeeded.
+    """
+    phases = dict(_state["phases"])
+
+    ready = _state["finished"] and all(
+        phases.get(name, {}).get("status") == "ok"
+        for name in REQUIRED_PHASES
+        if WARMUP_ENABLED
+    )
+
+    return {
+        "ready": ready,
+        "warmup_enabled": WARMUP_ENABLED,
+        "finished": _state["finished"],
+        "total_ms": _state.get("total_ms"),
+        "phases": phases
+    }
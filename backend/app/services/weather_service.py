@@ -1,8 +1,13 @@
-from .taf_service import get_taf
-from .taf_temporal import extract_taf_temporal_features
-from .metar_service import get_metar
+from .taf_service import get_taf, get_tafs
+from .taf_temporal import (
+    extract_taf_temporal_features,
+    extract_taf_temporal_features_batch,
+    taf_timeline
+)
+from .metar_service import get_metar, get_metars
+from .records import WeatherFeatures
 import datetime
-import pytz
+import numpy as np
 
 
 # -----------------------------
@@ -55,6 +60,77 @@ def _extract_metar_features(metar: dict):
         "taf_change_intensity": float(change)
     }
 
+# -----------------------------
+# Helpers: source → weather record
+# -----------------------------
+def _taf_weather(taf: dict, event_time: str):
+    """
+    TAF-derived features for an event time (None if no forecast applies).
+    """
+    taf_features = extract_taf_temporal_features(taf, event_time)
+
+    if taf_features["taf_min_vis_km"] is None:
+        return None
+
+    issue_time = taf.get("issueTime")
+
+    return WeatherFeatures(
+        **taf_features,
+        weather_source="TAF",
+        taf_issue_time_utc=(
+            datetime.datetime
+            .fromisoformat(issue_time.replace("Z", "+00:00"))
+            .isoformat()
+            if issue_time else None
+        ),
+        taf_valid_from_utc=datetime.datetime.fromtimestamp(
+            taf["validTimeFrom"],
+            tz=datetime.UTC
+        ).isoformat(),
+        taf_valid_to_utc=datetime.datetime.fromtimestamp(
+            taf["validTimeTo"],
+            tz=datetime.UTC
+        ).isoformat(),
+        taf_raw=taf.get("rawTAF")
+    )
+
+
+def _metar_weather(metar: dict, event_utc: datetime.datetime):
+    """
+    METAR-derived features if the observation is close enough to the
+    event time (None otherwise).
+    """
+    metar_time = datetime.datetime.fromisoformat(
+        metar["obsTime"].replace("Z", "+00:00")
+    ).astimezone(datetime.UTC)
+
+    time_diff_hours = abs(
+        (metar_time - event_utc).total_seconds()
+    ) / 3600
+
+    if time_diff_hours > 4:
+        return None
+
+    return WeatherFeatures(
+        **_extract_metar_features(metar),
+        weather_source="METAR",
+        metar_time_utc=metar_time.isoformat(),
+        metar_raw=metar.get("rawOb")
+    )
+
+
+def _default_weather():
+    return WeatherFeatures(
+        taf_min_vis_km=5.0,           # VFR but not perfect
+        taf_mean_vis_km=6.0,
+        taf_trend=0.0,
+        taf_volatility=0.2,           # some uncertainty
+        taf_fog_probability=0.15,     # low but non-zero
+        taf_change_intensity=0.2,     # slight variability
+        weather_source="DEFAULT"
+    )
+
+
 # -----------------------------
 # Main weather service
 # -----------------------------
@@ -72,7 +148,7 @@ def get_weather_risk(icao: str, event_time: str):
 
     Returns
     -------
-    dict
+    WeatherFeatures
         Weather risk features + metadata
     """
 
@@ -82,32 +158,9 @@ def get_weather_risk(icao: str, event_time: str):
     # 1️⃣ Try TAF first
     # =====================================================
     try:
-        taf = get_taf(icao)
-        taf_features = extract_taf_temporal_features(taf, event_time)
-
-        if taf_features.get("taf_min_vis_km") is not None:
-            taf_features["weather_source"] = "TAF"
-
-            issue_time = taf.get("issueTime")
-            if issue_time:
-                taf_features["taf_issue_time_utc"] = (
-                    datetime.datetime
-                    .fromisoformat(issue_time.replace("Z", "+00:00"))
-                    .isoformat()
-                )
-
-            taf_features["taf_valid_from_utc"] = datetime.datetime.fromtimestamp(
-                taf["validTimeFrom"],
-                tz=datetime.UTC
-            ).isoformat()
-
-            taf_features["taf_valid_to_utc"] = datetime.datetime.fromtimestamp(
-                taf["validTimeTo"],
-                tz=datetime.UTC
-            ).isoformat()
-
-            taf_features["taf_raw"] = taf.get("rawTAF")
+        taf_features = _taf_weather(get_taf(icao), event_time)
 
+        if taf_features is not None:
             return taf_features
 
     except Exception:
@@ -118,22 +171,9 @@ def get_weather_risk(icao: str, event_time: str):
     # 2️⃣ Fallback: METAR within ±3 hours
     # =====================================================
     try:
-        metar = get_metar(icao)
-
-        metar_time = datetime.datetime.fromisoformat(
-            metar["obsTime"].replace("Z", "+00:00")
-        ).astimezone(datetime.UTC)
-
-        time_diff_hours = abs(
-            (metar_time - event_utc).total_seconds()
-        ) / 3600
-
-        if time_diff_hours <= 4:
-            metar_features = _extract_metar_features(metar)
-            metar_features["weather_source"] = "METAR"
-            metar_features["metar_time_utc"] = metar_time.isoformat()
-            metar_features["metar_raw"] = metar.get("rawOb")
+        metar_features = _metar_weather(get_metar(icao), event_utc)
 
+        if metar_features is not None:
             return metar_features
 
     except Exception:
@@ -142,13 +182,135 @@ def get_weather_risk(icao: str, event_time: str):
     # =====================================================
     # 3️⃣ Final fallback: benign defaults
     # =====================================================
-    return {
-    "taf_min_vis_km": 5.0,            # VFR but not perfect
-    "taf_mean_vis_km": 6.0,
-    "taf_trend": 0.0,
-    "taf_volatility": 0.2,            # some uncertainty
-    "taf_fog_probability": 0.15,      # low but non-zero
-    "taf_change_intensity": 0.2,      # slight variability
-    "weather_source": "DEFAULT"
+    return _default_weather()
+
+
+def get_weather_risk_bulk(events: list):
+    """
+    Weather risk for many (icao, event_time) pairs with the same
+    TAF → METAR → default fallback as get_weather_risk, but one bulk
+    upstream request per source instead of one per event.
+
+    Returns
+    -------
+    list[WeatherFeatures]
+        Weather records aligned with events
+    """
+
+    results = [None] * len(events)
+
+    # 1️⃣ TAF for every airport in one request
+    try:
+        tafs = get_tafs([icao for icao, _ in events])
+    except Exception:
+        tafs = {}
+
+    pending = []
+
+    for i, (icao, event_time) in enumerate(events):
+        try:
+            if icao in tafs:
+                results[i] = _taf_weather(tafs[icao], event_time)
+        except Exception:
+            pass
+
+        if results[i] is None:
+            pending.append(i)
+
+    if not pending:
+        return results
+
+    # 2️⃣ METAR only for the airports TAF could not cover
+    try:
+        metars = get_metars([events[i][0] for i in pending])
+    except Exception:
+        metars = {}
+
+    for i in pending:
+        icao, event_time = events[i]
+
+        try:
+            if icao in metars:
+                results[i] = _metar_weather(
+                    metars[icao], _parse_event_time_utc(event_time)
+                )
+        except Exception:
+            pass
+
+        # 3️⃣ Benign defaults
+        if results[i] is None:
+            results[i] = _default_weather()
+
+    return results
+
+
+# Numeric features carried per candidate time by get_weather_timeline
+TIMELINE_FEATURES = (
+    "taf_min_vis_km",
+    "taf_mean_vis_km",
+    "taf_trend",
+    "taf_volatility",
+    "taf_fog_probability",
+    "taf_change_intensity"
+)
+
+
+def get_weather_timeline(icao: str, event_times, taf=None, metar=None):
+    """
+    Weather features for one airport at many event times (epoch
+    seconds), vectorized over the TAF timeline, with the same
+    TAF → METAR (±4 h) → default fallback as get_weather_risk.
+
+    Parameters
+    ----------
+    taf, metar : dict, optional
+        Already fetched reports (fetched here when omitted)
+
+    Returns
+    -------
+    tuple[dict, np.ndarray]
+        Feature name → array aligned with event_times, and the
+        weather source ("TAF" / "METAR" / "DEFAULT") per event time
+    """
+    event_times = np.asarray(event_times, dtype=float)
+    n = len(event_times)
+
+    default = _default_weather()
+    features = {
+        name: np.full(n, getattr(default, name), dtype=float)
+        for name in TIMELINE_FEATURES
     }
+    source = np.full(n, "DEFAULT", dtype=object)
+
+    # 1️⃣ METAR where the observation is close enough
+    try:
+        metar = metar if metar is not None else get_metar(icao)
+        metar_time = datetime.datetime.fromisoformat(
+            metar["obsTime"].replace("Z", "+00:00")
+        ).timestamp()
+
+        near = np.abs(event_times - metar_time) <= 4 * 3600
+        metar_features = _extract_metar_features(metar)
+
+        for name in TIMELINE_FEATURES:
+            features[name][near] = metar_features[name]
+        source[near] = "METAR"
+    except Exception:
+        pass
+
+    # 2️⃣ TAF wherever a forecast group applies (takes precedence)
+    try:
+        taf = taf if taf is not None else get_taf(icao)
+        taf_features = extract_taf_temporal_features_batch(
+            taf_timeline(taf), event_times
+        )
+
+        covered = ~np.isnan(taf_features["taf_min_vis_km"])
+
+        for name in TIMELINE_FEATURES:
+            features[name][covered] = taf_features[name][covered]
+        source[covered] = "TAF"
+    except Exception:
+        pass
 
+    return features, source
@@ -0,0 +1,132 @@
+import os
+import sys
+import timeit
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+os.environ.setdefault("FLIGHT_RESOLVER", "stub")
+
+from app.services.records import Flight, WeatherFeatures, Prediction
+from app.services.response_service import RecordJSONResponse
+
+# Usage (from backend/):
+#   python benchmark_serialization.py [iterations]
+#
+# Encodes a representative /predict body three ways:
+#   generic   dicts through FastAPI's jsonable_encoder + JSONResponse
+#   dicts     dicts straight into JSONResponse (json.dumps)
+#   records   slotted records through RecordJSONResponse (to_dict + C encoder)
+# and reports time and allocated bytes per response, plus the size of
+# one weather record vs the equivalent dict.
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+
+def predict_body():
+    flight = Flight(
+        flight_number="6E7027",
+        origin="VIDP",
+        destination="VILK",
+        scheduled_departure="2026-01-12 01:30Z",
+        scheduled_arrival="2026-01-12 02:40Z",
+        airline="IGO",
+        aircraft_registration="VT-IZB",
+        source="AERODATABOX"
+    )
+
+    def weather(icao):
+        return WeatherFeatures(
+            taf_min_vis_km=0.2,
+            taf_mean_vis_km=2.4000000000000004,
+            taf_trend=-0.8800000000000013,
+            taf_volatility=2.3537204591879637,
+            taf_fog_probability=0.5,
+            taf_change_intensity=0.5,
+            weather_source="TAF",
+            taf_issue_time_utc="2026-01-11T23:00:00+00:00",
+            taf_valid_from_utc="2026-01-12T00:00:00+00:00",
+            taf_valid_to_utc="2026-01-13T06:00:00+00:00",
+            taf_raw=f"TAF {icao} 112300Z 1200/1306 6000 TEMPO 1200/1204 0200 FG"
+        )
+
+    return {
+        "trace_id": "1a2b3c4d",
+        "flight": flight,
+        "origin_weather": weather("VIDP"),
+        "destination_weather": weather("VILK"),
+        "operational_feasibility": {
+            "origin_takeoff_ok": True,
+            "destination_landing_ok": False
+        },
+        "prediction": Prediction(delay_probability=0.873),
+        "explainability": [
+            {"feature": name, "value": value, "shap_contribution": impact}
+            for name, value, impact in (
+                ("dest_min_vis", 0.2, 0.2314),
+                ("origin_min_vis", 0.2, 0.1182),
+                ("dest_fog_prob", 0.5, 0.0521),
+                ("arr_hour", 2, -0.0313),
+                ("origin_volatility", 2.3537, 0.0121)
+            )
+        ],
+        "decision": {
+            "action": "CANCEL_OR_DIVERT_RISK",
+            "message": "Destination below CAT landing minima",
+            "alternates": []
+        }
+    }
+
+
+def as_dicts(body: dict) -> dict:
+    return {
+        key: value.to_dict() if hasattr(value, "to_dict") else value
+        for key, value in body.items()
+    }
+
+
+def measure(encode, body):
+    seconds = timeit.timeit(lambda: encode(body), number=ITERATIONS)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    encode(body)
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    return seconds / ITERATIONS * 1e6, peak
+
+
+records_body = predict_body()
+dict_body = as_dicts(records_body)
+
+payloads = {
+    "generic": JSONResponse(jsonable_encoder(dict_body)).body,
+    "dicts": JSONResponse(dict_body).body,
+    "records": RecordJSONResponse(records_body).body
+}
+
+if len(set(payloads.values())) != 1:
+    sys.exit("FAIL: encoders disagree on the response body")
+
+results = {
+    "generic": measure(lambda b: JSONResponse(jsonable_encoder(b)), dict_body),
+    "dicts": measure(JSONResponse, dict_body),
+    "records": measure(RecordJSONResponse, records_body)
+}
+
+print(f"/predict body: {len(payloads['records'])} bytes, {ITERATIONS:,} iterations\n")
+print(f"{'encoder':<10}{'µs / response':>16}{'peak alloc':>14}{'speed-up':>11}")
+
+baseline_us = results["generic"][0]
+
+for name, (us, peak) in results.items():
+    print(f"{name:<10}{us:>16.1f}{peak:>12,} B{baseline_us / us:>10.1f}x")
+
+weather = records_body["origin_weather"]
+print(
+    f"\nWeather features: record {sys.getsizeof(weather)} B "
+    f"vs dict {sys.getsizeof(weather.to_dict())} B (containers only)"
+)
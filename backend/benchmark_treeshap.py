@@ -0,0 +1,116 @@
+import os
+import sys
+import time
+import numpy as np
+
+from app.services.model_registry import available_variants, get_model
+from app.services.config import DATASET_PATH
+from app.services.explainability_service import FEATURE_NAMES
+from app.services.treeshap import ForestExplainer
+
+# Usage (from backend/):
+#   python benchmark_treeshap.py [rows]
+#
+# For every model variant on disk, builds the flattened TreeSHAP tables
+# and reports build time, table size and rows explained per second.
+# Checks local accuracy (expected value + Σ SHAP = predict_proba) and,
+# when the `shap` package is installed (development only, not a serving
+# dependency), agreement with shap.TreeExplainer and its speed.
+# Exits 1 if either check fails.
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+# Largest tolerated |difference| (probability units)
+TOLERANCE = float(os.getenv("TREESHAP_TOLERANCE", "1e-9"))
+
+try:
+    import shap
+except ImportError:
+    shap = None
+
+
+def rows_per_second(explain, X) -> float:
+    # Best of 3: timings are noisy on shared machines
+    best = float("inf")
+
+    for _ in range(3):
+        start = time.perf_counter()
+        explain(X)
+        best = min(best, time.perf_counter() - start)
+
+    return len(X) / best
+
+
+def positive_class(shap_values) -> np.ndarray:
+    shap_values = np.asarray(shap_values)
+
+    # (n_rows, n_features, n_classes) or per-class list
+    if shap_values.ndim == 3:
+        return shap_values[:, :, 1]
+    return shap_values[1]
+
+
+data = np.loadtxt(DATASET_PATH, delimiter=",", skiprows=1)
+X = np.resize(data[:, :len(FEATURE_NAMES)], (ROWS, len(FEATURE_NAMES)))
+
+failed = False
+
+for variant in available_variants():
+    model = get_model(variant)
+
+    start = time.perf_counter()
+    explainer = ForestExplainer(model)
+    build_s = time.perf_counter() - start
+
+    phi = explainer.shap_values(X)
+
+    additivity = np.abs(
+        explainer.expected_value + phi.sum(axis=1) - model.predict_proba(X)[:, 1]
+    ).max()
+
+    print(
+        f"{variant}: {len(model.estimators_)} trees, {explainer.n_leaves:,} "
+        f"leaves, tables {explainer.nbytes / 1e6:.1f} MB, "
+        f"built in {build_s * 1000:.0f} ms"
+    )
+    print(f"  additivity error   {additivity:.2e}")
+
+    numpy_single = rows_per_second(explainer.shap_values, X[:1])
+    numpy_batch = rows_per_second(explainer.shap_values, X)
+
+    if additivity > TOLERANCE:
+        failed = True
+
+    if shap is None:
+        print("  shap not installed: agreement not checked")
+        print(f"  {'':<12}{'1 row (ms)':>12}{'rows / s':>12}")
+        print(f"  {'treeshap':<12}{1000 / numpy_single:>12.2f}{numpy_batch:>12,.0f}")
+        continue
+
+    reference = shap.TreeExplainer(model)
+    expected = np.atleast_1d(reference.expected_value)[-1]
+    diff = max(
+        np.abs(positive_class(reference.shap_values(X)) - phi).max(),
+        abs(expected - explainer.expected_value)
+    )
+
+    print(f"  max |Δ| vs shap    {diff:.2e}")
+
+    if diff > TOLERANCE:
+        failed = True
+
+    shap_single = rows_per_second(reference.shap_values, X[:1])
+    shap_batch = rows_per_second(reference.shap_values, X)
+
+    print(f"  {'':<12}{'1 row (ms)':>12}{'rows / s':>12}")
+    print(f"  {'treeshap':<12}{1000 / numpy_single:>12.2f}{numpy_batch:>12,.0f}")
+    print(f"  {'shap':<12}{1000 / shap_single:>12.2f}{shap_batch:>12,.0f}")
+    print(
+        f"  speed-up    {numpy_single / shap_single:>12.1f}x"
+        f"{numpy_batch / shap_batch:>11.1f}x"
+    )
+
+if failed:
+    sys.exit(f"FAIL: explanations off by more than {TOLERANCE:g}")
+
+print("\nOK")
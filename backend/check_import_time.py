@@ -0,0 +1,99 @@
+import os
+import sys
+import subprocess
+
+# Usage (from backend/):
+#   python check_import_time.py [budget_ms]
+#
+# Imports app.main in a fresh interpreter with `-X importtime` and fails
+# (exit 1) if the cumulative import time exceeds the budget, or if any
+# module that must stay off the startup path gets imported.
+
+IMPORT_TIME_BUDGET_MS = float(
+    sys.argv[1] if len(sys.argv) > 1
+    else os.getenv("IMPORT_TIME_BUDGET_MS", "1500")
+)
+
+# Loaded lazily on first prediction / explanation (or in worker processes)
+FORBIDDEN_AT_STARTUP = ("shap", "sklearn", "scipy", "numba", "pandas", "pytz")
+
+# Best of N runs: importtime is noisy on shared machines
+RUNS = int(os.getenv("IMPORT_TIME_RUNS", "3"))
+
+TARGET = "app.main"
+
+
+def measure():
+    """
+    Returns
+    -------
+    tuple[float, dict]
+        Cumulative import time of TARGET (ms) and {module: self ms}
+    """
+    env = {
+        **os.environ,
+        # main imports flight_resolver, which needs a key unless stubbed
+        "FLIGHT_RESOLVER": os.getenv("FLIGHT_RESOLVER", "stub"),
+        "PYTHONDONTWRITEBYTECODE": "1"
+    }
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {TARGET}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+
+    if result.returncode != 0:
+        print(result.stderr)
+        sys.exit(f"Importing {TARGET} failed")
+
+    modules = {}
+    total_ms = None
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        modules[name] = int(self_us) / 1000
+
+        if name == TARGET:
+            total_ms = int(cumulative_us) / 1000
+
+    return total_ms, modules
+
+
+runs = [measure() for _ in range(RUNS)]
+total_ms, modules = min(runs, key=lambda run: run[0])
+
+print(f"{TARGET} import time: {total_ms:.0f} ms (budget {IMPORT_TIME_BUDGET_MS:.0f} ms)")
+
+print("\nSlowest modules (self time)")
+print("---------------------------")
+for name, ms in sorted(modules.items(), key=lambda m: -m[1])[:10]:
+    print(f"{ms:8.1f} ms  {name}")
+
+failures = []
+
+forbidden = sorted(
+    name for name in modules
+    if name.split(".")[0] in FORBIDDEN_AT_STARTUP
+)
+if forbidden:
+    roots = sorted({name.split(".")[0] for name in forbidden})
+    failures.append(f"heavy modules imported at startup: {', '.join(roots)}")
+
+if total_ms > IMPORT_TIME_BUDGET_MS:
+    failures.append(
+        f"import time {total_ms:.0f} ms exceeds budget "
+        f"{IMPORT_TIME_BUDGET_MS:.0f} ms"
+    )
+
+if failures:
+    print("\nFAIL: " + "; ".join(failures))
+    sys.exit(1)
+
+print("\nOK")
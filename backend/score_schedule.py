@@ -0,0 +1,253 @@
+import os
+import sys
+import csv
+import json
+import time
+import datetime
+import argparse
+import collections
+from concurrent.futures import ProcessPoolExecutor
+
+# Chunks are already batches: workers predict in-process instead of
+# going through the serving micro-batcher (set before app imports so
+# spawned workers inherit it)
+os.environ["INFERENCE_EXECUTOR"] = "inline"
+
+from app.services.records import Flight
+from app.services.weather_service import get_weather_risk_bulk
+from app.services.departure_board_service import score_flights
+
+# Usage (from backend/):
+#   python score_schedule.py schedule.csv scored.jsonl [--chunk-size N]
+#       [--workers N] [--model full|compact]
+#
+# Input records (CSV header or JSONL keys):
+#   flight_number, origin, destination, scheduled_departure,
+#   scheduled_arrival[, airline, aircraft_registration]
+# Output: one scored record per input record, in input order (.jsonl or .csv)
+#
+# Weather is evaluated once per (ICAO, UTC hour), at the start of the
+# hour: a 10:55 departure is scored with the 10:00 forecast. TAF groups
+# changing within the hour are seen by the next hour's flights only.
+
+OUTPUT_FIELDS = (
+    "flight_number",
+    "origin",
+    "destination",
+    "scheduled_departure",
+    "scheduled_arrival",
+    "delay_probability",
+    "action",
+    "origin_takeoff_ok",
+    "destination_landing_ok",
+    "origin_weather_source",
+    "destination_weather_source"
+)
+
+
+# -----------------------------
+# Input
+# -----------------------------
+def read_records(path: str):
+    """
+    Stream flight records (CSV or JSONL) as Flight records.
+    """
+    with open(path, "r", newline="") as f:
+        if path.endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+
+        for row in rows:
+            yield Flight(
+                flight_number=row["flight_number"],
+                airline=row.get("airline"),
+                origin=row["origin"].upper(),
+                destination=row["destination"].upper(),
+                scheduled_departure=row["scheduled_departure"],
+                scheduled_arrival=row["scheduled_arrival"],
+                aircraft_registration=row.get("aircraft_registration"),
+                source="SCHEDULE"
+            )
+
+
+def chunked(records, size: int):
+    chunk = []
+
+    for record in records:
+        chunk.append(record)
+
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+# -----------------------------
+# Weather: once per (ICAO, hour)
+# -----------------------------
+def _hour_key(icao: str, timestamp: str):
+    dt = datetime.datetime.fromisoformat(timestamp)
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.UTC)
+
+    hour = dt.astimezone(datetime.UTC).replace(minute=0, second=0, microsecond=0)
+    return icao, hour.isoformat()
+
+
+def chunk_weather(flights: list):
+    """
+    Origin / destination weather for a chunk, fetched once per
+    (ICAO, hour) with bulk TAF / METAR requests.
+    """
+    origin_keys = [
+        _hour_key(f.origin, f.scheduled_departure)
+        for f in flights
+    ]
+    dest_keys = [
+        _hour_key(f.destination, f.scheduled_arrival)
+        for f in flights
+    ]
+
+    unique = list(dict.fromkeys(origin_keys + dest_keys))
+
+    # Raw report text is not part of the output
+    weather = {
+        key: w.compact()
+        for key, w in zip(unique, get_weather_risk_bulk(unique))
+    }
+
+    return (
+        [weather[key] for key in origin_keys],
+        [weather[key] for key in dest_keys],
+        len(unique)
+    )
+
+
+# -----------------------------
+# Scoring (worker process)
+# -----------------------------
+def score_chunk(flights, origin_weathers, destination_weathers, variant):
+    """
+    build_features → batch predict → vectorized minima / decisions.
+    """
+    results = score_flights(
+        flights,
+        origin_weathers,
+        destination_weathers,
+        variant=variant
+    )
+
+    return [
+        {
+            "flight_number": r["flight"].flight_number,
+            "origin": r["flight"].origin,
+            "destination": r["flight"].destination,
+            "scheduled_departure": r["flight"].scheduled_departure,
+            "scheduled_arrival": r["flight"].scheduled_arrival,
+            "delay_probability": r["prediction"].delay_probability,
+            "action": r["decision"]["action"],
+            "origin_takeoff_ok": r["operational_feasibility"]["origin_takeoff_ok"],
+            "destination_landing_ok": r["operational_feasibility"]["destination_landing_ok"],
+            "origin_weather_source": r["origin_weather"].weather_source,
+            "destination_weather_source": r["destination_weather"].weather_source
+        }
+        for r in results
+    ]
+
+
+# -----------------------------
+# Output
+# -----------------------------
+class ResultWriter:
+    def __init__(self, path: str):
+        self._file = open(path, "w", newline="")
+        self._csv = None
+
+        if path.endswith(".csv"):
+            self._csv = csv.DictWriter(self._file, fieldnames=OUTPUT_FIELDS)
+            self._csv.writeheader()
+
+    def write(self, rows: list):
+        if self._csv is not None:
+            self._csv.writerows(rows)
+        else:
+            self._file.writelines(json.dumps(row) + "\n" for row in rows)
+
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-score a flight schedule")
+    parser.add_argument("input", help="schedule (.csv or .jsonl)")
+    parser.add_argument("output", help="scored records (.csv or .jsonl)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--model", default=None, help="model variant")
+    args = parser.parse_args()
+
+    with ResultWriter(args.output) as writer:
+        # At most workers + 1 chunks in flight: memory stays bounded by the
+        # chunk size, not the schedule size
+        pending = collections.deque()
+        max_pending = args.workers + 1
+
+        rows_done = 0
+        weather_lookups = 0
+        start = time.perf_counter()
+
+        def drain(block_until: int):
+            nonlocal rows_done
+
+            while len(pending) > block_until:
+                rows = pending.popleft().result()
+                writer.write(rows)
+                rows_done += len(rows)
+
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{rows_done:>10,} flights | "
+                    f"{rows_done / elapsed:,.0f} flights/s | "
+                    f"{weather_lookups:,} weather lookups",
+                    file=sys.stderr
+                )
+
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for flights in chunked(read_records(args.input), args.chunk_size):
+                origin_weathers, destination_weathers, lookups = chunk_weather(flights)
+                weather_lookups += lookups
+
+                pending.append(pool.submit(
+                    score_chunk,
+                    flights,
+                    origin_weathers,
+                    destination_weathers,
+                    args.model
+                ))
+
+                drain(max_pending - 1)
+
+            drain(0)
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"\nScored {rows_done:,} flights in {elapsed:.1f}s "
+        f"({rows_done / max(elapsed, 1e-9):,.0f} flights/s) → {args.output}",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 import random
 import os
+import sys
+import copy
 import joblib
 import numpy as np
 import random
@@ -15,9 +17,59 @@ from sklearn.metrics import (
     classification_report
 )
 
+from app.services.model_guard import guard_report
+
+# --compress-only: reuse the saved full model, only rebuild the compact one
+COMPRESS_ONLY = "--compress-only" in sys.argv
+
+# -----------------------------
+# Compression settings
+# -----------------------------
+# Candidate tree budgets, smallest first; the first one that passes
+# the accuracy guard (app/services/model_guard.py) is saved as
+# delay_model_compact.pkl
+COMPACT_TREE_BUDGETS = [10, 20, 30, 50, 75, 100]
+
 def sigmoid(x):
     return 1 / (1 + math.exp(-x))
 
+
+def select_trees(model, X_ref, n_trees):
+    """
+    Greedy forward selection of the trees whose average best
+    reproduces the full forest's delay probability on X_ref.
+    """
+    target = model.predict_proba(X_ref)[:, 1]
+    per_tree = np.array([
+        tree.predict_proba(X_ref)[:, 1] for tree in model.estimators_
+    ])
+
+    selected = []
+    running = np.zeros(len(X_ref))
+
+    for k in range(1, n_trees + 1):
+        candidates = (running * (k - 1) + per_tree) / k
+        error = np.abs(candidates - target).mean(axis=1)
+        error[selected] = np.inf
+
+        best = int(error.argmin())
+        selected.append(best)
+        running = candidates[best]
+
+    return selected
+
+
+def build_compact_model(model, tree_idx):
+    """
+    Copy of the forest restricted to the selected trees
+    (same class, so it is served exactly like the full model).
+    """
+    compact = copy.deepcopy(model)
+    compact.estimators_ = [model.estimators_[i] for i in tree_idx]
+    compact.n_estimators = len(tree_idx)
+    return compact
+
+
 # -----------------------------
 # Reproducibility
 # -----------------------------
@@ -150,18 +202,25 @@ X_train, X_test, y_train, y_test = train_test_split(
     stratify=y
 )
 
+MODEL_DIR = os.path.join("app", "models")
+MODEL_PATH = os.path.join(MODEL_DIR, "delay_model.pkl")
+COMPACT_MODEL_PATH = os.path.join(MODEL_DIR, "delay_model_compact.pkl")
+
 # -----------------------------
 # 4. Train model
 # -----------------------------
-model = RandomForestClassifier(
-    n_estimators=300,
-    max_depth=10,
-    min_samples_leaf=5,
-    random_state=42,
-    n_jobs=-1
-)
+if COMPRESS_ONLY:
+    model = joblib.load(MODEL_PATH)
+else:
+    model = RandomForestClassifier(
+        n_estimators=300,
+        max_depth=10,
+        min_samples_leaf=5,
+        random_state=42,
+        n_jobs=-1
+    )
 
-model.fit(X_train, y_train)
+    model.fit(X_train, y_train)
 
 # -----------------------------
 # 5. Evaluate model
@@ -181,10 +240,49 @@ print(classification_report(y_test, y_pred))
 # -----------------------------
 # 6. Save model safely
 # -----------------------------
-MODEL_DIR = os.path.join("app", "models")
 os.makedirs(MODEL_DIR, exist_ok=True)
 
-MODEL_PATH = os.path.join(MODEL_DIR, "delay_model.pkl")
-joblib.dump(model, MODEL_PATH)
+if not COMPRESS_ONLY:
+    joblib.dump(model, MODEL_PATH)
+    print(f"\nModel saved to {MODEL_PATH}")
 
-print(f"\nModel saved to {MODEL_PATH}")
+# -----------------------------
+# 7. Compress (tree selection) with accuracy guard
+# -----------------------------
+print("\nCompression (tree selection vs full forest)")
+print("--------------------------------------------")
+
+compact_model = None
+
+for n_trees in COMPACT_TREE_BUDGETS:
+    candidate = build_compact_model(
+        model, select_trees(model, X_train, n_trees)
+    )
+    report = guard_report(model, candidate, X_test, y_test)
+
+    print(
+        f"{n_trees:>4} trees | "
+        f"AUC {report['auc_candidate']:.3f} (full {report['auc_reference']:.3f}) | "
+        f"F1 {report['f1_candidate']:.3f} (full {report['f1_reference']:.3f}) | "
+        f"max |dp| {report['max_prob_deviation']:.3f} | "
+        f"{'PASS' if report['passed'] else 'FAIL'}"
+    )
+
+    if report["passed"]:
+        compact_model = candidate
+        break
+
+if compact_model is None:
+    # A compact model from an earlier run no longer matches the full
+    # model just trained: remove it so the registry stops serving it
+    if os.path.exists(COMPACT_MODEL_PATH):
+        os.remove(COMPACT_MODEL_PATH)
+        print(f"\nRemoved stale {COMPACT_MODEL_PATH}")
+
+    sys.exit("No tree budget passed the accuracy guard; compact model not saved")
+else:
+    joblib.dump(compact_model, COMPACT_MODEL_PATH)
+    print(
+        f"\nCompact model ({compact_model.n_estimators} trees) "
+        f"saved to {COMPACT_MODEL_PATH}"
+    )